@@ -0,0 +1,42 @@
+"""
+Helpers shared by the benchmark scripts, which are run from the repository
+root, e.g. `python benchmarks/throttling.py`.
+"""
+
+import os
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "softdesk.settings")
+
+
+def setup(test_database: bool = False) -> None:
+    """
+    Configure Django, and create a throwaway test database if asked to.
+    """
+    import django
+
+    django.setup()
+    if test_database:
+        from django.db import connection
+        from django.test.utils import setup_test_environment
+
+        setup_test_environment()
+        connection.creation.create_test_db(verbosity=0)
+
+
+@contextmanager
+def timer(label: str, operations: int = 1):
+    """
+    Print how long the block took, per operation when several were run.
+    """
+    started = time.perf_counter()
+    yield
+    elapsed = time.perf_counter() - started
+    if operations > 1:
+        print(f"{label}: {elapsed:.3f}s, {elapsed / operations * 1e6:.2f} µs each")
+    else:
+        print(f"{label}: {elapsed:.3f}s")
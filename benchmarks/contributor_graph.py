@@ -0,0 +1,68 @@
+"""
+Measure the memory held by ContributorGraph at 1M memberships, and the time
+of its membership checks.
+"""
+
+import random
+import time
+import tracemalloc
+from array import array
+
+import bootstrap
+
+bootstrap.setup()
+
+from softdesk.accounts.graph import ContributorGraph  # noqa: E402
+
+USERS = 100_000
+PROJECTS = 50_000
+PROJECTS_PER_USER = 10
+LOOKUPS = 1_000_000
+
+
+def memberships() -> tuple[dict, dict]:
+    rng = random.Random(0)
+    projects_by_user, users_by_project = {}, {}
+    for user_id in range(1, USERS + 1):
+        project_ids = sorted(rng.sample(range(1, PROJECTS + 1), PROJECTS_PER_USER))
+        projects_by_user[user_id] = project_ids
+        for project_id in project_ids:
+            users_by_project.setdefault(project_id, []).append(user_id)
+    return projects_by_user, users_by_project
+
+
+def fill(graph: ContributorGraph, projects_by_user: dict, users_by_project: dict):
+    now = time.monotonic()
+    for user_id, project_ids in projects_by_user.items():
+        graph._put(graph._projects, user_id, array("q", project_ids), now)
+    for project_id, user_ids in users_by_project.items():
+        graph._put(graph._contributors, project_id, array("q", user_ids), now)
+
+
+if __name__ == "__main__":
+    projects_by_user, users_by_project = memberships()
+    count = sum(len(project_ids) for project_ids in projects_by_user.values())
+    print(f"{count} memberships, {USERS} users, {len(users_by_project)} projects")
+
+    tracemalloc.start()
+    graph = ContributorGraph(max_entries=USERS + PROJECTS, ttl=3600)
+    fill(graph, projects_by_user, users_by_project)
+    size, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"ContributorGraph: {size / 2**20:.1f} MiB, {size / count:.1f} bytes each")
+
+    tracemalloc.start()
+    sets = (
+        {user_id: set(ids) for user_id, ids in projects_by_user.items()},
+        {project_id: set(ids) for project_id, ids in users_by_project.items()},
+    )
+    size, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"dicts of sets, for comparison: {size / 2**20:.1f} MiB")
+    del sets
+
+    rng = random.Random(1)
+    checks = [(rng.randint(1, USERS), rng.randint(1, PROJECTS)) for _ in range(LOOKUPS)]
+    with bootstrap.timer("is_contributor", LOOKUPS):
+        for user_id, project_id in checks:
+            graph.is_contributor(user_id, project_id)
@@ -0,0 +1,93 @@
+"""
+Compare the latency and query counts of the nested issue and comment
+routes with those of the flat routes filtered by parent, on 20 projects of
+250 issues holding 5 comments each.
+"""
+
+import bootstrap
+
+bootstrap.setup(test_database=True)
+
+from django.db import connection  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+from django.urls import reverse  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+from softdesk.accounts.models import Contributor, SoftUser  # noqa: E402
+from softdesk.projects.models import Comment, Issue, Project  # noqa: E402
+from softdesk.projects.views import CommentViewSet, IssueViewSet  # noqa: E402
+
+PROJECTS = 20
+ISSUES = 250
+COMMENTS = 5
+REQUESTS = 200
+
+
+def populate() -> SoftUser:
+    user = SoftUser.objects.create(
+        username="member", email="member@mail.com", birthdate="2000-01-01"
+    )
+    projects = Project.objects.bulk_create(
+        Project(name=f"Project {number}", author=user, type="BAE")
+        for number in range(PROJECTS)
+    )
+    Contributor.objects.bulk_create(
+        Contributor(user=user, project=project) for project in projects
+    )
+    issues = Issue.objects.bulk_create(
+        Issue(
+            name=f"Issue {project.pk}-{number}",
+            project=project,
+            author=user,
+            assign_to=user,
+        )
+        for project in projects
+        for number in range(ISSUES)
+    )
+    Comment.objects.bulk_create(
+        Comment(content=f"Comment {number}", author=user, issue=issue)
+        for issue in issues
+        for number in range(COMMENTS)
+    )
+    return user
+
+
+def bench(client: APIClient, label: str, url: str):
+    client.get(url)
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200, response.status_code
+    with bootstrap.timer(
+        f"{label} ({len(context.captured_queries)} queries)", REQUESTS
+    ):
+        for _ in range(REQUESTS):
+            client.get(url)
+
+
+if __name__ == "__main__":
+    # Requests are timed, not rationed.
+    IssueViewSet.throttle_classes = CommentViewSet.throttle_classes = []
+    client = APIClient()
+    client.force_authenticate(user=populate())
+    project = Project.objects.order_by("pk").last()
+    issue = Issue.objects.filter(project=project).order_by("pk").last()
+    comment = Comment.objects.filter(issue=issue).order_by("pk").last()
+    bench(
+        client,
+        "flat issue list",
+        reverse("issue-list") + f"?project_id={project.pk}",
+    )
+    bench(client, "nested issue list", reverse("project-issue-list", args=[project.pk]))
+    bench(client, "flat issue detail", reverse("issue-detail", args=[issue.pk]))
+    bench(
+        client,
+        "nested issue detail",
+        reverse("project-issue-detail", args=[project.pk, issue.pk]),
+    )
+    bench(client, "flat comment list", reverse("comment-list") + f"?issue={issue.pk}")
+    bench(client, "nested comment list", reverse("issue-comment-list", args=[issue.pk]))
+    bench(client, "flat comment detail", reverse("comment-detail", args=[comment.pk]))
+    bench(
+        client,
+        "nested comment detail",
+        reverse("issue-comment-detail", args=[issue.pk, comment.pk]),
+    )
@@ -0,0 +1,74 @@
+"""
+Send the digests of 10k comment events spread over projects shared by 1k
+recipients, through the locmem email backend.
+"""
+
+import random
+
+import bootstrap
+
+bootstrap.setup(test_database=True)
+
+from django.core import mail  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+from softdesk.accounts.models import Contributor, SoftUser  # noqa: E402
+from softdesk.notifications.digests import send_digests  # noqa: E402
+from softdesk.notifications.models import NotificationEvent  # noqa: E402
+from softdesk.projects.models import Comment, Issue, Project  # noqa: E402
+
+RECIPIENTS = 1_000
+PROJECTS = 50
+EVENTS = 10_000
+
+
+def populate():
+    users = SoftUser.objects.bulk_create(
+        SoftUser(
+            username=f"user{number}",
+            email=f"user{number}@mail.com",
+            birthdate="2000-01-01",
+        )
+        for number in range(RECIPIENTS)
+    )
+    projects = Project.objects.bulk_create(
+        Project(name=f"Project {number}", author=users[number], type="BAE")
+        for number in range(PROJECTS)
+    )
+    Contributor.objects.bulk_create(
+        Contributor(user=user, project=project)
+        for project in projects
+        for user in random.sample(users, 100)
+    )
+    issues = Issue.objects.bulk_create(
+        Issue(
+            name=f"Issue {number}",
+            project=project,
+            author=project.author,
+            assign_to=project.author,
+        )
+        for number, project in enumerate(projects)
+    )
+    comments = Comment.objects.bulk_create(
+        Comment(content=f"Comment {number}", author=users[0], issue=issue)
+        for number, issue in enumerate(random.choices(issues, k=EVENTS))
+    )
+    NotificationEvent.objects.bulk_create(
+        NotificationEvent(
+            kind=NotificationEvent.COMMENT,
+            project_id=comment.issue.project_id,
+            issue=comment.issue,
+            comment=comment,
+            actor=comment.author,
+        )
+        for comment in comments
+    )
+
+
+if __name__ == "__main__":
+    random.seed(0)
+    populate()
+    with CaptureQueriesContext(connection) as queries:
+        with bootstrap.timer(f"{EVENTS} events to {RECIPIENTS} recipients"):
+            sent = send_digests()
+    print(f"{sent} digests, {len(mail.outbox)} emails, {len(queries)} queries")
@@ -0,0 +1,43 @@
+"""
+Measure the overhead TokenBucketThrottle adds to a request.
+"""
+
+import bootstrap
+
+bootstrap.setup()
+
+from django.contrib.auth.models import AnonymousUser  # noqa: E402
+from rest_framework.request import Request  # noqa: E402
+from rest_framework.test import APIRequestFactory  # noqa: E402
+from softdesk import throttling  # noqa: E402
+from softdesk.projects.views import IssueViewSet  # noqa: E402
+
+ITERATIONS = 100_000
+
+
+class FakeUser(AnonymousUser):
+    is_authenticated = True
+
+    def __init__(self, pk):
+        self.pk = pk
+
+
+def bench(store, label):
+    throttling.get_bucket_store = lambda: store
+    view = IssueViewSet()
+    view.action = "list"
+    throttle = throttling.TokenBucketThrottle()
+    requests = []
+    for user_id in range(1000):
+        request = Request(APIRequestFactory().get("/issues/"))
+        request.user = FakeUser(user_id)
+        requests.append(request)
+
+    with bootstrap.timer(label, ITERATIONS):
+        for iteration in range(ITERATIONS):
+            throttle.allow_request(requests[iteration % 1000], view)
+
+
+if __name__ == "__main__":
+    bench(throttling.LocalBucketStore(), "LocalBucketStore")
+    bench(throttling.CacheBucketStore(), "CacheBucketStore (locmem)")
@@ -0,0 +1,90 @@
+"""
+Compute the open-issue workload of a manager contributing to 100 of 1k
+projects holding 1M issues, uncached, cached, and as one count per
+assignee and priority for comparison.
+"""
+
+import random
+
+import bootstrap
+
+bootstrap.setup(test_database=True)
+
+from django.db import connection  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+from softdesk.accounts.models import Contributor, SoftUser  # noqa: E402
+from softdesk.projects.models import ISSUE_PRIORITIES, Issue, Project  # noqa: E402
+from softdesk.projects.workload import (  # noqa: E402
+    assignee_workload,
+    cached_workload,
+    get_cache,
+)
+
+USERS = 1_000
+PROJECTS = 1_000
+ISSUES = 1_000_000
+MANAGER_PROJECTS = 100
+RUNS = 10
+
+
+def populate() -> list[int]:
+    users = SoftUser.objects.bulk_create(
+        SoftUser(
+            username=f"user{number}",
+            email=f"user{number}@mail.com",
+            birthdate="2000-01-01",
+        )
+        for number in range(USERS)
+    )
+    projects = Project.objects.bulk_create(
+        Project(name=f"Project {number}", author=users[0], type="BAE")
+        for number in range(PROJECTS)
+    )
+    Contributor.objects.bulk_create(
+        Contributor(user=users[0], project=project)
+        for project in projects[:MANAGER_PROJECTS]
+    )
+    priorities = [value for value, _ in ISSUE_PRIORITIES]
+    statuses = ["TODO", "WIP", "END"]
+    for start in range(0, ISSUES, 10_000):
+        Issue.objects.bulk_create(
+            Issue(
+                name=f"Issue {number}",
+                project=random.choice(projects),
+                author=users[0],
+                assign_to=random.choice(users),
+                status=random.choice(statuses),
+                priority=random.choice(priorities),
+            )
+            for number in range(start, start + 10_000)
+        )
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+    return [project.pk for project in projects[:MANAGER_PROJECTS]]
+
+
+def count_per_assignee(project_ids: list[int]) -> int:
+    issues = Issue.objects.filter(project_id__in=project_ids).exclude(status="END")
+    counts = 0
+    for user_id in SoftUser.objects.values_list("pk", flat=True):
+        for priority, _ in ISSUE_PRIORITIES:
+            counts += issues.filter(assign_to_id=user_id, priority=priority).count()
+    return counts
+
+
+if __name__ == "__main__":
+    random.seed(0)
+    with bootstrap.timer(f"insert {ISSUES} issues"):
+        project_ids = populate()
+    with CaptureQueriesContext(connection) as queries:
+        with bootstrap.timer("grouped query", RUNS):
+            for _ in range(RUNS):
+                workload = assignee_workload(project_ids)
+    print(f"{len(workload)} assignees, {len(queries) // RUNS} query each")
+    get_cache().clear()
+    cached_workload(project_ids)
+    with bootstrap.timer("cached", RUNS):
+        for _ in range(RUNS):
+            cached_workload(project_ids)
+    with bootstrap.timer(f"one count per assignee and priority, {USERS} users"):
+        count_per_assignee(project_ids)
@@ -1,10 +1,13 @@
 from django.contrib import admin
 
+from softdesk.filters import PrefixSearchMixin
+from softdesk.pagination import EstimatedCountPaginator
+
 from .models import SoftUser, Contributor
 
 
 @admin.register(SoftUser)
-class SoftUserAdmin(admin.ModelAdmin):
+class SoftUserAdmin(PrefixSearchMixin, admin.ModelAdmin):
     model = SoftUser
     list_display = (
         "username",
@@ -14,12 +17,18 @@ class SoftUserAdmin(admin.ModelAdmin):
         "can_be_contacted",
         "can_be_shared",
     )
-    search_fields = ("username", "email")
+    search_fields = ("^username_lower", "^email_lower")
     list_filter = ("can_be_contacted", "can_be_shared")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 @admin.register(Contributor)
-class ContributorAdmin(admin.ModelAdmin):
+class ContributorAdmin(PrefixSearchMixin, admin.ModelAdmin):
     model = Contributor
     list_display = ("user", "project", "date_joined")
-    search_fields = ("user", "project")
+    list_select_related = ("user", "project")
+    search_fields = ("^user__username_lower", "^project__name_lower")
+    autocomplete_fields = ("user", "project")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class AccountsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "softdesk.accounts"
+
+    def ready(self):
+        from softdesk.accounts import graph  # noqa: F401
@@ -0,0 +1,18 @@
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+
+class OptionalJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication treating invalid or expired tokens as anonymous
+    instead of rejecting the request.
+
+    Used on the token endpoints, which must stay reachable with a stale
+    token, to tell authenticated callers apart for throttling.
+    """
+
+    def authenticate(self, request):
+        try:
+            return super().authenticate(request)
+        except (AuthenticationFailed, InvalidToken):
+            return None
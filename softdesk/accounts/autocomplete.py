@@ -0,0 +1,103 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Q
+
+from softdesk.accounts.graph import get_contributor_graph
+from softdesk.accounts.models import Contributor, SoftUser
+from softdesk.filters import prefix_filter
+
+FIELDS = ("username", "email")
+
+
+def rank(user: dict, prefix: str) -> tuple:
+    """
+    Sort key of a user matching `prefix`: username matches first, by
+    username, then email matches, by email.
+    """
+    username = user["username"].lower()
+    if username.startswith(prefix):
+        return (0, username, user["id"])
+    return (1, user["email"].lower(), user["id"])
+
+
+def matches(user: dict, prefix: str) -> bool:
+    return any(user.get(field, "").lower().startswith(prefix) for field in FIELDS)
+
+
+def visible_users(user_id: int) -> Q:
+    """
+    Users `user_id` may look up: those sharing their profile and those
+    contributing to a project with them.
+    """
+    project_ids = list(get_contributor_graph().project_ids(user_id))
+    return Q(can_be_shared=True) | Q(
+        pk__in=Contributor.objects.filter(project_id__in=project_ids).values("user_id")
+    )
+
+
+def search_users(user_id: int, prefix: str, limit: int) -> list[dict]:
+    """
+    The first `limit` users visible to `user_id` whose username or email
+    starts with the lowercase `prefix`, whatever their case, in `rank`
+    order.
+
+    Each field is read through the index of its lowercase copy, one range
+    query walked in index order and stopped after `limit` visible users, so
+    the cost does not depend on the number of users matching the prefix.
+
+    Users who do not share their profile are only matched by username,
+    and returned without their email.
+    """
+    visible = {
+        "username": visible_users(user_id),
+        "email": Q(can_be_shared=True),
+    }
+    users = {}
+    for field in FIELDS:
+        column = f"{field}_lower"
+        rows = (
+            SoftUser.objects.filter(prefix_filter(column, prefix), visible[field])
+            .order_by(column, "pk")
+            .values("id", "username", "email", "can_be_shared")[:limit]
+        )
+        for row in rows:
+            if not row.pop("can_be_shared"):
+                del row["email"]
+            users[row["id"]] = row
+    return sorted(users.values(), key=lambda user: rank(user, prefix))[:limit]
+
+
+def cache_key(user_id: int, prefix: str) -> str:
+    # Hashed: prefixes may hold characters cache backends reject in keys.
+    digest = hashlib.sha1(prefix.encode()).hexdigest()
+    return f"autocomplete:{user_id}:{digest}"
+
+
+def autocomplete(user_id: int, query: str) -> list[dict]:
+    """
+    `search_users` for the prefix `query`, cached per user and prefix for
+    `AUTOCOMPLETE["CACHE_TIMEOUT"]` seconds.
+
+    As a prefix is typed, the results of a shorter prefix are filtered
+    instead of querying again, when they held every matching user.
+    """
+    config = settings.AUTOCOMPLETE
+    limit = config["MAX_RESULTS"]
+    prefix = query.lower()
+    cache = caches[config["CACHE_ALIAS"]]
+    keys = [cache_key(user_id, prefix[:length]) for length in range(len(prefix), 0, -1)]
+    cached = cache.get_many(keys)
+    if keys[0] in cached:
+        return cached[keys[0]]
+    shorter = next((cached[key] for key in keys[1:] if key in cached), None)
+    if shorter is not None and len(shorter) < limit:
+        users = sorted(
+            (user for user in shorter if matches(user, prefix)),
+            key=lambda user: rank(user, prefix),
+        )
+    else:
+        users = search_users(user_id, prefix, limit)
+    cache.set(keys[0], users, config["CACHE_TIMEOUT"])
+    return users
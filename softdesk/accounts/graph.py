@@ -0,0 +1,209 @@
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Iterable
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from softdesk.accounts.models import Contributor, SoftUser
+
+
+def contains(ids: array, value: int) -> bool:
+    index = bisect_left(ids, value)
+    return index < len(ids) and ids[index] == value
+
+
+class ContributorGraph:
+    """
+    In-process index of the contributor relation: the ids of the projects of
+    each user and of the contributors of each project, as sorted arrays of
+    64-bit integers.
+
+    Entries are loaded lazily from `Contributor`, at most `max_entries` per
+    side, least recently used first out. `Contributor` changes made by this
+    process are applied to the cached entries by `record_memberships`.
+    Entries are reloaded after `ttl` seconds, which bounds how long changes
+    made by other processes go unnoticed.
+    """
+
+    def __init__(self, max_entries: int = 100_000, ttl: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._projects = OrderedDict()
+        self._contributors = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, entries: OrderedDict, key: int, field: str, value_field: str):
+        now = time.monotonic()
+        with self._lock:
+            entry = entries.get(key)
+            if entry is not None and entry[0] > now:
+                entries.move_to_end(key)
+                return entry[1]
+        ids = array(
+            "q",
+            Contributor.objects.filter(**{field: key})
+            .order_by(value_field)
+            .values_list(value_field, flat=True),
+        )
+        self._put(entries, key, ids, now)
+        return ids
+
+    def _put(
+        self, entries: OrderedDict, key: int, ids: array, now: float | None = None
+    ):
+        expires = (time.monotonic() if now is None else now) + self.ttl
+        with self._lock:
+            entries[key] = (expires, ids)
+            entries.move_to_end(key)
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+
+    def project_ids(self, user_id: int) -> array:
+        """
+        Sorted ids of the projects `user_id` contributes to.
+        """
+        return self._get(self._projects, user_id, "user_id", "project_id")
+
+    def contributor_ids(self, project_id: int) -> array:
+        """
+        Sorted ids of the contributors of `project_id`.
+        """
+        return self._get(self._contributors, project_id, "project_id", "user_id")
+
+    def is_contributor(self, user_id: int | None, project_id: int) -> bool:
+        if user_id is None:
+            return False
+        with self._lock:
+            cached = project_id in self._contributors or user_id not in self._projects
+        if cached:
+            return contains(self.contributor_ids(project_id), user_id)
+        return contains(self.project_ids(user_id), project_id)
+
+    def discard(self, user_id: int | None = None, project_id: int | None = None):
+        with self._lock:
+            self._projects.pop(user_id, None)
+            self._contributors.pop(project_id, None)
+
+    def _update(self, user_id: int, project_id: int, added: bool):
+        # Cached arrays are replaced rather than changed, as callers may be
+        # reading them.
+        with self._lock:
+            for entries, key, value in (
+                (self._projects, user_id, project_id),
+                (self._contributors, project_id, user_id),
+            ):
+                entry = entries.get(key)
+                if entry is None or contains(entry[1], value) == added:
+                    continue
+                ids = array("q", entry[1])
+                index = bisect_left(ids, value)
+                if added:
+                    ids.insert(index, value)
+                else:
+                    del ids[index]
+                entries[key] = (entry[0], ids)
+
+    def add(self, user_id: int, project_id: int):
+        """
+        Add a membership to the cached entries it belongs to.
+        """
+        self._update(user_id, project_id, added=True)
+
+    def remove(self, user_id: int, project_id: int):
+        """
+        Remove a membership from the cached entries it belongs to.
+        """
+        self._update(user_id, project_id, added=False)
+
+    def clear(self):
+        with self._lock:
+            self._projects.clear()
+            self._contributors.clear()
+
+
+@lru_cache(maxsize=None)
+def get_contributor_graph() -> ContributorGraph:
+    """
+    Return the graph of this process, configured by `CONTRIBUTOR_GRAPH`.
+    """
+    config = getattr(settings, "CONTRIBUTOR_GRAPH", {})
+    return ContributorGraph(
+        max_entries=config.get("MAX_ENTRIES", 100_000), ttl=config.get("TTL", 60.0)
+    )
+
+
+def reset_contributor_graph(*, setting, **kwargs):
+    if setting == "CONTRIBUTOR_GRAPH":
+        get_contributor_graph.cache_clear()
+
+
+setting_changed.connect(reset_contributor_graph)
+
+
+def record_memberships(memberships: Iterable[tuple[int, int]], added: bool = True):
+    """
+    Report (user id, project id) memberships added, or removed, to the graph.
+
+    The cached entries are updated in place once the change is committed.
+    Within a transaction they are dropped first, so the transaction reads
+    its own changes from the database.
+    """
+    graph = get_contributor_graph()
+    memberships = list(memberships)
+    if transaction.get_connection().in_atomic_block:
+        for user_id, project_id in memberships:
+            graph.discard(user_id, project_id)
+    update = graph.add if added else graph.remove
+
+    def update_graph():
+        for user_id, project_id in memberships:
+            update(user_id, project_id)
+
+    transaction.on_commit(update_graph)
+
+
+@receiver(post_save, sender=Contributor)
+def contributor_saved(sender, instance: Contributor, created: bool, **kwargs):
+    if created:
+        record_memberships([(instance.user_id, instance.project_id)])
+
+
+@receiver(post_delete, sender=Contributor)
+def contributor_deleted(sender, instance: Contributor, **kwargs):
+    record_memberships([(instance.user_id, instance.project_id)], added=False)
+
+
+@receiver(m2m_changed, sender=Contributor)
+def contributors_changed(
+    sender, instance, action: str, reverse: bool, pk_set, **kwargs
+):
+    # Project.contributors and SoftUser.contributed_projects add, remove and
+    # clear Contributor rows in bulk, without post_save and post_delete.
+    if action == "post_clear":
+        get_contributor_graph().clear()
+    elif action in ("post_add", "post_remove"):
+        record_memberships(
+            ((instance.pk, pk) if reverse else (pk, instance.pk) for pk in pk_set),
+            added=action == "post_add",
+        )
+
+
+@receiver(post_save, sender=SoftUser)
+def user_created(sender, instance: SoftUser, created: bool, **kwargs):
+    # A new user has no project yet, whatever a reused id was cached with.
+    if created:
+        get_contributor_graph().discard(user_id=instance.pk)
+
+
+@receiver(post_save, sender="projects.Project")
+def project_created(sender, instance, created: bool, **kwargs):
+    if created:
+        get_contributor_graph().discard(project_id=instance.pk)
@@ -0,0 +1,29 @@
+# Generated by Django 5.0.14 on 2026-10-19 11:07
+
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0005_alter_softuser_email"),
+        ("auth", "0012_alter_user_first_name_max_length"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="softuser",
+            index=models.Index(
+                django.db.models.functions.comparison.Collate("username", "nocase"),
+                name="softuser_username_nocase_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="softuser",
+            index=models.Index(
+                django.db.models.functions.comparison.Collate("email", "nocase"),
+                name="softuser_email_nocase_idx",
+            ),
+        ),
+    ]
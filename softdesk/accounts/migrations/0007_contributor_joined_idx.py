@@ -0,0 +1,25 @@
+# Generated by Django 5.0.14 on 2026-10-19 11:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0006_nocase_search_indexes"),
+        ("projects", "0015_issue_workload_idx"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="contributor",
+            index=models.Index(fields=["-date_joined"], name="contributor_joined_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="contributor",
+            index=models.Index(
+                fields=["project", "-date_joined"],
+                name="contributor_project_joined_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.0.14 on 2026-10-19 14:02
+
+from django.db import migrations, models
+
+
+def fill_lowercase_columns(apps, schema_editor):
+    # In Python rather than with LOWER(), which SQLite limits to ASCII.
+    SoftUser = apps.get_model("accounts", "SoftUser")
+    users = []
+    for user in SoftUser.objects.only("username", "email").iterator():
+        user.username_lower = user.username.lower()
+        user.email_lower = user.email.lower()
+        users.append(user)
+    SoftUser.objects.bulk_update(
+        users, ["username_lower", "email_lower"], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0007_contributor_joined_idx"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="softuser",
+            name="softuser_username_nocase_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="softuser",
+            name="softuser_email_nocase_idx",
+        ),
+        migrations.AddField(
+            model_name="softuser",
+            name="email_lower",
+            field=models.CharField(default="", editable=False, max_length=254),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="softuser",
+            name="username_lower",
+            field=models.CharField(default="", editable=False, max_length=150),
+            preserve_default=False,
+        ),
+        migrations.RunPython(fill_lowercase_columns, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="softuser",
+            index=models.Index(
+                fields=["username_lower"], name="softuser_username_lower_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="softuser",
+            index=models.Index(fields=["email_lower"], name="softuser_email_lower_idx"),
+        ),
+    ]
@@ -20,6 +20,31 @@ class SoftUser(AbstractUser):
     updated_on = models.DateTimeField(auto_now=True)
     can_be_contacted = models.BooleanField(default=True)
     can_be_shared = models.BooleanField(default=True)
+    # Lowercase copies of the username and email, set by save(), so that
+    # case-insensitive prefix searches are range scans of plain indexes.
+    username_lower = models.CharField(max_length=150, editable=False)
+    email_lower = models.CharField(max_length=254, editable=False)
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(fields=["username_lower"], name="softuser_username_lower_idx"),
+            models.Index(fields=["email_lower"], name="softuser_email_lower_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.username_lower = self.username.lower()
+        self.email_lower = self.email.lower()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = {
+                *update_fields,
+                *(
+                    f"{field}_lower"
+                    for field in ("username", "email")
+                    if field in update_fields
+                ),
+            }
+        super().save(*args, **kwargs)
 
 
 class Contributor(models.Model):
@@ -30,3 +55,10 @@ class Contributor(models.Model):
     class Meta:
         unique_together = ["user", "project"]
         ordering = ["-date_joined"]
+        indexes = [
+            models.Index(fields=["-date_joined"], name="contributor_joined_idx"),
+            models.Index(
+                fields=["project", "-date_joined"],
+                name="contributor_project_joined_idx",
+            ),
+        ]
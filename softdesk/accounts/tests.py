@@ -0,0 +1,425 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from softdesk.accounts.autocomplete import search_users
+from softdesk.accounts.graph import ContributorGraph, get_contributor_graph
+from softdesk.accounts.models import Contributor, SoftUser
+from softdesk.filters import prefix_filter
+from softdesk.pagination import EstimatedCountPaginator
+from softdesk.projects.models import Issue, Project
+from softdesk.projects.services import create_project, create_projects, update_issues
+from softdesk.projects.workload import get_cache
+
+
+class AdminChangelistTestCase(TestCase):
+    def setUp(self):
+        self.admin_user = SoftUser.objects.create_superuser(
+            username="admin",
+            email="admin@mail.com",
+            password="adminpassword",
+            birthdate="2000-01-01",
+        )
+        self.client.force_login(self.admin_user)
+
+    def add_users(self, count: int, start: int = 0) -> list[SoftUser]:
+        users = SoftUser.objects.bulk_create(
+            SoftUser(
+                username=f"user{number}",
+                username_lower=f"user{number}",
+                email=f"user{number}@mail.com",
+                email_lower=f"user{number}@mail.com",
+                birthdate="2000-01-01",
+            )
+            for number in range(start, start + count)
+        )
+        project = Project.objects.create(
+            name=f"Project {start}", author=self.admin_user, type="BAE"
+        )
+        Contributor.objects.bulk_create(
+            Contributor(user=user, project=project) for user in users
+        )
+        return users
+
+    def count_queries(self, url: str, **params) -> int:
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def test_changelist_queries_do_not_depend_on_rows(self):
+        for name in (
+            "admin:accounts_softuser_changelist",
+            "admin:accounts_contributor_changelist",
+        ):
+            with self.subTest(name=name):
+                self.add_users(3, start=len(SoftUser.objects.all()) * 100)
+                few = self.count_queries(reverse(name))
+                self.add_users(40, start=len(SoftUser.objects.all()) * 100)
+                self.assertEqual(self.count_queries(reverse(name)), few)
+
+    def test_search_uses_username_and_project_name_prefixes(self):
+        self.add_users(3)
+        response = self.client.get(
+            reverse("admin:accounts_contributor_changelist"), {"q": "USER1"}
+        )
+        self.assertEqual(
+            [
+                contributor.user.username
+                for contributor in response.context["cl"].result_list
+            ],
+            ["user1"],
+        )
+        response = self.client.get(
+            reverse("admin:accounts_contributor_changelist"), {"q": "project"}
+        )
+        self.assertEqual(response.context["cl"].result_count, 4)
+        response = self.client.get(
+            reverse("admin:accounts_softuser_changelist"), {"q": "er1"}
+        )
+        self.assertEqual(response.context["cl"].result_count, 0)
+
+    def test_large_tables_use_estimated_count(self):
+        self.add_users(12)
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        with override_settings(PAGINATION_EXACT_COUNT_LIMIT=5):
+            paginator = EstimatedCountPaginator(SoftUser.objects.order_by("pk"), 5)
+            self.assertEqual(paginator.count, 13)
+            paginator = EstimatedCountPaginator(
+                SoftUser.objects.filter(username__startswith="user").order_by("pk"), 5
+            )
+            self.assertEqual(paginator.count, 6)
+
+
+class ContributorGraphTestCase(TestCase):
+    def setUp(self):
+        self.graph = get_contributor_graph()
+        self.users = [
+            SoftUser.objects.create(
+                username=f"user{number}",
+                email=f"user{number}@mail.com",
+                birthdate="2000-01-01",
+            )
+            for number in range(3)
+        ]
+        self.project = Project.objects.create(
+            name="Graph Project", author=self.users[0], type="BAE"
+        )
+
+    def test_entries_are_loaded_once(self):
+        with self.assertNumQueries(1):
+            self.assertTrue(
+                self.graph.is_contributor(self.users[0].pk, self.project.pk)
+            )
+            self.assertFalse(
+                self.graph.is_contributor(self.users[1].pk, self.project.pk)
+            )
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                list(self.graph.project_ids(self.users[0].pk)), [self.project.pk]
+            )
+            self.assertEqual(
+                list(self.graph.project_ids(self.users[0].pk)), [self.project.pk]
+            )
+
+    def test_membership_changes_are_seen(self):
+        self.graph.contributor_ids(self.project.pk)
+        self.graph.project_ids(self.users[1].pk)
+        self.project.contributors.add(self.users[1])
+        Contributor.objects.create(project=self.project, user=self.users[2])
+        self.assertEqual(
+            list(self.graph.contributor_ids(self.project.pk)),
+            [user.pk for user in self.users],
+        )
+        self.assertTrue(self.graph.is_contributor(self.users[1].pk, self.project.pk))
+        self.users[1].contributed_projects.remove(self.project)
+        Contributor.objects.filter(user=self.users[2]).delete()
+        self.assertEqual(
+            list(self.graph.contributor_ids(self.project.pk)), [self.users[0].pk]
+        )
+        self.assertEqual(list(self.graph.project_ids(self.users[1].pk)), [])
+
+    def test_committed_changes_update_cached_entries_in_place(self):
+        self.graph.contributor_ids(self.project.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.contributors.add(self.users[1])
+        self.graph.contributor_ids(self.project.pk)
+        self.graph.add(self.users[2].pk, self.project.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                list(self.graph.contributor_ids(self.project.pk)),
+                [user.pk for user in self.users],
+            )
+        self.graph.remove(self.users[0].pk, self.project.pk)
+        self.assertFalse(self.graph.is_contributor(self.users[0].pk, self.project.pk))
+
+    def test_entries_are_bounded_and_expire(self):
+        graph = ContributorGraph(max_entries=2, ttl=0)
+        for user in self.users:
+            graph.project_ids(user.pk)
+        self.assertEqual(len(graph._projects), 2)
+        with self.assertNumQueries(1):
+            graph.project_ids(self.users[2].pk)
+        graph = ContributorGraph(max_entries=2, ttl=60)
+        graph.project_ids(self.users[0].pk)
+        with self.assertNumQueries(0):
+            graph.project_ids(self.users[0].pk)
+
+    def test_writes_are_not_authorized_by_stale_entries(self):
+        self.project.contributors.add(self.users[1])
+        issue = Issue.objects.create(
+            name="Stale Issue",
+            project=self.project,
+            author=self.users[1],
+            assign_to=self.users[1],
+        )
+        # Removed by another process: this one still has it cached.
+        self.project.contributors.remove(self.users[1])
+        self.graph.contributor_ids(self.project.pk)
+        self.graph.project_ids(self.users[1].pk)
+        self.graph.add(self.users[1].pk, self.project.pk)
+        self.addCleanup(self.graph.clear)
+        client = APIClient()
+        client.force_authenticate(user=self.users[1])
+
+        url = reverse("issue-detail", args=[issue.pk])
+        self.assertEqual(client.get(url).status_code, 200)
+        self.assertEqual(client.patch(url, {"name": "Renamed"}).status_code, 403)
+        for url, data in (
+            (reverse("issue-list"), {"project": self.project.pk}),
+            (reverse("project-issue-list", args=[self.project.pk]), {}),
+        ):
+            with self.subTest(url):
+                response = client.post(url, {"name": "New Issue", **data})
+                self.assertEqual(response.status_code, 403)
+
+    def test_assignees_are_not_validated_against_stale_entries(self):
+        issue = Issue.objects.create(
+            name="Stale Issue",
+            project=self.project,
+            author=self.users[0],
+            assign_to=self.users[0],
+        )
+        # users[1] never contributed, but this process believes it does.
+        self.graph.contributor_ids(self.project.pk)
+        self.graph.project_ids(self.users[1].pk)
+        self.graph.add(self.users[1].pk, self.project.pk)
+        self.addCleanup(self.graph.clear)
+        client = APIClient()
+        client.force_authenticate(user=self.users[0])
+
+        response = client.patch(
+            reverse("issue-detail", args=[issue.pk]), {"assign_to": self.users[1].pk}
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data["assign_to"],
+            ["Assignee must be a contributor of the project."],
+        )
+
+    def test_lists_are_scoped_to_the_projects_of_the_user(self):
+        create_projects(
+            [Project(name="Other Project", author=self.users[1], type="AND")]
+        )
+        client = APIClient()
+        client.force_authenticate(user=self.users[0])
+        response = client.get(reverse("project-list"))
+        self.assertEqual(
+            [project["id"] for project in response.data["results"]], [self.project.pk]
+        )
+        response = client.get(reverse("issue-list"))
+        self.assertEqual(response.data["count"], 0)
+
+
+class WorkloadTestCase(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        self.users = [
+            SoftUser.objects.create(
+                username=f"user{number}",
+                email=f"user{number}@mail.com",
+                birthdate="2000-01-01",
+            )
+            for number in range(3)
+        ]
+        self.manager, self.first, self.second = self.users
+        self.project = create_project(name="Workload Project", author=self.manager)
+        self.project.contributors.add(self.first, self.second)
+        self.hidden = create_project(name="Hidden Project", author=self.second)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.manager)
+
+    def create_issue(self, number: int, assignee, project=None, **fields) -> Issue:
+        return Issue.objects.create(
+            name=f"Issue {number}",
+            project=project or self.project,
+            author=self.manager,
+            assign_to=assignee,
+            **fields,
+        )
+
+    def workload(self) -> list:
+        response = self.client.get(reverse("softuser-workload"))
+        self.assertEqual(response.status_code, 200)
+        return response.json()["assignees"]
+
+    def test_open_issues_per_assignee_and_priority(self):
+        self.create_issue(1, self.first, priority="HIG")
+        self.create_issue(2, self.first, priority="HIG")
+        self.create_issue(3, self.first, priority="LOW")
+        self.create_issue(4, self.second, priority="MED")
+        self.create_issue(5, self.second, status="END")
+        self.create_issue(6, self.second, project=self.hidden)
+        self.assertEqual(
+            self.workload(),
+            [
+                {
+                    "user": self.first.pk,
+                    "username": "user1",
+                    "total": 3,
+                    "priorities": {"LOW": 1, "MED": 0, "HIG": 2},
+                },
+                {
+                    "user": self.second.pk,
+                    "username": "user2",
+                    "total": 1,
+                    "priorities": {"LOW": 0, "MED": 1, "HIG": 0},
+                },
+            ],
+        )
+
+    def test_workload_is_cached_until_an_issue_changes(self):
+        issue = self.create_issue(1, self.first)
+        self.assertEqual(self.workload()[0]["user"], self.first.pk)
+        with self.assertNumQueries(0):
+            self.workload()
+        with self.captureOnCommitCallbacks(execute=True):
+            issue.assign_to = self.second
+            issue.save()
+        self.assertEqual(self.workload()[0]["user"], self.second.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            update_issues(Issue.objects.filter(pk=issue.pk), status="END")
+        self.assertEqual(self.workload(), [])
+
+    def test_workload_cache_is_kept_for_changes_of_other_projects(self):
+        self.create_issue(1, self.first)
+        self.workload()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_issue(2, self.second, project=self.hidden)
+        with self.assertNumQueries(0):
+            self.workload()
+
+
+@override_settings(
+    AUTOCOMPLETE={"MAX_RESULTS": 3, "CACHE_ALIAS": "default", "CACHE_TIMEOUT": 60}
+)
+class AutocompleteTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = self.create_user("Picker", "picker@mail.com")
+        self.project = create_project(name="Shared Project", author=self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def create_user(self, username: str, email: str, **fields) -> SoftUser:
+        return SoftUser.objects.create(
+            username=username, email=email, birthdate="2000-01-01", **fields
+        )
+
+    def autocomplete(self, query: str) -> list[str]:
+        response = self.client.get(reverse("softuser-autocomplete"), {"q": query})
+        self.assertEqual(response.status_code, 200)
+        return [user["username"] for user in response.json()["results"]]
+
+    def test_prefixes_match_usernames_then_emails_whatever_the_case(self):
+        self.create_user("alice", "alice@mail.com")
+        self.create_user("Albert", "bert@mail.com")
+        self.create_user("zoe", "ALma@mail.com")
+        self.create_user("bob", "bob@mail.com")
+        self.assertEqual(self.autocomplete("AL"), ["Albert", "alice", "zoe"])
+        self.assertEqual(self.autocomplete("bo"), ["bob"])
+        self.assertEqual(self.autocomplete("nobody"), [])
+
+    def test_prefixes_are_bounded_in_code_point_order(self):
+        for username in ("bob@home", "bob_smith", "bob[1]", "bob^", "bob`", "Boba"):
+            self.create_user(username, f"{len(username)}@mail.com")
+        self.assertEqual(
+            [user["username"] for user in search_users(self.user.pk, "bob@", 10)],
+            ["bob@home"],
+        )
+        cache.clear()
+        self.assertEqual(self.autocomplete("bob@"), ["bob@home"])
+
+    def test_results_are_limited_to_visible_users(self):
+        colleague = self.create_user("private colleague", "c@mail.com")
+        self.project.contributors.add(colleague)
+        colleague.can_be_shared = False
+        colleague.save()
+        self.create_user("private stranger", "s@mail.com", can_be_shared=False)
+        self.create_user("public stranger", "p@mail.com")
+        self.assertEqual(
+            self.autocomplete("p"), ["Picker", "private colleague", "public stranger"]
+        )
+
+    def test_emails_of_colleagues_not_sharing_their_profile_are_hidden(self):
+        colleague = self.create_user(
+            "colleague", "private@mail.com", can_be_shared=False
+        )
+        self.project.contributors.add(colleague)
+        response = self.client.get(reverse("softuser-autocomplete"), {"q": "col"})
+        self.assertEqual(
+            response.json()["results"],
+            [{"id": colleague.pk, "username": "colleague"}],
+        )
+        # Nor are they matched by email, which would disclose it.
+        self.assertEqual(self.autocomplete("private"), [])
+
+    def test_lowercase_columns_follow_username_and_email_changes(self):
+        user = self.create_user("Ünïcode", "Mixed@Mail.com")
+        self.assertEqual(
+            (user.username_lower, user.email_lower), ("ünïcode", "mixed@mail.com")
+        )
+        user.username = "Renamed"
+        user.save(update_fields=["username"])
+        user.refresh_from_db()
+        self.assertEqual(user.username_lower, "renamed")
+        self.assertEqual(self.autocomplete("ren"), ["Renamed"])
+        cache.clear()
+        self.assertEqual(self.autocomplete("ÜN"), [])
+
+    def test_results_are_capped(self):
+        for number in range(5):
+            self.create_user(f"user{number}", f"user{number}@mail.com")
+        self.assertEqual(self.autocomplete("user"), ["user0", "user1", "user2"])
+
+    def test_query_is_required(self):
+        response = self.client.get(reverse("softuser-autocomplete"), {"q": " "})
+        self.assertEqual(response.status_code, 400)
+
+    def test_results_are_cached_per_prefix(self):
+        self.create_user("alice", "alice@mail.com")
+        self.create_user("alfred", "alfred@mail.com")
+        self.assertEqual(self.autocomplete("al"), ["alfred", "alice"])
+        with self.assertNumQueries(0):
+            self.assertEqual(self.autocomplete("AL"), ["alfred", "alice"])
+            # Every "al" user was found, so longer prefixes filter them.
+            self.assertEqual(self.autocomplete("ali"), ["alice"])
+
+    def test_prefixes_are_searched_through_the_lowercase_indexes(self):
+        for field, index in (
+            ("username_lower", "softuser_username_lower_idx"),
+            ("email_lower", "softuser_email_lower_idx"),
+        ):
+            plan = (
+                SoftUser.objects.filter(prefix_filter(field, "al"))
+                .order_by(field, "pk")[:10]
+                .explain()
+            )
+            self.assertRegex(
+                plan, rf"SEARCH accounts_softuser USING (COVERING )?INDEX {index} "
+            )
+            self.assertNotIn("TEMP B-TREE", plan)
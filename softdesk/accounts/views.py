@@ -1,6 +1,14 @@
-from rest_framework import viewsets, permissions
+from rest_framework import exceptions, viewsets, permissions
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework_simplejwt.views import TokenObtainPairView
+from softdesk.accounts.authentication import OptionalJWTAuthentication
+from softdesk.accounts.autocomplete import autocomplete
+from softdesk.accounts.graph import get_contributor_graph
 from softdesk.accounts.models import Contributor, SoftUser
 from softdesk.accounts.serializers import SoftUserSerializer, ContributorSerializer
+from softdesk.filters import ContributorFilter
+from softdesk.projects.workload import cached_workload
 
 
 class SoftUserViewSet(viewsets.ModelViewSet):
@@ -11,6 +19,29 @@ class SoftUserViewSet(viewsets.ModelViewSet):
     queryset = SoftUser.objects.all().order_by("-date_joined")
     serializer_class = SoftUserSerializer
     permission_classes = [permissions.IsAuthenticated]
+    autocomplete_max_length = 150
+
+    @action(detail=False)
+    def workload(self, request):
+        """
+        Open issues per assignee and priority, across the projects the user
+        contributes to.
+        """
+        project_ids = get_contributor_graph().project_ids(request.user.pk)
+        return Response({"assignees": cached_workload(project_ids)})
+
+    @action(detail=False)
+    def autocomplete(self, request):
+        """
+        Users whose username or email starts with `?q=`, among those the user
+        contributes with or who share their profile.
+        """
+        query = request.query_params.get("q", "").strip()
+        if not 0 < len(query) <= self.autocomplete_max_length:
+            raise exceptions.ValidationError(
+                {"q": [f"Use 1 to {self.autocomplete_max_length} characters."]}
+            )
+        return Response({"results": autocomplete(request.user.pk, query)})
 
 
 class ContributorViewSet(viewsets.ModelViewSet):
@@ -25,4 +56,14 @@ class ContributorViewSet(viewsets.ModelViewSet):
     )
     serializer_class = ContributorSerializer
     permission_classes = [permissions.IsAuthenticated]
-    filterset_fields = ["project_id", "user_id"]
+    filterset_class = ContributorFilter
+
+
+class ThrottledTokenObtainPairView(TokenObtainPairView):
+    """
+    API endpoint delivering JWT pairs, throttled separately for anonymous
+    and authenticated callers.
+    """
+
+    authentication_classes = [OptionalJWTAuthentication]
+    throttle_scope = "token"
@@ -0,0 +1,15 @@
+from rest_framework.authentication import BaseAuthentication
+
+
+class BatchAuthentication(BaseAuthentication):
+    """
+    Authenticate the sub-requests of a batch as its caller, from the
+    `batch_auth` (user, auth) pair set on them by `build_request` in
+    `softdesk.batch`, so that the token is not decoded again for each.
+
+    Other requests don't have that attribute and are left to the other
+    authentication classes.
+    """
+
+    def authenticate(self, request):
+        return getattr(request, "batch_auth", None)
@@ -0,0 +1,180 @@
+import io
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import connections
+from django.template.response import SimpleTemplateResponse
+from django.urls import Resolver404, resolve
+from rest_framework import permissions, serializers
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.views import APIView
+
+READ_METHODS = ("GET", "HEAD", "OPTIONS")
+# The only keys of the batch request's environ passed on to sub-requests:
+# client address, cookies and other headers come from the sub-request.
+FORWARDED_ENVIRON = ("SERVER_NAME", "SERVER_PORT", "SERVER_PROTOCOL")
+
+
+class SubRequestSerializer(serializers.Serializer):
+    method = serializers.ChoiceField(
+        choices=["GET", "HEAD", "OPTIONS", "POST", "PUT", "PATCH", "DELETE"]
+    )
+    url = serializers.RegexField(r"^/")
+    headers = serializers.DictField(child=serializers.CharField(), required=False)
+    body = serializers.JSONField(required=False)
+
+
+class BatchSerializer(serializers.Serializer):
+    requests = SubRequestSerializer(many=True, allow_empty=False)
+    parallel = serializers.BooleanField(default=False)
+
+    def validate_requests(self, requests: list) -> list:
+        limit = settings.BATCH["MAX_REQUESTS"]
+        if len(requests) > limit:
+            raise serializers.ValidationError(
+                f"Ensure this field has no more than {limit} elements."
+            )
+        return requests
+
+
+def build_request(request, method: str, url: str, headers=None, body=None):
+    """
+    Build the Django request of a sub-request of `request`, authenticated
+    as the user of `request` by `softdesk.authentication.BatchAuthentication`.
+
+    Its environ is built from scratch, with `FORWARDED_ENVIRON` only, and
+    asks for JSON whatever the `headers`, the format of the batch bodies.
+    """
+    path, _, query = url.partition("?")
+    content = b"" if body is None else json.dumps(body, cls=JSONEncoder).encode()
+    environ = {
+        key: request.META[key] for key in FORWARDED_ENVIRON if key in request.META
+    }
+    environ.update(
+        {
+            "HTTP_HOST": request.get_host(),
+            "REQUEST_METHOD": method,
+            "SCRIPT_NAME": "",
+            "PATH_INFO": path,
+            "QUERY_STRING": query,
+            "CONTENT_TYPE": "application/json",
+            "CONTENT_LENGTH": str(len(content)),
+            "wsgi.input": io.BytesIO(content),
+            "wsgi.url_scheme": request.scheme,
+        }
+    )
+    for name, value in (headers or {}).items():
+        environ[f"HTTP_{name.upper().replace('-', '_')}"] = value
+    environ["HTTP_ACCEPT"] = "application/json"
+    sub_request = WSGIRequest(environ)
+    sub_request.batch_auth = (request.user, request.auth)
+    return sub_request
+
+
+def response_body(response):
+    """
+    Body of a rendered sub-response: decoded when JSON, as text otherwise,
+    None when empty.
+    """
+    if response.streaming:
+        content = b"".join(response.streaming_content)
+    else:
+        content = response.content
+    if not content:
+        return None
+    if response.get("Content-Type", "").startswith("application/json"):
+        return json.loads(content)
+    return content.decode(response.charset, "replace")
+
+
+def dispatch(request, method: str, url: str, headers=None, body=None) -> dict:
+    """
+    Run a sub-request through the URL resolver and return its status,
+    headers and body.
+
+    The response is rendered as it would be for a client, and its body
+    read back from the rendered content, so the headers describe the body
+    returned.
+    """
+    sub_request = build_request(request, method, url, headers, body)
+    try:
+        match = resolve(sub_request.path_info)
+    except Resolver404:
+        return {"status": 404, "headers": {}, "body": {"detail": "Not found."}}
+    view_class = getattr(match.func, "cls", None)
+    if not (isinstance(view_class, type) and issubclass(view_class, APIView)):
+        return {"status": 400, "headers": {}, "body": {"detail": "Not an API URL."}}
+    if issubclass(view_class, BatchView):
+        return {
+            "status": 400,
+            "headers": {},
+            "body": {"detail": "Batches can't be nested."},
+        }
+    sub_request.resolver_match = match
+    response = match.func(sub_request, *match.args, **match.kwargs)
+    if isinstance(response, SimpleTemplateResponse):
+        response.render()
+    headers = {
+        name: value
+        for name, value in response.items()
+        if name not in ("Content-Type", "Content-Length")
+    }
+    return {
+        "status": response.status_code,
+        "headers": headers,
+        "body": response_body(response),
+    }
+
+
+def dispatch_in_thread(request, *args, **kwargs) -> dict:
+    try:
+        return dispatch(request, *args, **kwargs)
+    finally:
+        connections.close_all()
+
+
+class BatchView(APIView):
+    """
+    API endpoint running a list of API sub-requests in one round trip.
+
+    Sub-requests, `{"method", "url", "headers", "body"}` objects, are
+    resolved and dispatched in process, authenticated as the caller without
+    decoding the token again, and share the contributor graph of the
+    process for their membership checks. Their responses, `{"status",
+    "headers", "body"}` objects, come back in the same order. Each is
+    checked, throttled and committed on its own: a failing sub-request does
+    not stop the others.
+
+    Under ASGI, a batch of reads sent with `"parallel": true` runs in up to
+    `BATCH["MAX_WORKERS"]` threads. WSGI servers size their threads per
+    request, so batches they serve always run one sub-request at a time.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        serializer = BatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        sub_requests = serializer.validated_data["requests"]
+        parallel = (
+            serializer.validated_data["parallel"]
+            and isinstance(request._request, ASGIRequest)
+            and all(sub["method"] in READ_METHODS for sub in sub_requests)
+        )
+        if parallel:
+            workers = min(settings.BATCH["MAX_WORKERS"], len(sub_requests))
+            with ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="softdesk-batch"
+            ) as executor:
+                responses = list(
+                    executor.map(
+                        lambda sub: dispatch_in_thread(request, **sub), sub_requests
+                    )
+                )
+        else:
+            responses = [dispatch(request, **sub) for sub in sub_requests]
+        return Response({"responses": responses})
@@ -1,12 +1,136 @@
 import django_filters
-from softdesk.projects.models import Comment
+from django.db.models import Q
+from softdesk.accounts.models import Contributor
+from softdesk.projects.models import (
+    ArchivedComment,
+    ArchivedIssue,
+    Comment,
+    Issue,
+    Project,
+)
 
 
-class CommentFilter(django_filters.FilterSet):
+def prefix_filter(field: str, prefix: str) -> Q:
+    """
+    Rows whose lowercase `field` starts with the lowercase `prefix`.
+
+    The lookup is bounded by the range of strings starting with `prefix`,
+    in code point order, so that an index on `field` is searched instead
+    of scanned: SQLite does not use plain indexes for LIKE.
+    """
+    condition = Q(**{f"{field}__startswith": prefix, f"{field}__gte": prefix})
+    last = ord(prefix[-1])
+    if last < 0x10FFFF:
+        condition &= Q(**{f"{field}__lt": prefix[:-1] + chr(last + 1)})
+    return condition
+
+
+class PrefixSearchMixin:
+    """
+    Admin searching the lowercase columns of `search_fields` for values
+    starting with the lowercase search term, with `prefix_filter`.
+    """
+
+    def get_search_results(self, request, queryset, search_term):
+        prefix = search_term.strip().lower()
+        if not prefix:
+            return queryset, False
+        condition = Q()
+        for field in self.get_search_fields(request):
+            condition |= prefix_filter(field.removeprefix("^"), prefix)
+        return queryset.filter(condition), False
+
+
+class NumberInFilter(django_filters.BaseInFilter, django_filters.NumberFilter):
+    pass
+
+
+class DateRangeFilterSet(django_filters.FilterSet):
+    """
+    Range filters on the creation and last update dates, each served by an
+    index of the filtered tables starting or ending with that date.
+    """
+
+    created_after = django_filters.IsoDateTimeFilter(
+        field_name="created_on", lookup_expr="gte"
+    )
+    created_before = django_filters.IsoDateTimeFilter(
+        field_name="created_on", lookup_expr="lt"
+    )
+    updated_since = django_filters.IsoDateTimeFilter(
+        field_name="updated_on", lookup_expr="gte"
+    )
+
+
+class ProjectFilter(DateRangeFilterSet):
+    class Meta:
+        model = Project
+        fields = {"id": ["in"], "author": ["exact"], "type": ["exact", "in"]}
+
+
+class IssueFilter(DateRangeFilterSet):
+    # Ids are not looked up: unknown ones just match nothing.
+    project_id = django_filters.NumberFilter(label="Project ID")
+    project_id__in = NumberInFilter(
+        field_name="project_id", lookup_expr="in", label="Project IDs"
+    )
+    assign_to_id = django_filters.NumberFilter(label="Assignee ID")
+
+    class Meta:
+        model = Issue
+        fields = {
+            "status": ["exact", "in"],
+            "priority": ["exact", "in"],
+            "tag": ["exact", "in"],
+        }
+
+
+class CommentFilter(DateRangeFilterSet):
     project_id = django_filters.NumberFilter(
         field_name="issue__project__id", label="Project ID"
     )
+    project_id__in = NumberInFilter(
+        field_name="issue__project__id", lookup_expr="in", label="Project IDs"
+    )
 
     class Meta:
         model = Comment
         fields = ["author", "issue", "project_id"]
+
+
+class ContributorFilter(django_filters.FilterSet):
+    project_id = django_filters.NumberFilter(label="Project ID")
+    project_id__in = NumberInFilter(
+        field_name="project_id", lookup_expr="in", label="Project IDs"
+    )
+    user_id = django_filters.NumberFilter(label="User ID")
+    created_after = django_filters.IsoDateTimeFilter(
+        field_name="date_joined", lookup_expr="gte"
+    )
+    created_before = django_filters.IsoDateTimeFilter(
+        field_name="date_joined", lookup_expr="lt"
+    )
+
+    class Meta:
+        model = Contributor
+        fields = ["project_id", "user_id"]
+
+
+class ArchivedIssueFilter(IssueFilter):
+    class Meta(IssueFilter.Meta):
+        model = ArchivedIssue
+
+
+class ArchivedCommentFilter(DateRangeFilterSet):
+    author = django_filters.NumberFilter(field_name="author_id")
+    issue = django_filters.NumberFilter(field_name="issue_id")
+    project_id = django_filters.NumberFilter(
+        field_name="issue__project__id", label="Project ID"
+    )
+    project_id__in = NumberInFilter(
+        field_name="issue__project__id", lookup_expr="in", label="Project IDs"
+    )
+
+    class Meta:
+        model = ArchivedComment
+        fields = ["author", "issue", "project_id"]
@@ -0,0 +1,247 @@
+import gzip
+import logging
+import time
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+logger = logging.getLogger("softdesk.compression")
+
+# Hard caps on the level of each encoding: higher levels cost a lot of CPU
+# for a few percent of size, so settings can lower them but never go above.
+MAX_LEVELS = {"zstd": 6, "br": 5, "gzip": 6}
+
+
+class GzipCodec:
+    name = "gzip"
+
+    def __init__(self, level: int):
+        self.level = level
+
+    def compress(self, data: bytes) -> bytes:
+        return gzip.compress(data, compresslevel=self.level, mtime=0)
+
+    def compressor(self):
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        return (
+            compressor.compress,
+            lambda: compressor.flush(zlib.Z_SYNC_FLUSH),
+            compressor.flush,
+        )
+
+
+class BrotliCodec:
+    name = "br"
+
+    def __init__(self, level: int):
+        self.level = level
+
+    def compress(self, data: bytes) -> bytes:
+        return brotli.compress(data, quality=self.level)
+
+    def compressor(self):
+        compressor = brotli.Compressor(quality=self.level)
+        return compressor.process, compressor.flush, compressor.finish
+
+
+class ZstdCodec:
+    name = "zstd"
+
+    def __init__(self, level: int):
+        self.level = level
+
+    def compress(self, data: bytes) -> bytes:
+        return zstandard.ZstdCompressor(level=self.level).compress(data)
+
+    def compressor(self):
+        compressor = zstandard.ZstdCompressor(level=self.level).compressobj()
+        return (
+            compressor.compress,
+            lambda: compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK),
+            compressor.flush,
+        )
+
+
+def available_codecs() -> dict:
+    """
+    Return the codec classes usable in this environment, by preference.
+    """
+    codecs = {}
+    if zstandard is not None:
+        codecs["zstd"] = ZstdCodec
+    if brotli is not None:
+        codecs["br"] = BrotliCodec
+    codecs["gzip"] = GzipCodec
+    return codecs
+
+
+def parse_accept_encoding(header: str) -> dict[str, float]:
+    """
+    Parse an Accept-Encoding header into a {coding: quality} mapping.
+    """
+    accepted = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding] = quality
+    return accepted
+
+
+class CompressionMiddleware:
+    """
+    Compress responses with the best encoding accepted by the client.
+
+    Supports zstd and brotli when their packages are installed, and gzip.
+    Bodies smaller than `COMPRESSION_MIN_SIZE` bytes are sent as is; for
+    streaming responses the first chunks are buffered until the threshold is
+    reached or the stream ends. Levels come from `COMPRESSION_LEVELS`,
+    clamped to `MAX_LEVELS`.
+
+    The compression ratio and the CPU time spent compressing are logged on
+    the `softdesk.compression` logger, and also sent in a `Server-Timing`
+    header for non-streaming responses.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.min_size = getattr(settings, "COMPRESSION_MIN_SIZE", 1024)
+        levels = getattr(settings, "COMPRESSION_LEVELS", {})
+        self.codecs = {
+            name: codec_class(min(levels.get(name, MAX_LEVELS[name]), MAX_LEVELS[name]))
+            for name, codec_class in available_codecs().items()
+        }
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        return self.process_response(request, response)
+
+    def select_codec(self, request):
+        accepted = parse_accept_encoding(request.headers.get("Accept-Encoding", ""))
+        default_quality = accepted.get("*", 0.0)
+        best, best_quality = None, 0.0
+        for name, codec in self.codecs.items():
+            quality = accepted.get(name, default_quality)
+            if quality > best_quality:
+                best, best_quality = codec, quality
+        return best
+
+    def process_response(self, request, response):
+        if response.status_code in (204, 206, 304) or response.has_header(
+            "Content-Encoding"
+        ):
+            return response
+        patch_vary_headers(response, ("Accept-Encoding",))
+        codec = self.select_codec(request)
+        if codec is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                return response
+            head, chunks = self._peek(response.streaming_content)
+            if not chunks and len(head) < self.min_size:
+                response.streaming_content = [head]
+                return response
+            response.streaming_content = self._compress_stream(
+                request, codec, head, chunks
+            )
+            del response.headers["Content-Length"]
+        else:
+            if len(response.content) < self.min_size:
+                return response
+            started = time.thread_time()
+            compressed = codec.compress(response.content)
+            cpu_time = time.thread_time() - started
+            if len(compressed) >= len(response.content):
+                return response
+            self._record(
+                request, codec, len(response.content), len(compressed), cpu_time
+            )
+            response["Server-Timing"] = (
+                f'compression;dur={cpu_time * 1000:.3f};desc="{codec.name} '
+                f'{len(response.content) / len(compressed):.2f}x"'
+            )
+            response.content = compressed
+            response["Content-Length"] = str(len(compressed))
+
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+        response["Content-Encoding"] = codec.name
+        return response
+
+    def _peek(self, streaming_content):
+        """
+        Buffer chunks until `min_size` bytes were read or the stream ended.
+        Returns the buffered bytes and the iterator, or None once exhausted.
+        """
+        chunks = iter(streaming_content)
+        head = b""
+        for chunk in chunks:
+            head += chunk
+            if len(head) >= self.min_size:
+                return head, chunks
+        return head, None
+
+    def _compress_stream(self, request, codec, head, chunks):
+        compress, flush, finish = codec.compressor()
+        raw_size = compressed_size = 0
+        cpu_time = 0.0
+        for chunk in _chain(head, chunks or ()):
+            started = time.thread_time()
+            data = compress(chunk) + flush()
+            cpu_time += time.thread_time() - started
+            raw_size += len(chunk)
+            compressed_size += len(data)
+            if data:
+                yield data
+        started = time.thread_time()
+        data = finish()
+        cpu_time += time.thread_time() - started
+        compressed_size += len(data)
+        self._record(request, codec, raw_size, compressed_size, cpu_time)
+        yield data
+
+    def _record(self, request, codec, raw_size, compressed_size, cpu_time):
+        logger.info(
+            "Compressed %s from %d to %d bytes with %s in %.3fms",
+            request.path,
+            raw_size,
+            compressed_size,
+            codec.name,
+            cpu_time * 1000,
+            extra={
+                "encoding": codec.name,
+                "raw_size": raw_size,
+                "compressed_size": compressed_size,
+                "compression_ratio": (
+                    raw_size / compressed_size if compressed_size else 0
+                ),
+                "cpu_time": cpu_time,
+            },
+        )
+
+
+def _chain(head, chunks):
+    yield head
+    yield from chunks
@@ -0,0 +1,21 @@
+from django.contrib import admin
+
+from .models import InboxEntry, NotificationEvent
+
+
+@admin.register(NotificationEvent)
+class NotificationEventAdmin(admin.ModelAdmin):
+    model = NotificationEvent
+    list_display = ("kind", "project", "issue", "actor", "recipient", "created_on")
+    list_filter = ("kind",)
+    list_select_related = ("project", "issue", "actor", "recipient")
+    raw_id_fields = ("project", "issue", "comment", "actor", "recipient")
+
+
+@admin.register(InboxEntry)
+class InboxEntryAdmin(admin.ModelAdmin):
+    model = InboxEntry
+    list_display = ("user", "issue", "reason", "ts")
+    list_filter = ("reason",)
+    list_select_related = ("user", "issue")
+    raw_id_fields = ("user", "issue")
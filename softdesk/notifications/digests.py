@@ -0,0 +1,155 @@
+from collections import defaultdict
+from itertools import islice
+
+from django.core.mail import EmailMessage, get_connection
+
+from softdesk.accounts.models import SoftUser
+from softdesk.notifications.models import NotificationEvent
+
+
+def record_comment(comment) -> None:
+    """
+    Record a new comment for the contributors of its project.
+    """
+    NotificationEvent.objects.create(
+        kind=NotificationEvent.COMMENT,
+        project_id=comment.issue.project_id,
+        issue_id=comment.issue_id,
+        comment=comment,
+        actor_id=comment.author_id,
+    )
+
+
+def record_assignment(issue, actor: SoftUser) -> None:
+    """
+    Record that `actor` assigned `issue`, unless to themselves.
+    """
+    if issue.assign_to_id == actor.pk:
+        return
+    NotificationEvent.objects.create(
+        kind=NotificationEvent.ASSIGNMENT,
+        project_id=issue.project_id,
+        issue=issue,
+        actor=actor,
+        recipient_id=issue.assign_to_id,
+    )
+
+
+def pending_events():
+    """
+    Claimed events, but those about deleted issues or comments.
+    """
+    return NotificationEvent.objects.filter(
+        claimed=True, issue__deleted_at__isnull=True
+    ).exclude(comment__deleted_at__isnull=False)
+
+
+def recipient_ids() -> list[int]:
+    """
+    Sorted ids of the contactable users concerned by a pending event, with
+    one query.
+    """
+    pending = pending_events()
+    broadcast = pending.filter(
+        recipient__isnull=True, project__contributor__user__can_be_contacted=True
+    ).values_list("project__contributor__user_id", flat=True)
+    direct = pending.filter(recipient__can_be_contacted=True).values_list(
+        "recipient_id", flat=True
+    )
+    return sorted(broadcast.order_by().union(direct.order_by()))
+
+
+def collect_recipients(user_ids: list[int]) -> dict[int, list[int]]:
+    """
+    Map each of `user_ids` to the ids of the pending events they should hear
+    about.
+
+    Project-wide events are fanned out to the contributors with one join
+    over `Contributor`, instead of one query per event.
+    """
+    recipients = defaultdict(list)
+    pending = pending_events()
+    broadcast = pending.filter(
+        recipient__isnull=True,
+        project__contributor__user_id__in=user_ids,
+        project__contributor__user__can_be_contacted=True,
+    ).values_list("project__contributor__user_id", "pk", "actor_id")
+    for user_id, event_id, actor_id in broadcast.order_by("pk"):
+        if user_id != actor_id:
+            recipients[user_id].append(event_id)
+    direct = pending.filter(
+        recipient_id__in=user_ids, recipient__can_be_contacted=True
+    ).values_list("recipient_id", "pk")
+    for user_id, event_id in direct.order_by("pk"):
+        recipients[user_id].append(event_id)
+    return recipients
+
+
+def render_event(event: NotificationEvent) -> str:
+    actor = event.actor.username if event.actor else "Someone"
+    if event.kind == NotificationEvent.COMMENT:
+        content = event.comment.content or ""
+        if len(content) > 200:
+            content = content[:197] + "..."
+        return f'  - {actor} commented: "{content}"'
+    return f"  - {actor} assigned this issue to you"
+
+
+def render_digest(user: SoftUser, entries: list[tuple]) -> str:
+    """
+    Render the digest of a user from its (sort key, issue title, event line)
+    entries, grouping the lines by issue.
+    """
+    lines = [f"Hello {user.username},", "", "Here is what happened in your projects:"]
+    title = None
+    for _key, issue_title, line in sorted(entries):
+        if issue_title != title:
+            title = issue_title
+            lines += ["", title]
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def send_digests(batch_size: int = 500) -> int:
+    """
+    Email every recipient a single digest of the pending events, then
+    delete them. Returns the number of digests sent.
+
+    The events committed so far are claimed first: those committed while
+    the digests are sent wait for the next run, rather than being deleted
+    unsent. Recipients are handled `batch_size` at a time, loading only the
+    events of each batch. Events left claimed by an interrupted run are
+    sent by the next one.
+    """
+    NotificationEvent.objects.filter(claimed=False).update(claimed=True)
+    user_ids = iter(recipient_ids())
+    connection = get_connection()
+    sent = 0
+    while chunk := list(islice(user_ids, batch_size)):
+        recipients = collect_recipients(chunk)
+        events = NotificationEvent.objects.select_related(
+            "project", "issue", "comment", "actor"
+        ).in_bulk(sorted({pk for pks in recipients.values() for pk in pks}))
+        # Each event is rendered once per batch, whatever its recipients.
+        entries = {
+            pk: (
+                (event.issue_id, pk),
+                f"[{event.project.name}] {event.issue.name}",
+                render_event(event),
+            )
+            for pk, event in events.items()
+        }
+        users = SoftUser.objects.exclude(email="").in_bulk(list(recipients))
+        messages = []
+        for user in users.values():
+            user_entries = [entries[pk] for pk in recipients[user.pk]]
+            messages.append(
+                EmailMessage(
+                    f"SoftDesk: {len(user_entries)} new updates in your projects",
+                    render_digest(user, user_entries),
+                    to=[user.email],
+                )
+            )
+        sent += connection.send_messages(messages) or 0
+    NotificationEvent.objects.filter(claimed=True).delete()
+    return sent
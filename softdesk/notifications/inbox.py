@@ -0,0 +1,96 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import Iterable
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from softdesk.accounts.models import Contributor
+from softdesk.notifications.models import InboxEntry
+from softdesk.projects.models import Comment
+from softdesk.tasks.queue import task
+
+
+def upsert_entries(entries: list[InboxEntry]) -> None:
+    """
+    Insert inbox entries, updating the reason and date of those already in
+    the inbox of their user, with one statement per 1000 entries.
+    """
+    InboxEntry.objects.bulk_create(
+        entries,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=["user", "issue"],
+        update_fields=["reason", "ts"],
+    )
+
+
+def record_assignments(
+    changes: Iterable[tuple[int, int | None, int | None]],
+    ts: datetime | None = None,
+) -> None:
+    """
+    Move issues to the inbox of their new assignee, out of the inbox of
+    their previous one, from (issue id, previous assignee id, assignee id)
+    changes.
+    """
+    ts = ts or timezone.now()
+    changes = [change for change in changes if change[1] != change[2]]
+    dropped = defaultdict(list)
+    for issue_id, previous_id, _ in changes:
+        if previous_id is not None:
+            dropped[previous_id].append(issue_id)
+    if dropped:
+        stale = Q()
+        for user_id, issue_ids in dropped.items():
+            stale |= Q(user_id=user_id, issue_id__in=issue_ids)
+        InboxEntry.objects.filter(stale).delete()
+    upsert_entries(
+        [
+            InboxEntry(
+                user_id=user_id, issue_id=issue_id, reason=InboxEntry.ASSIGNED, ts=ts
+            )
+            for issue_id, _, user_id in changes
+            if user_id is not None
+        ]
+    )
+
+
+@task(max_attempts=5)
+def fan_out_comment(comment_id: int, after_user_id: int = 0):
+    """
+    Move the issue of a comment to the top of the inbox of the contributors
+    of its project, but its author.
+
+    Contributors are handled `INBOX["FAN_OUT_BATCH_SIZE"]` at a time, by id,
+    the task enqueuing itself again for the next ones, so that commenting
+    in a large project only costs a task enqueued.
+    """
+    comment = Comment.objects.select_related("issue").filter(pk=comment_id).first()
+    if comment is None:
+        return
+    issue = comment.issue
+    batch_size = settings.INBOX["FAN_OUT_BATCH_SIZE"]
+    user_ids = list(
+        Contributor.objects.filter(
+            project_id=issue.project_id, user_id__gt=after_user_id
+        )
+        .order_by("user_id")
+        .values_list("user_id", flat=True)[:batch_size]
+    )
+    own = {issue.author_id, issue.assign_to_id}
+    upsert_entries(
+        [
+            InboxEntry(
+                user_id=user_id,
+                issue_id=issue.pk,
+                reason=InboxEntry.COMMENTED if user_id in own else InboxEntry.FOLLOWED,
+                ts=comment.created_on,
+            )
+            for user_id in user_ids
+            if user_id != comment.author_id
+        ]
+    )
+    if len(user_ids) == batch_size:
+        fan_out_comment.enqueue(comment_id, user_ids[-1])
@@ -0,0 +1,25 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from softdesk.notifications.digests import send_digests
+
+
+class Command(BaseCommand):
+    help = "Email each user a digest of the notifications collected since the last run."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep sending digests every NOTIFICATION_DIGEST_INTERVAL.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            sent = send_digests()
+            self.stdout.write(f"Sent {sent} digests.")
+            if not options["loop"]:
+                break
+            time.sleep(settings.NOTIFICATION_DIGEST_INTERVAL.total_seconds())
@@ -0,0 +1,73 @@
+# Generated by Django 5.0.14 on 2026-10-19 11:32
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notifications", "0001_initial"),
+        ("projects", "0014_issue_transition"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="InboxEntry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "reason",
+                    models.CharField(
+                        choices=[
+                            ("ASG", "assigned to you"),
+                            ("COM", "new comment on your issue"),
+                            ("FOL", "new comment in your project"),
+                        ],
+                        max_length=3,
+                    ),
+                ),
+                ("ts", models.DateTimeField()),
+                (
+                    "issue",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="projects.issue",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["user", "-ts", "-id"], name="inbox_user_ts_idx"
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="inboxentry",
+            constraint=models.UniqueConstraint(
+                fields=("user", "issue"), name="inbox_user_issue_uniq"
+            ),
+        ),
+    ]
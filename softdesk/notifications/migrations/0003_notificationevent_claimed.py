@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-19 12:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notifications", "0002_inbox_entry"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notificationevent",
+            name="claimed",
+            field=models.BooleanField(default=False, editable=False),
+        ),
+    ]
@@ -0,0 +1,81 @@
+from django.db import models
+
+from softdesk.accounts.models import SoftUser
+
+
+class NotificationEvent(models.Model):
+    """
+    Something contributors should hear about, waiting for the next digest.
+
+    Events without recipient are meant for every contributor of the project
+    (except their actor), resolved when the digest is sent. Events are
+    `claimed` by the digest run which sends them.
+    """
+
+    COMMENT = "COM"
+    ASSIGNMENT = "ASG"
+
+    kind = models.CharField(
+        max_length=3,
+        choices=[
+            (COMMENT, "new comment"),
+            (ASSIGNMENT, "issue assigned"),
+        ],
+    )
+    project = models.ForeignKey("projects.Project", on_delete=models.CASCADE)
+    issue = models.ForeignKey("projects.Issue", on_delete=models.CASCADE)
+    comment = models.ForeignKey(
+        "projects.Comment", on_delete=models.CASCADE, null=True, blank=True
+    )
+    actor = models.ForeignKey(
+        SoftUser, on_delete=models.CASCADE, related_name="+", null=True
+    )
+    recipient = models.ForeignKey(
+        SoftUser, on_delete=models.CASCADE, related_name="+", null=True, blank=True
+    )
+    created_on = models.DateTimeField(auto_now_add=True)
+    claimed = models.BooleanField(default=False, editable=False)
+
+    class Meta:
+        ordering = ["id"]
+
+
+class InboxEntry(models.Model):
+    """
+    An open issue in the inbox of a user, with why it is there and when it
+    last moved, written when the issue is assigned or commented.
+
+    Each issue appears once per user: later events update the reason and
+    date of its entry.
+    """
+
+    ASSIGNED = "ASG"
+    COMMENTED = "COM"
+    FOLLOWED = "FOL"
+
+    # Both indexes below lead with the user.
+    user = models.ForeignKey(
+        SoftUser, on_delete=models.CASCADE, related_name="+", db_index=False
+    )
+    issue = models.ForeignKey(
+        "projects.Issue", on_delete=models.CASCADE, related_name="+"
+    )
+    reason = models.CharField(
+        max_length=3,
+        choices=[
+            (ASSIGNED, "assigned to you"),
+            (COMMENTED, "new comment on your issue"),
+            (FOLLOWED, "new comment in your project"),
+        ],
+    )
+    ts = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "issue"], name="inbox_user_issue_uniq"
+            )
+        ]
+        indexes = [
+            models.Index(fields=["user", "-ts", "-id"], name="inbox_user_ts_idx")
+        ]
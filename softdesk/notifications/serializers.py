@@ -0,0 +1,12 @@
+from rest_framework import serializers
+
+from softdesk.notifications.models import InboxEntry
+from softdesk.projects.serializers import IssueSerializer
+
+
+class InboxEntrySerializer(serializers.ModelSerializer):
+    issue = IssueSerializer(read_only=True)
+
+    class Meta:
+        model = InboxEntry
+        fields = ["id", "reason", "ts", "issue"]
@@ -0,0 +1,241 @@
+from unittest import mock
+
+from django.core import mail
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.test import APIClient
+
+from softdesk.accounts.models import SoftUser
+from softdesk.notifications import digests
+from softdesk.notifications.digests import send_digests
+from softdesk.notifications.models import InboxEntry, NotificationEvent
+from softdesk.projects.models import Comment, Issue, Project
+from softdesk.projects.services import create_project, update_issues
+
+
+class NotificationDigestTestCase(TestCase):
+    def setUp(self):
+        self.author: SoftUser = SoftUser.objects.create(
+            username="author", email="author@mail.com", birthdate="2000-01-01"
+        )
+        self.project = Project.objects.create(
+            name="Test Project", author=self.author, type="BAE"
+        )
+        self.issue = Issue.objects.create(
+            name="Test Issue",
+            project=self.project,
+            author=self.author,
+            assign_to=self.author,
+        )
+        self.reader = SoftUser.objects.create(
+            username="reader", email="reader@mail.com", birthdate="2000-01-01"
+        )
+        self.private = SoftUser.objects.create(
+            username="private",
+            email="private@mail.com",
+            birthdate="2000-01-01",
+            can_be_contacted=False,
+        )
+        self.project.contributors.add(self.reader, self.private)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.author)
+
+    def post_comment(self, content: str) -> Response:
+        return self.client.post(
+            reverse("comment-list"),
+            {"content": content, "author": self.author.pk, "issue": self.issue.pk},
+        )
+
+    def test_comments_are_recorded_without_sending_email(self):
+        response: Response = self.post_comment("First Comment")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(NotificationEvent.objects.count(), 1)
+        self.assertEqual(mail.outbox, [])
+
+    def test_one_digest_per_contactable_recipient(self):
+        self.post_comment("First Comment")
+        self.post_comment("Second Comment")
+        self.assertEqual(send_digests(), 1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["reader@mail.com"])
+        self.assertIn('author commented: "First Comment"', mail.outbox[0].body)
+        self.assertIn('author commented: "Second Comment"', mail.outbox[0].body)
+        self.assertFalse(NotificationEvent.objects.exists())
+        self.assertEqual(send_digests(), 0)
+
+    def test_deleted_comments_are_left_out(self):
+        self.post_comment("Kept Comment")
+        response: Response = self.post_comment("Deleted Comment")
+        self.client.delete(reverse("comment-detail", args=[response.data["id"]]))
+        send_digests()
+        self.assertIn("Kept Comment", mail.outbox[0].body)
+        self.assertNotIn("Deleted Comment", mail.outbox[0].body)
+
+    def test_assignment_is_only_sent_to_the_assignee(self):
+        response: Response = self.client.patch(
+            reverse("issue-detail", args=[self.issue.pk]),
+            {"assign_to": self.reader.pk},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        send_digests()
+        self.assertEqual([message.to for message in mail.outbox], [["reader@mail.com"]])
+        self.assertIn("author assigned this issue to you", mail.outbox[0].body)
+
+    def test_digest_query_count_does_not_depend_on_volume(self):
+        for number in range(20):
+            comment = Comment.objects.create(
+                content=f"Comment {number}", author=self.author, issue=self.issue
+            )
+            NotificationEvent.objects.create(
+                kind=NotificationEvent.COMMENT,
+                project=self.project,
+                issue=self.issue,
+                comment=comment,
+                actor=self.author,
+            )
+        for number in range(10):
+            self.project.contributors.add(
+                SoftUser.objects.create(
+                    username=f"user{number}",
+                    email=f"user{number}@mail.com",
+                    birthdate="2000-01-01",
+                )
+            )
+        with self.assertNumQueries(7):
+            self.assertEqual(send_digests(), 11)
+
+    def test_events_committed_while_sending_wait_for_the_next_digest(self):
+        self.post_comment("First Comment")
+
+        recipient_ids = digests.recipient_ids
+
+        def comment_while_sending():
+            self.post_comment("Late Comment")
+            return recipient_ids()
+
+        with mock.patch.object(
+            digests, "recipient_ids", side_effect=comment_while_sending
+        ):
+            self.assertEqual(send_digests(), 1)
+        self.assertNotIn("Late Comment", mail.outbox[0].body)
+        self.assertEqual(send_digests(), 1)
+        self.assertIn("Late Comment", mail.outbox[1].body)
+        self.assertFalse(NotificationEvent.objects.exists())
+
+    def test_recipients_are_sent_in_batches(self):
+        for number in range(4):
+            self.project.contributors.add(
+                SoftUser.objects.create(
+                    username=f"user{number}",
+                    email=f"user{number}@mail.com",
+                    birthdate="2000-01-01",
+                )
+            )
+        self.post_comment("Batched Comment")
+        self.assertEqual(send_digests(batch_size=2), 5)
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox),
+            ["reader@mail.com"] + [f"user{number}@mail.com" for number in range(4)],
+        )
+
+
+@override_settings(
+    TASKS={"BACKEND": "softdesk.tasks.backends.ImmediateBackend"},
+    INBOX={"FAN_OUT_BATCH_SIZE": 2, "PAGE_SIZE": 50},
+)
+class InboxTestCase(TestCase):
+    def setUp(self):
+        self.users = [
+            SoftUser.objects.create(
+                username=f"user{number}",
+                email=f"user{number}@mail.com",
+                birthdate="2000-01-01",
+            )
+            for number in range(5)
+        ]
+        self.author = self.users[0]
+        self.project = create_project(name="Inbox Project", author=self.author)
+        self.project.contributors.add(*self.users[1:])
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.author)
+
+    def create_issue(self, name: str, assignee: SoftUser) -> int:
+        response: Response = self.client.post(
+            reverse("issue-list"),
+            {
+                "name": name,
+                "project": self.project.pk,
+                "author": self.author.pk,
+                "assign_to": assignee.pk,
+            },
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data["id"]
+
+    def inbox(self, user: SoftUser, **params) -> Response:
+        self.client.force_authenticate(user=user)
+        return self.client.get(reverse("inbox"), params)
+
+    def test_assignment_moves_the_issue_between_inboxes(self):
+        issue_id = self.create_issue("Assigned Issue", self.users[1])
+        self.assertEqual(
+            list(InboxEntry.objects.values_list("user_id", "issue_id", "reason")),
+            [(self.users[1].pk, issue_id, InboxEntry.ASSIGNED)],
+        )
+        self.client.patch(
+            reverse("issue-detail", args=[issue_id]), {"assign_to": self.users[2].pk}
+        )
+        self.assertEqual(
+            list(InboxEntry.objects.values_list("user_id", "issue_id")),
+            [(self.users[2].pk, issue_id)],
+        )
+        update_issues(Issue.objects.filter(pk=issue_id), assign_to=self.users[3])
+        self.assertEqual(
+            list(InboxEntry.objects.values_list("user_id", "issue_id")),
+            [(self.users[3].pk, issue_id)],
+        )
+
+    def test_comments_fan_out_in_batches(self):
+        issue_id = self.create_issue("Commented Issue", self.users[1])
+        self.client.force_authenticate(user=self.users[2])
+        with self.captureOnCommitCallbacks(execute=True):
+            response: Response = self.client.post(
+                reverse("comment-list"),
+                {"content": "Comment", "author": self.users[2].pk, "issue": issue_id},
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        # Five contributors, two per task.
+        self.assertCountEqual(
+            InboxEntry.objects.values_list("user_id", "reason"),
+            [
+                (self.users[0].pk, InboxEntry.COMMENTED),
+                (self.users[1].pk, InboxEntry.COMMENTED),
+                (self.users[3].pk, InboxEntry.FOLLOWED),
+                (self.users[4].pk, InboxEntry.FOLLOWED),
+            ],
+        )
+
+    def test_inbox_lists_open_issues_newest_first(self):
+        first = self.create_issue("First Issue", self.users[1])
+        second = self.create_issue("Second Issue", self.users[1])
+        finished = self.create_issue("Finished Issue", self.users[1])
+        self.create_issue("Other Issue", self.users[2])
+        Issue.objects.filter(pk=finished).update(status="END")
+        response: Response = self.inbox(self.users[1], limit=1)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [entry["issue"]["id"] for entry in response.data["results"]], [second]
+        )
+        self.assertEqual(response.data["results"][0]["reason"], InboxEntry.ASSIGNED)
+        response = self.client.get(response.data["next"])
+        self.assertEqual(
+            [entry["issue"]["id"] for entry in response.data["results"]], [first]
+        )
+        self.assertIsNone(response.data["next"])
+
+    def test_inbox_skips_projects_left(self):
+        self.create_issue("Assigned Issue", self.users[1])
+        self.project.contributors.remove(self.users[1])
+        self.assertEqual(self.inbox(self.users[1]).data["results"], [])
@@ -0,0 +1,52 @@
+from django.conf import settings
+from rest_framework import generics, permissions
+from rest_framework.pagination import CursorPagination
+
+from softdesk.accounts.graph import get_contributor_graph
+from softdesk.notifications.models import InboxEntry
+from softdesk.notifications.serializers import InboxEntrySerializer
+
+
+class InboxPagination(CursorPagination):
+    """
+    Keyset pagination of an inbox, newest entry first: each page starts
+    after the date of the last entry of the previous one, read from the
+    (user, ts, id) index, however deep the page.
+    """
+
+    ordering = ("-ts", "-id")
+    page_size_query_param = "limit"
+    max_page_size = 100
+
+    def get_page_size(self, request):
+        self.page_size = settings.INBOX["PAGE_SIZE"]
+        return super().get_page_size(request)
+
+
+class InboxView(generics.ListAPIView):
+    """
+    API endpoint listing the open issues of every project the user works
+    on, assigned to them or recently commented, newest activity first.
+
+    Entries are written when issues are assigned or commented, so reading
+    an inbox scans the index of its user only. Issues of projects the user
+    left, finished or deleted since are skipped.
+    """
+
+    serializer_class = InboxEntrySerializer
+    pagination_class = InboxPagination
+    permission_classes = [permissions.IsAuthenticated]
+    filterset_fields = ["reason"]
+
+    def get_queryset(self):
+        project_ids = get_contributor_graph().project_ids(self.request.user.pk)
+        return (
+            InboxEntry.objects.filter(
+                user=self.request.user,
+                issue__project_id__in=project_ids,
+                issue__deleted_at__isnull=True,
+                issue__project__deleted_at__isnull=True,
+            )
+            .exclude(issue__status="END")
+            .select_related("issue")
+        )
@@ -0,0 +1,186 @@
+import json
+from functools import partial
+
+from django.conf import settings
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db import DatabaseError, connections
+from django.utils.functional import cached_property
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+
+
+def table_row_estimate(model, using: str = "default") -> int | None:
+    """
+    Number of rows of the table of `model` according to the statistics of
+    the database planner, or None when there are none.
+
+    Reads `pg_class.reltuples` on PostgreSQL and `sqlite_stat1` (filled by
+    ANALYZE) on SQLite. The latter has a row per index, whose first number
+    counts the rows of the index: the largest one, that of a full index or
+    of the table itself, is taken, as partial indexes count fewer rows.
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                    [connection.ops.quote_name(table)],
+                )
+            elif connection.vendor == "sqlite":
+                cursor.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = %s", [table])
+            else:
+                return None
+            rows = cursor.fetchall()
+    except DatabaseError:
+        return None
+    if not rows:
+        return None
+    estimate = max(int(str(stat).split()[0]) for stat, in rows)
+    return estimate if estimate >= 0 else None
+
+
+def bounded_count(queryset, limit: int) -> int:
+    """
+    Count the rows of `queryset`, stopping at `limit` + 1.
+    """
+    return queryset.order_by()[: limit + 1].count()
+
+
+def is_unfiltered(queryset) -> bool:
+    """
+    Whether `queryset` selects all the rows of the default manager of its
+    model, whatever their order.
+    """
+    return queryset.query.where == queryset.model._default_manager.all().query.where
+
+
+def planner_row_estimate(queryset) -> int | None:
+    """
+    Number of rows of `queryset` estimated by the PostgreSQL planner, or
+    None on other databases, whose plans carry no row estimates.
+    """
+    if connections[queryset.db].vendor != "postgresql":
+        return None
+    try:
+        plan = json.loads(queryset.order_by().explain(format="json"))
+    except (DatabaseError, ValueError):
+        return None
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class EstimatedPage(Page):
+    """
+    Page of a paginator whose count is estimated, telling whether a next
+    page exists from the rows fetched rather than from the count.
+    """
+
+    has_more = None
+
+    def has_next(self) -> bool:
+        if self.has_more is None:
+            return super().has_next()
+        return self.has_more
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator counting up to `exact_count_limit` rows exactly, or every row
+    when built with `exact=True`.
+
+    Beyond, the count is estimated from the planner statistics: those of
+    the table for a whole table, such as admin changelists, the plan of the
+    query otherwise. SQLite plans carry no row estimates, so on SQLite
+    filtered lists, contributor-scoped API lists included, and tables
+    without statistics report `exact_count_limit` + 1 rows: a lower bound,
+    not an estimate. Either way `count_is_exact` is False, and pages are
+    fetched without relying on the count, so every page stays reachable.
+    """
+
+    exact_count_limit = None
+
+    def __init__(self, *args, exact: bool = False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.exact = exact
+
+    def get_exact_count_limit(self) -> int:
+        if self.exact_count_limit is None:
+            return settings.PAGINATION_EXACT_COUNT_LIMIT
+        return self.exact_count_limit
+
+    @cached_property
+    def count(self) -> int:
+        if self.exact:
+            return super().count
+        limit = self.get_exact_count_limit()
+        count = bounded_count(self.object_list, limit)
+        if count <= limit:
+            return count
+        if is_unfiltered(self.object_list):
+            estimate = table_row_estimate(self.object_list.model, self.object_list.db)
+        else:
+            estimate = planner_row_estimate(self.object_list)
+        return max(count, estimate or 0)
+
+    @property
+    def count_is_exact(self) -> bool:
+        return self.exact or self.count <= self.get_exact_count_limit()
+
+    def validate_number(self, number):
+        if self.count_is_exact:
+            return super().validate_number(number)
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger("That page number is not an integer")
+        if number < 1:
+            raise EmptyPage("That page number is less than 1")
+        return number
+
+    def page(self, number) -> Page:
+        number = self.validate_number(number)
+        if self.count_is_exact:
+            return super().page(number)
+        bottom = (number - 1) * self.per_page
+        # One more row than the page tells whether there is a next one.
+        rows = list(self.object_list[bottom:][: self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage("That page contains no results")
+        page = self._get_page(rows[: self.per_page], number, self)
+        page.has_more = len(rows) > self.per_page
+        return page
+
+    def _get_page(self, *args, **kwargs) -> Page:
+        return EstimatedPage(*args, **kwargs)
+
+
+class EstimatedCountPagination(PageNumberPagination):
+    """
+    Page number pagination whose count is estimated above
+    `PAGINATION_EXACT_COUNT_LIMIT` rows, as told by the `count_exact` flag
+    of the response. Callers needing an exact count pass `?exact_count=1`.
+    """
+
+    exact_count_query_param = "exact_count"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        exact = request.query_params.get(self.exact_count_query_param) in ("1", "true")
+        self.django_paginator_class = partial(EstimatedCountPaginator, exact=exact)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data) -> Response:
+        return Response(
+            {
+                "count": self.page.paginator.count,
+                "count_exact": self.page.paginator.count_is_exact,
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema: dict) -> dict:
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema["properties"]["count_exact"] = {"type": "boolean"}
+        return response_schema
@@ -0,0 +1,22 @@
+import msgpack
+from rest_framework import parsers
+from rest_framework.exceptions import ParseError
+
+from softdesk.renderers import unpack
+
+
+class MessagePackParser(parsers.BaseParser):
+    """
+    Parses MessagePack-serialized data.
+
+    Timestamps are decoded to timezone-aware datetimes and UUID extension
+    values to `uuid.UUID`, both of which the serializer fields accept as is.
+    """
+
+    media_type = "application/msgpack"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return unpack(stream.read())
+        except (ValueError, msgpack.UnpackException) as exc:
+            raise ParseError(f"MessagePack parse error - {exc}")
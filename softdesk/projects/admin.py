@@ -1,21 +1,131 @@
+from math import ceil
+
 from django.contrib import admin
+from django.forms.models import BaseInlineFormSet
+from django.utils.html import format_html_join
+from django.utils.text import Truncator
 
 from softdesk.accounts.models import Contributor
+from softdesk.filters import PrefixSearchMixin
+from softdesk.pagination import EstimatedCountPaginator
+
+from .deletion import schedule_deletion
+from .models import Deletion, Project
+from .services import create_projects
+
+
+class PaginatedInlineFormSet(BaseInlineFormSet):
+    """
+    Inline formset editing one page of `per_page` related objects, the
+    page being picked by the `page` attribute set by the inline.
+    """
+
+    per_page = 50
+    page = 1
 
-from .models import Project
+    def get_queryset(self):
+        if not hasattr(self, "_queryset"):
+            start = (self.page - 1) * self.per_page
+            end = start + self.per_page
+            self._queryset = super().get_queryset()[start:end]
+        return self._queryset
 
 
 class ContributorInline(admin.TabularInline):
+    """
+    Contributors of a project, read-only so rendering them takes no query
+    per row, `PaginatedInlineFormSet.per_page` at a time, the page being
+    given by the `contributors_page` query parameter.
+    """
+
+    model = Contributor
+    formset = PaginatedInlineFormSet
+    fields = ("user", "date_joined")
+    readonly_fields = ("user", "date_joined")
+    extra = 0
+
+    def has_add_permission(self, request, obj=None) -> bool:
+        return False
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related("user")
+
+    def get_formset(self, request, obj=None, **kwargs):
+        formset = super().get_formset(request, obj, **kwargs)
+        try:
+            formset.page = max(int(request.GET.get("contributors_page", 1)), 1)
+        except ValueError:
+            formset.page = 1
+        return formset
+
+
+class NewContributorInline(admin.TabularInline):
     model = Contributor
+    fields = ("user",)
+    autocomplete_fields = ("user",)
+    verbose_name_plural = "new contributors"
+    extra = 1
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).none()
 
 
 @admin.register(Project)
-class ProjectAdmin(admin.ModelAdmin):
+class ProjectAdmin(PrefixSearchMixin, admin.ModelAdmin):
     model = Project
-    list_display = ("name", "description", "created_on", "updated_on", "author", "type")
-    search_fields = ("name", "author", "type")
-    inlines = [ContributorInline]
+    list_display = ("name", "summary", "created_on", "updated_on", "author", "type")
+    list_select_related = ("author",)
+    list_filter = ("type",)
+    search_fields = ("^name_lower",)
+    autocomplete_fields = ("author",)
+    readonly_fields = ("contributor_pages",)
+    inlines = [ContributorInline, NewContributorInline]
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
+    @admin.display(description="description")
+    def summary(self, obj: Project) -> str:
+        return Truncator(obj.description or "").chars(80)
 
-class ContributorInline(admin.TabularInline):
-    model = Contributor
+    @admin.display(description="contributor pages")
+    def contributor_pages(self, obj: Project) -> str:
+        if obj.pk is None:
+            return "-"
+        count = Contributor.objects.filter(project=obj).count()
+        pages = range(1, ceil(count / PaginatedInlineFormSet.per_page) + 1)
+        return format_html_join(
+            " ",
+            '<a href="?contributors_page={}">{}</a>',
+            ((page, page) for page in pages),
+        )
+
+    def save_model(self, request, obj, form, change):
+        if change:
+            super().save_model(request, obj, form, change)
+        else:
+            create_projects([obj])
+
+    # Deleted as through the API: marked, then purged in the background,
+    # rather than cascading to every issue and comment in the request.
+    def delete_model(self, request, obj):
+        schedule_deletion(obj, request.user)
+
+    def delete_queryset(self, request, queryset):
+        for project in queryset:
+            schedule_deletion(project, request.user)
+
+
+@admin.register(Deletion)
+class DeletionAdmin(admin.ModelAdmin):
+    model = Deletion
+    list_display = (
+        "name",
+        "kind",
+        "status",
+        "issues_deleted",
+        "comments_deleted",
+        "requested_on",
+        "finished_on",
+    )
+    list_filter = ("kind", "status")
+    search_fields = ("name",)
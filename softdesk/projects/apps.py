@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ProjectsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "softdesk.projects"
+
+    def ready(self):
+        from softdesk.projects import workload  # noqa: F401
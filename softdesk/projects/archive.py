@@ -0,0 +1,82 @@
+from datetime import datetime
+
+from django.db import transaction
+
+from softdesk.projects.models import ArchivedComment, ArchivedIssue, Comment, Issue
+
+ISSUE_FIELDS = [
+    "id",
+    "name",
+    "description",
+    "author_id",
+    "assign_to_id",
+    "project_id",
+    "created_on",
+    "updated_on",
+    "status",
+    "priority",
+    "tag",
+    "comment_count",
+    "last_comment_at",
+]
+COMMENT_FIELDS = [
+    "id",
+    "author_id",
+    "issue_id",
+    "content",
+    "created_on",
+    "updated_on",
+    "uuid",
+]
+
+
+def archivable_issues(finished_before: datetime):
+    return Issue.objects.filter(status="END", updated_on__lt=finished_before)
+
+
+def archive_batch(finished_before: datetime, after_id: int, batch_size: int) -> list:
+    """
+    Move up to `batch_size` finished issues with an id above `after_id`, and
+    their comments, to the archive tables in one transaction.
+
+    Returns the ids of the archived issues.
+    """
+    with transaction.atomic():
+        issues = list(
+            archivable_issues(finished_before)
+            .filter(pk__gt=after_id)
+            .order_by("pk")
+            .select_for_update(skip_locked=True)
+            .values(*ISSUE_FIELDS)[:batch_size]
+        )
+        issue_ids = [issue["id"] for issue in issues]
+        if not issue_ids:
+            return []
+        ArchivedIssue.objects.bulk_create(ArchivedIssue(**issue) for issue in issues)
+        ArchivedComment.objects.bulk_create(
+            (
+                ArchivedComment(**comment)
+                for comment in Comment.objects.filter(issue_id__in=issue_ids)
+                .order_by()
+                .values(*COMMENT_FIELDS)
+                .iterator()
+            ),
+            batch_size=1000,
+        )
+        # Deleted comments are not archived, their tombstones go with the issue.
+        Comment.all_objects.filter(issue_id__in=issue_ids).delete()
+        Issue.objects.filter(pk__in=issue_ids).delete()
+    return issue_ids
+
+
+def archive_issues(finished_before: datetime, batch_size: int = 500, after_id: int = 0):
+    """
+    Archive every issue finished before `finished_before`, batch by batch.
+
+    Yields the ids of each archived batch. Batches are committed one by one,
+    so an interrupted run can simply be started again, or resumed from the
+    last id it reported.
+    """
+    while issue_ids := archive_batch(finished_before, after_id, batch_size):
+        after_id = issue_ids[-1]
+        yield issue_ids
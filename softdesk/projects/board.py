@@ -0,0 +1,93 @@
+import base64
+import json
+from datetime import datetime
+
+from django.db.models import Count, F, Q, Window
+from django.db.models.functions import RowNumber
+
+from softdesk.projects.models import ISSUE_STATUSES, Issue
+
+STATUSES = [value for value, _ in ISSUE_STATUSES]
+
+
+def encode_cursor(issue: Issue) -> str:
+    """
+    Opaque cursor continuing the column of `issue` after it.
+    """
+    position = [issue.status, issue.created_on.isoformat(), issue.pk]
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[str, datetime, int]:
+    """
+    Return the status, creation date and id a cursor points after, or raise
+    ValueError.
+    """
+    try:
+        status, created_on, pk = json.loads(base64.urlsafe_b64decode(cursor))
+        created_on = datetime.fromisoformat(created_on)
+    except (TypeError, ValueError) as exc:
+        raise ValueError("invalid cursor") from exc
+    if status not in STATUSES or not isinstance(pk, int):
+        raise ValueError("invalid cursor")
+    return status, created_on, pk
+
+
+def board_columns(
+    project_id: int, limit: int, cursors: list[tuple[str, datetime, int]] = ()
+) -> list[dict]:
+    """
+    The newest `limit` issues of each status column of a project, with the
+    number of issues of the column, in two queries whatever the number of
+    columns: one ranking the issues of every column with ROW_NUMBER() OVER
+    (PARTITION BY status), one counting them grouped by status.
+
+    With `cursors`, only the columns they name are returned, each continued
+    after the issue its cursor points to.
+
+    Columns are {"status", "count", "issues", "next"} dicts, "next" being
+    the cursor of the following issues, or None.
+    """
+    issues = Issue.objects.filter(project_id=project_id)
+    if cursors:
+        after = Q()
+        for status, created_on, pk in cursors:
+            after |= Q(status=status) & (
+                Q(created_on__lt=created_on) | Q(created_on=created_on, pk__lt=pk)
+            )
+        issues = issues.filter(after)
+        continued = {status for status, _, _ in cursors}
+        statuses = [status for status in STATUSES if status in continued]
+    else:
+        statuses = STATUSES
+    # One more issue per column tells whether it goes on.
+    ranked = (
+        issues.annotate(
+            position=Window(
+                RowNumber(),
+                partition_by=F("status"),
+                order_by=[F("created_on").desc(), F("pk").desc()],
+            )
+        )
+        .filter(position__lte=limit + 1)
+        .order_by("status", "position")
+    )
+    columns = {
+        status: {"status": status, "count": 0, "issues": [], "next": None}
+        for status in statuses
+    }
+    for issue in ranked:
+        column = columns[issue.status]
+        if len(column["issues"]) < limit:
+            column["issues"].append(issue)
+        else:
+            column["next"] = encode_cursor(column["issues"][-1])
+    counts = (
+        Issue.objects.filter(project_id=project_id, status__in=statuses)
+        .values_list("status")
+        .annotate(count=Count("pk"))
+        .order_by()
+    )
+    for status, count in counts:
+        columns[status]["count"] = count
+    return list(columns.values())
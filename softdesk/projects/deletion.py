@@ -0,0 +1,178 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from softdesk.accounts.models import Contributor, SoftUser
+from softdesk.notifications.models import InboxEntry
+from softdesk.projects.models import (
+    ArchivedComment,
+    ArchivedIssue,
+    Comment,
+    Deletion,
+    Issue,
+    IssueTransition,
+    Project,
+)
+from softdesk.projects.workload import bump_versions
+from softdesk.tasks.queue import task
+
+# Batches purged by one run of the `purge_deletion` task before it enqueues
+# itself again, keeping each run well under a database worker lease.
+BATCHES_PER_RUN = 50
+
+
+def schedule_deletion(obj: Project | Issue, user: SoftUser) -> Deletion:
+    """
+    Mark a project, with its issues, or an issue as deleted, hiding them
+    from the default managers, and plan the purge of their rows.
+
+    The marked rows are kept as tombstones for `SOFT_DELETE_RETENTION`: the
+    purge is enqueued right away without retention, else started by the
+    `purge_deletions` command once due.
+    """
+    now = timezone.now()
+    purge_after = now + settings.SOFT_DELETE_RETENTION
+    kind = Deletion.PROJECT if isinstance(obj, Project) else Deletion.ISSUE
+    with transaction.atomic():
+        if kind == Deletion.PROJECT:
+            # One UPDATE, so the issues are hidden without loading them.
+            Issue.objects.filter(project_id=obj.pk).update(deleted_at=now)
+        type(obj).objects.filter(pk=obj.pk).update(deleted_at=now)
+        bump_versions([obj.pk if kind == Deletion.PROJECT else obj.project_id])
+        obj.deleted_at = now
+        deletion, created = Deletion.objects.get_or_create(
+            kind=kind,
+            object_id=obj.pk,
+            defaults={
+                "name": obj.name,
+                "requested_by": user,
+                "purge_after": purge_after,
+            },
+        )
+        if created and purge_after <= now:
+            purge_deletion.enqueue(deletion.pk)
+    return deletion
+
+
+def purge_steps(deletion: Deletion) -> list[tuple]:
+    """
+    Querysets of the rows to delete, in order, with the progress counter of
+    each. Children go first so no cascade is left for the collector.
+    """
+    if deletion.kind == Deletion.ISSUE:
+        return [
+            (
+                Comment._base_manager.filter(issue_id=deletion.object_id),
+                "comments_deleted",
+            ),
+            (IssueTransition.objects.filter(issue_id=deletion.object_id), None),
+            (InboxEntry.objects.filter(issue_id=deletion.object_id), None),
+            (Issue._base_manager.filter(pk=deletion.object_id), "issues_deleted"),
+        ]
+    project_id = deletion.object_id
+    return [
+        (
+            Comment._base_manager.filter(issue__project_id=project_id),
+            "comments_deleted",
+        ),
+        (
+            ArchivedComment.objects.filter(issue__project_id=project_id),
+            "comments_deleted",
+        ),
+        (InboxEntry.objects.filter(issue__project_id=project_id), None),
+        (Issue._base_manager.filter(project_id=project_id), "issues_deleted"),
+        (ArchivedIssue.objects.filter(project_id=project_id), "issues_deleted"),
+        (IssueTransition.objects.filter(project_id=project_id), None),
+        (Contributor.objects.filter(project_id=project_id), None),
+        (Project._base_manager.filter(pk=project_id), None),
+    ]
+
+
+def delete_batch(
+    queryset, size: int, deletion: Deletion | None = None, counter: str | None = None
+) -> int:
+    """
+    Delete up to `size` rows of `queryset` and record them in the `counter`
+    of `deletion`, in one transaction. Returns the number of rows deleted.
+    """
+    with transaction.atomic():
+        ids = list(queryset.order_by("pk").values_list("pk", flat=True)[:size])
+        if ids:
+            queryset.model._base_manager.filter(pk__in=ids).delete()
+            if deletion and counter:
+                Deletion.objects.filter(pk=deletion.pk).update(
+                    **{counter: F(counter) + len(ids)}
+                )
+    return len(ids)
+
+
+def purge(
+    deletion: Deletion, batch_size: int = 1000, max_batches: int | None = None
+) -> bool:
+    """
+    Delete the rows of `deletion` batch by batch, stopping after
+    `max_batches` batches if given. Returns True once everything is gone.
+
+    Only the ids of one batch are loaded at a time, and each batch is
+    committed on its own, so a purge can be interrupted and started again.
+    """
+    if deletion.status == Deletion.QUEUED:
+        issues, comments = Issue._base_manager, Comment._base_manager
+        if deletion.kind == Deletion.ISSUE:
+            deletion.issues_total = 1
+            deletion.comments_total = comments.filter(
+                issue_id=deletion.object_id
+            ).count()
+        else:
+            deletion.issues_total = (
+                issues.filter(project_id=deletion.object_id).count()
+                + ArchivedIssue.objects.filter(project_id=deletion.object_id).count()
+            )
+            deletion.comments_total = (
+                comments.filter(issue__project_id=deletion.object_id).count()
+                + ArchivedComment.objects.filter(
+                    issue__project_id=deletion.object_id
+                ).count()
+            )
+        deletion.status = Deletion.RUNNING
+        deletion.save(update_fields=["status", "issues_total", "comments_total"])
+    batches = 0
+    for queryset, counter in purge_steps(deletion):
+        deleted = batch_size
+        while deleted == batch_size:
+            if max_batches is not None and batches >= max_batches:
+                return False
+            deleted = delete_batch(queryset, batch_size, deletion, counter)
+            batches += 1
+    deletion.status = Deletion.DONE
+    deletion.finished_on = timezone.now()
+    deletion.save(update_fields=["status", "finished_on"])
+    return True
+
+
+@task(max_attempts=5)
+def purge_deletion(deletion_id: int, batch_size: int = 1000):
+    """
+    Purge the rows of a deletion, enqueuing itself again every
+    `BATCHES_PER_RUN` batches until done.
+    """
+    deletion = Deletion.objects.get(pk=deletion_id)
+    if deletion.status == Deletion.DONE:
+        return
+    if not purge(deletion, batch_size, BATCHES_PER_RUN):
+        purge_deletion.enqueue(deletion_id, batch_size)
+
+
+def purge_comments(batch_size: int = 1000) -> int:
+    """
+    Delete the comments marked as deleted for longer than
+    `SOFT_DELETE_RETENTION`, batch by batch. Returns how many were deleted.
+    """
+    expired = Comment._base_manager.filter(
+        deleted_at__lte=timezone.now() - settings.SOFT_DELETE_RETENTION
+    )
+    purged = 0
+    while deleted := delete_batch(expired, batch_size):
+        purged += deleted
+    return purged
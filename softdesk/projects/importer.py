@@ -0,0 +1,384 @@
+import csv
+import json
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Callable, Iterable, Iterator
+
+from django.db import transaction
+
+from softdesk.accounts.models import Contributor, SoftUser
+from softdesk.projects.models import (
+    ISSUE_PRIORITIES,
+    ISSUE_STATUSES,
+    ISSUE_TAGS,
+    ArchivedComment,
+    Comment,
+    ImportCheckpoint,
+    Issue,
+    Project,
+    refresh_comment_stats,
+)
+from softdesk.projects.services import create_projects
+from softdesk.projects.workload import bump_versions
+
+PROJECT_TYPES = {value for value, _ in Project._meta.get_field("type").choices}
+STATUSES = {value for value, _ in ISSUE_STATUSES}
+PRIORITIES = {value for value, _ in ISSUE_PRIORITIES}
+TAGS = {value for value, _ in ISSUE_TAGS}
+STRING_FIELDS = (
+    "name",
+    "description",
+    "type",
+    "project",
+    "issue",
+    "author",
+    "assign_to",
+    "status",
+    "priority",
+    "tag",
+    "content",
+    "uuid",
+)
+
+
+def read_ndjson(stream) -> Iterator[dict]:
+    """
+    Yield the records of a NDJSON stream, one JSON object per line, each
+    with a "kind" key: "project", "issue" or "comment".
+    """
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            yield {"kind": None, "error": f"invalid JSON: {exc}"}
+            continue
+        if isinstance(record, dict):
+            yield record
+        else:
+            yield {"kind": None, "error": "record is not a JSON object"}
+
+
+def read_csv(stream, kind: str) -> Iterator[dict]:
+    """
+    Yield the records of a CSV stream holding records of a single `kind`.
+    Project contributors are given as usernames separated by ";".
+    """
+    for row in csv.DictReader(stream):
+        row["kind"] = kind
+        if kind == "project":
+            row["contributors"] = [
+                username
+                for username in row.get("contributors", "").split(";")
+                if username
+            ]
+        yield row
+
+
+def field_error(record: dict) -> str | None:
+    """
+    Error of the first field of `record` holding a value of the wrong type,
+    if any.
+    """
+    for name in STRING_FIELDS:
+        value = record.get(name)
+        if value is not None and not isinstance(value, str):
+            return f"{name} must be a string"
+    contributors = record.get("contributors", [])
+    if not isinstance(contributors, list) or not all(
+        isinstance(username, str) for username in contributors
+    ):
+        return "contributors must be a list of usernames"
+    return None
+
+
+def parse_uuid(value: str) -> uuid.UUID | None:
+    try:
+        return uuid.UUID(value)
+    except ValueError:
+        return None
+
+
+@dataclass
+class ImportReport:
+    created: dict = field(default_factory=lambda: defaultdict(int))
+    errors: list = field(default_factory=list)
+    processed: int = 0
+    skipped: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.processed / self.elapsed if self.elapsed else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "created": dict(self.created),
+            "errors": self.errors,
+            "processed": self.processed,
+            "skipped": self.skipped,
+            "elapsed": round(self.elapsed, 3),
+            "rows_per_second": round(self.rows_per_second, 1),
+        }
+
+
+class BulkImporter:
+    """
+    Import projects, issues and comments records in chunks.
+
+    Each chunk is validated against batched lookups (users by username,
+    projects and issues by name, contributors per project kept in memory)
+    then inserted with `bulk_create` in a single transaction. Projects go
+    through `create_projects`, which adds their authors and contributors as
+    `Contributor` rows in bulk.
+
+    With a `checkpoint` name, the number of committed records is saved with
+    each chunk and the records already imported are skipped on the next
+    run. Invalid records are skipped and reported with their position.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 1000,
+        checkpoint: str | None = None,
+        progress: Callable[[ImportReport], None] | None = None,
+    ):
+        self.batch_size = batch_size
+        self.checkpoint = checkpoint
+        self.progress = progress
+        self.user_ids = {}
+        self.project_ids = {}
+        self.members = {}
+
+    def run(self, records: Iterable[dict]) -> ImportReport:
+        report = ImportReport()
+        position = 0
+        if self.checkpoint:
+            position = (
+                ImportCheckpoint.objects.filter(source=self.checkpoint)
+                .values_list("position", flat=True)
+                .first()
+            ) or 0
+        report.skipped = position
+        records = islice(records, position, None)
+        started = time.perf_counter()
+        while chunk := list(islice(records, self.batch_size)):
+            with transaction.atomic():
+                self.import_chunk(chunk, position, report)
+                position += len(chunk)
+                if self.checkpoint:
+                    ImportCheckpoint.objects.update_or_create(
+                        source=self.checkpoint, defaults={"position": position}
+                    )
+            report.processed += len(chunk)
+            report.elapsed = time.perf_counter() - started
+            if self.progress:
+                self.progress(report)
+        report.elapsed = time.perf_counter() - started
+        return report
+
+    def import_chunk(self, chunk: list[dict], position: int, report: ImportReport):
+        by_kind = defaultdict(list)
+        for index, record in enumerate(chunk, start=position + 1):
+            if not isinstance(record, dict):
+                error = "record is not an object"
+            elif record.get("kind") not in ("project", "issue", "comment"):
+                error = record.get("error", f"unknown kind {record.get('kind')!r}")
+            else:
+                error = field_error(record)
+            if error:
+                report.errors.append({"record": index, "error": error})
+            else:
+                by_kind[record["kind"]].append((index, record))
+        self.resolve_users(
+            {
+                username
+                for records in by_kind.values()
+                for _, record in records
+                for username in [
+                    record.get("author"),
+                    record.get("assign_to"),
+                    *record.get("contributors", []),
+                ]
+                if username
+            }
+        )
+        if by_kind["project"]:
+            self.import_projects(by_kind["project"], report)
+        if by_kind["issue"]:
+            self.import_issues(by_kind["issue"], report)
+        if by_kind["comment"]:
+            self.import_comments(by_kind["comment"], report)
+
+    def resolve_users(self, usernames: set[str]):
+        missing = usernames - self.user_ids.keys()
+        if missing:
+            self.user_ids.update(
+                SoftUser.objects.filter(username__in=missing).values_list(
+                    "username", "id"
+                )
+            )
+
+    def resolve_projects(self, names: set[str]):
+        missing = names - self.project_ids.keys()
+        if missing:
+            # Names of deleted projects stay taken, but can't be imported into.
+            for name, pk, deleted_at in Project.all_objects.filter(
+                name__in=missing
+            ).values_list("name", "id", "deleted_at"):
+                self.project_ids[name] = None if deleted_at else pk
+
+    def load_members(self, project_ids: set[int]):
+        missing = project_ids - self.members.keys()
+        if not missing:
+            return
+        for project_id in missing:
+            self.members[project_id] = set()
+        for project_id, user_id in Contributor.objects.filter(
+            project_id__in=missing
+        ).values_list("project_id", "user_id"):
+            self.members[project_id].add(user_id)
+
+    def import_projects(self, records: list, report: ImportReport):
+        names = {record.get("name") for _, record in records}
+        self.resolve_projects(names)
+        projects, members = [], []
+        for index, record in records:
+            name = record.get("name")
+            author_id = self.user_ids.get(record.get("author"))
+            contributor_ids = [
+                self.user_ids.get(username)
+                for username in record.get("contributors", [])
+            ]
+            error = None
+            if not name or name in self.project_ids:
+                error = f"project name {name!r} is missing or already used"
+            elif author_id is None:
+                error = f"unknown author {record.get('author')!r}"
+            elif None in contributor_ids:
+                error = "unknown contributor"
+            elif record.get("type") not in PROJECT_TYPES:
+                error = f"invalid type {record.get('type')!r}"
+            if error:
+                report.errors.append({"record": index, "error": error})
+                continue
+            self.project_ids[name] = None
+            projects.append(
+                Project(
+                    name=name,
+                    description=record.get("description") or None,
+                    author_id=author_id,
+                    type=record["type"],
+                )
+            )
+            members.append({author_id, *contributor_ids})
+        create_projects(projects, members)
+        for project, user_ids in zip(projects, members):
+            self.project_ids[project.name] = project.pk
+            self.members[project.pk] = user_ids
+        report.created["project"] += len(projects)
+
+    def import_issues(self, records: list, report: ImportReport):
+        self.resolve_projects({record.get("project") for _, record in records})
+        self.load_members(
+            {
+                self.project_ids[record.get("project")]
+                for _, record in records
+                if self.project_ids.get(record.get("project"))
+            }
+        )
+        names = {record.get("name") for _, record in records}
+        used_names = set(
+            Issue.all_objects.filter(name__in=names).values_list("name", flat=True)
+        )
+        issues = []
+        for index, record in records:
+            name = record.get("name")
+            project_id = self.project_ids.get(record.get("project"))
+            author_id = self.user_ids.get(record.get("author"))
+            assignee_id = self.user_ids.get(record.get("assign_to"))
+            status = record.get("status") or "TODO"
+            priority = record.get("priority") or "LOW"
+            tag = record.get("tag") or "TASK"
+            error = None
+            if not name or name in used_names:
+                error = f"issue name {name!r} is missing or already used"
+            elif project_id is None:
+                error = f"unknown project {record.get('project')!r}"
+            elif author_id is None or assignee_id is None:
+                error = "unknown author or assignee"
+            elif assignee_id not in self.members[project_id]:
+                error = "assignee must be a contributor of the project"
+            elif (
+                status not in STATUSES or priority not in PRIORITIES or tag not in TAGS
+            ):
+                error = "invalid status, priority or tag"
+            if error:
+                report.errors.append({"record": index, "error": error})
+                continue
+            used_names.add(name)
+            issues.append(
+                Issue(
+                    name=name,
+                    description=record.get("description") or None,
+                    project_id=project_id,
+                    author_id=author_id,
+                    assign_to_id=assignee_id,
+                    status=status,
+                    priority=priority,
+                    tag=tag,
+                )
+            )
+        Issue.objects.bulk_create(issues)
+        bump_versions({issue.project_id for issue in issues})
+        report.created["issue"] += len(issues)
+
+    def import_comments(self, records: list, report: ImportReport):
+        issue_ids = dict(
+            Issue.objects.filter(
+                name__in={record.get("issue") for _, record in records}
+            ).values_list("name", "id")
+        )
+        # Archived comments keep their uuid: it can't be given to a new one.
+        uuids = {
+            parse_uuid(record["uuid"]) for _, record in records if record.get("uuid")
+        }
+        uuids.discard(None)
+        used_uuids = set()
+        if uuids:
+            for model in (Comment.all_objects, ArchivedComment.objects):
+                used_uuids.update(
+                    model.filter(uuid__in=uuids).values_list("uuid", flat=True)
+                )
+        comments = []
+        for index, record in records:
+            issue_id = issue_ids.get(record.get("issue"))
+            author_id = self.user_ids.get(record.get("author"))
+            comment_uuid = parse_uuid(record["uuid"]) if record.get("uuid") else None
+            error = None
+            if issue_id is None or author_id is None:
+                error = "unknown issue or author"
+            elif record.get("uuid") and comment_uuid is None:
+                error = f"invalid uuid {record['uuid']!r}"
+            elif comment_uuid in used_uuids:
+                error = f"uuid {record['uuid']!r} is already used"
+            if error:
+                report.errors.append({"record": index, "error": error})
+                continue
+            comment = Comment(
+                issue_id=issue_id, author_id=author_id, content=record.get("content")
+            )
+            if comment_uuid:
+                used_uuids.add(comment_uuid)
+                comment.uuid = comment_uuid
+            comments.append(comment)
+        Comment.objects.bulk_create(comments)
+        refresh_comment_stats(
+            Issue.all_objects.filter(pk__in={comment.issue_id for comment in comments})
+        )
+        report.created["comment"] += len(comments)
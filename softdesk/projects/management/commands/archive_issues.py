@@ -0,0 +1,47 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from softdesk.projects.archive import archivable_issues, archive_issues
+
+
+class Command(BaseCommand):
+    help = (
+        "Move finished issues older than a number of days, with their comments, "
+        "to the archive tables. Batches are committed one by one: an interrupted "
+        "run resumes where it stopped when started again."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=180,
+            help="Archive issues finished for more than this many days.",
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--after-id",
+            type=int,
+            default=0,
+            help="Skip the issues up to this id, as reported by a previous run.",
+        )
+
+    def handle(self, *args, **options):
+        finished_before = timezone.now() - timedelta(days=options["days"])
+        remaining = archivable_issues(finished_before).count()
+        self.stdout.write(f"{remaining} issues to archive.")
+        archived = 0
+        started = time.perf_counter()
+        for issue_ids in archive_issues(
+            finished_before, options["batch_size"], options["after_id"]
+        ):
+            archived += len(issue_ids)
+            self.stdout.write(
+                f"Archived {archived}/{remaining} issues (last id {issue_ids[-1]})."
+            )
+        self.stdout.write(
+            f"Done: {archived} issues archived in {time.perf_counter() - started:.1f}s."
+        )
@@ -0,0 +1,67 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from softdesk.projects.importer import BulkImporter, read_csv, read_ndjson
+
+
+class Command(BaseCommand):
+    help = (
+        "Import projects, issues and comments from a NDJSON or CSV file. "
+        "Progress is checkpointed: running the command again on the same file "
+        "resumes after the last committed chunk."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", type=Path)
+        parser.add_argument(
+            "--format",
+            choices=["ndjson", "csv"],
+            help="Defaults to the file extension.",
+        )
+        parser.add_argument(
+            "--kind",
+            choices=["project", "issue", "comment"],
+            help="Kind of the records of a CSV file.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--checkpoint",
+            help="Name under which progress is saved, defaults to the file path.",
+        )
+
+    def handle(self, *args, **options):
+        path: Path = options["path"]
+        file_format = options["format"] or path.suffix.lstrip(".").lower()
+        if file_format not in ("ndjson", "csv"):
+            raise CommandError("Use --format to give the format of the file.")
+        if file_format == "csv" and not options["kind"]:
+            raise CommandError("--kind is required to import a CSV file.")
+
+        importer = BulkImporter(
+            batch_size=options["batch_size"],
+            checkpoint=options["checkpoint"] or f"file:{path.resolve()}",
+            progress=lambda report: self.stdout.write(
+                f"{report.skipped + report.processed} records "
+                f"({report.rows_per_second:.0f} records/s)"
+            ),
+        )
+        with path.open(newline="", encoding="utf-8") as stream:
+            if file_format == "csv":
+                records = read_csv(stream, options["kind"])
+            else:
+                records = read_ndjson(stream)
+            report = importer.run(records)
+
+        if report.skipped:
+            self.stdout.write(f"Resumed after {report.skipped} records.")
+        for error in report.errors:
+            self.stderr.write(f"Record {error['record']}: {error['error']}")
+        created = ", ".join(
+            f"{count} {kind}s" for kind, count in report.created.items()
+        )
+        self.stdout.write(
+            f"Created {created or 'nothing'} from {report.processed} records in "
+            f"{report.elapsed:.1f}s ({report.rows_per_second:.0f} records/s), "
+            f"{len(report.errors)} errors."
+        )
@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from softdesk.projects.deletion import purge, purge_comments
+from softdesk.projects.models import Deletion
+
+
+class Command(BaseCommand):
+    help = (
+        "Purge the projects, issues and comments deleted for longer than "
+        "SOFT_DELETE_RETENTION, and finish the deletions left over by a restart "
+        "of the process running the tasks. Meant to be run periodically."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        pending = (
+            Deletion.objects.exclude(status=Deletion.DONE)
+            .filter(purge_after__lte=timezone.now())
+            .order_by("pk")
+        )
+        self.stdout.write(f"{pending.count()} deletions to finish.")
+        for deletion in pending:
+            started = time.perf_counter()
+            purge(deletion, options["batch_size"])
+            deletion.refresh_from_db()
+            self.stdout.write(
+                f"Purged {deletion}: {deletion.issues_deleted} issues and "
+                f"{deletion.comments_deleted} comments in "
+                f"{time.perf_counter() - started:.1f}s."
+            )
+        purged = purge_comments(options["batch_size"])
+        self.stdout.write(f"Purged {purged} deleted comments.")
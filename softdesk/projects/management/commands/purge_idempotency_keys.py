@@ -0,0 +1,15 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from softdesk.projects.models import IdempotencyKey
+
+
+class Command(BaseCommand):
+    help = "Delete the Idempotency-Key records older than IDEMPOTENCY_KEY_TTL."
+
+    def handle(self, *args, **options):
+        deleted, _ = IdempotencyKey.objects.filter(
+            created_on__lt=timezone.now() - settings.IDEMPOTENCY_KEY_TTL
+        ).delete()
+        self.stdout.write(f"Deleted {deleted} expired idempotency keys.")
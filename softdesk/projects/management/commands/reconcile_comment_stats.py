@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from softdesk.projects.models import Issue, live_comment_stats, refresh_comment_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the comment_count and last_comment_at of the issues whose "
+        "stored values drifted from their live comments, batch by batch."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        stats = live_comment_stats()
+        checked = fixed = after_id = 0
+        while batch := list(
+            Issue.all_objects.filter(pk__gt=after_id)
+            .order_by("pk")
+            .annotate(**{f"actual_{name}": value for name, value in stats.items()})
+            .values_list("pk", *stats, *(f"actual_{name}" for name in stats))[
+                : options["batch_size"]
+            ]
+        ):
+            after_id = batch[-1][0]
+            checked += len(batch)
+            drifted = [
+                pk
+                for pk, count, last, actual_count, actual_last in batch
+                if (count, last) != (actual_count, actual_last)
+            ]
+            if drifted:
+                fixed += refresh_comment_stats(Issue.all_objects.filter(pk__in=drifted))
+        self.stdout.write(f"Fixed the comment stats of {fixed}/{checked} issues.")
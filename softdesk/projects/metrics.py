@@ -0,0 +1,78 @@
+from datetime import datetime
+
+from django.db.models import Avg, Count, DurationField, ExpressionWrapper, F
+from django.db.models import OuterRef, Subquery
+from django.db.models.functions import Coalesce, TruncWeek
+
+from softdesk.projects.models import ArchivedIssue, Issue, IssueTransition
+
+
+def duration(end: str, start: str) -> ExpressionWrapper:
+    return ExpressionWrapper(F(end) - F(start), output_field=DurationField())
+
+
+def project_metrics(project_id: int, since: datetime) -> dict:
+    """
+    Flow metrics of the issues of a project finished since `since`, from
+    their transitions, in two aggregate queries.
+
+    Throughput is the number of transitions to END per week. Each of them
+    is timed from the creation of its issue (lead time) and from the first
+    WIP transition before it (cycle time), then split into time to start
+    (TODO) and time in progress (WIP). Durations are averages in seconds,
+    None without finished issues.
+    """
+    finished = IssueTransition.objects.filter(
+        project_id=project_id,
+        field=IssueTransition.STATUS,
+        new_value="END",
+        changed_on__gte=since,
+    )
+    throughput = (
+        finished.annotate(week=TruncWeek("changed_on"))
+        .values("week")
+        .annotate(finished=Count("pk"))
+        .order_by("week")
+    )
+    started_on = (
+        IssueTransition.objects.filter(
+            issue_id=OuterRef("issue_id"),
+            field=IssueTransition.STATUS,
+            new_value="WIP",
+            changed_on__lte=OuterRef("changed_on"),
+        )
+        .order_by("changed_on")
+        .values("changed_on")[:1]
+    )
+    # Finished issues may have been archived since.
+    created_on = Coalesce(
+        Subquery(
+            Issue.all_objects.filter(pk=OuterRef("issue_id")).values("created_on")
+        ),
+        Subquery(
+            ArchivedIssue.objects.filter(pk=OuterRef("issue_id")).values("created_on")
+        ),
+    )
+    averages = (
+        finished.annotate(started_on=Subquery(started_on), created_on=created_on)
+        .order_by()
+        .aggregate(
+            finished=Count("pk"),
+            lead_time=Avg(duration("changed_on", "created_on")),
+            cycle_time=Avg(duration("changed_on", "started_on")),
+            todo_time=Avg(duration("started_on", "created_on")),
+        )
+    )
+    seconds = {
+        name: None if value is None else round(value.total_seconds())
+        for name, value in averages.items()
+        if name != "finished"
+    }
+    return {
+        "since": since,
+        "finished": averages["finished"],
+        "throughput": list(throughput),
+        "lead_time": seconds["lead_time"],
+        "cycle_time": seconds["cycle_time"],
+        "stages": {"TODO": seconds["todo_time"], "WIP": seconds["cycle_time"]},
+    }
@@ -0,0 +1,103 @@
+# Generated by Django 5.0.14 on 2026-10-19 10:55
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0006_idempotencykey"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedIssue",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("name", models.CharField(db_index=True, max_length=100)),
+                ("description", models.TextField(blank=True, null=True)),
+                ("created_on", models.DateTimeField()),
+                ("updated_on", models.DateTimeField()),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("TODO", "to do"),
+                            ("WIP", "work in progress"),
+                            ("END", "finished"),
+                        ],
+                        max_length=4,
+                    ),
+                ),
+                (
+                    "priority",
+                    models.CharField(
+                        choices=[("LOW", "low"), ("MED", "medium"), ("HIG", "high")],
+                        max_length=3,
+                    ),
+                ),
+                (
+                    "tag",
+                    models.CharField(
+                        choices=[("BUG", "bug"), ("TASK", "task"), ("FEAT", "feature")],
+                        max_length=4,
+                    ),
+                ),
+                ("archived_on", models.DateTimeField(auto_now_add=True)),
+                (
+                    "assign_to",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "author",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "project",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_issues",
+                        to="projects.project",
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="ArchivedComment",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("content", models.TextField(blank=True, null=True)),
+                ("created_on", models.DateTimeField()),
+                ("updated_on", models.DateTimeField()),
+                ("uuid", models.UUIDField(editable=False, unique=True)),
+                ("archived_on", models.DateTimeField(auto_now_add=True)),
+                (
+                    "author",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "issue",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="comments",
+                        to="projects.archivedissue",
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.0.14 on 2026-10-19 10:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0007_archivedissue_archivedcomment"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ImportCheckpoint",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("source", models.CharField(max_length=255, unique=True)),
+                ("position", models.PositiveBigIntegerField(default=0)),
+                ("updated_on", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 5.0.14 on 2026-10-19 11:02
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0008_importcheckpoint"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="issue",
+            name="deleted_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="deleted_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.CreateModel(
+            name="Deletion",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[("PRJ", "project"), ("ISS", "issue")], max_length=3
+                    ),
+                ),
+                ("object_id", models.BigIntegerField()),
+                ("name", models.CharField(max_length=100)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("QUE", "queued"),
+                            ("RUN", "running"),
+                            ("END", "done"),
+                        ],
+                        default="QUE",
+                        max_length=3,
+                    ),
+                ),
+                ("issues_total", models.PositiveIntegerField(null=True)),
+                ("comments_total", models.PositiveIntegerField(null=True)),
+                ("issues_deleted", models.PositiveIntegerField(default=0)),
+                ("comments_deleted", models.PositiveIntegerField(default=0)),
+                ("requested_on", models.DateTimeField(auto_now_add=True)),
+                ("finished_on", models.DateTimeField(blank=True, null=True)),
+                (
+                    "requested_by",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("kind", "object_id")},
+            },
+        ),
+    ]
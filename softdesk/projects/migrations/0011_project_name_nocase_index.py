@@ -0,0 +1,24 @@
+# Generated by Django 5.0.14 on 2026-10-19 11:07
+
+import django.db.models.functions.comparison
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0006_nocase_search_indexes"),
+        ("projects", "0010_soft_delete"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="project",
+            index=models.Index(
+                django.db.models.functions.comparison.Collate("name", "nocase"),
+                name="project_name_nocase_idx",
+            ),
+        ),
+    ]
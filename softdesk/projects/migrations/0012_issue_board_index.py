@@ -0,0 +1,23 @@
+# Generated by Django 5.0.14 on 2026-10-19 11:24
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0011_project_name_nocase_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="issue",
+            index=models.Index(
+                condition=models.Q(("deleted_at__isnull", True)),
+                fields=["project", "status", "-created_on"],
+                name="issue_board_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 5.0.14 on 2026-10-19 11:26
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_comment_stats(apps, schema_editor):
+    for issue_model, comments in (
+        (
+            apps.get_model("projects", "Issue"),
+            apps.get_model("projects", "Comment").objects.filter(
+                deleted_at__isnull=True
+            ),
+        ),
+        (
+            apps.get_model("projects", "ArchivedIssue"),
+            apps.get_model("projects", "ArchivedComment").objects.all(),
+        ),
+    ):
+        comments = comments.filter(issue=OuterRef("pk")).order_by().values("issue")
+        issue_model.objects.update(
+            comment_count=Coalesce(
+                Subquery(comments.annotate(count=Count("pk")).values("count")), 0
+            ),
+            last_comment_at=Subquery(
+                comments.annotate(last=Max("created_on")).values("last")
+            ),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0012_issue_board_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="archivedissue",
+            name="comment_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="archivedissue",
+            name="last_comment_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="issue",
+            name="comment_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="issue",
+            name="last_comment_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(fill_comment_stats, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="issue",
+            index=models.Index(
+                condition=models.Q(("deleted_at__isnull", True)),
+                fields=["project", "-last_comment_at"],
+                name="issue_activity_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="issue",
+            index=models.Index(
+                condition=models.Q(("deleted_at__isnull", True)),
+                fields=["project", "-comment_count"],
+                name="issue_comment_count_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.0.14 on 2026-10-19 11:28
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0013_issue_comment_stats"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IssueTransition",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("issue_id", models.BigIntegerField()),
+                (
+                    "field",
+                    models.CharField(
+                        choices=[("S", "status"), ("P", "priority"), ("A", "assignee")],
+                        max_length=1,
+                    ),
+                ),
+                ("old_value", models.CharField(max_length=20, null=True)),
+                ("new_value", models.CharField(max_length=20, null=True)),
+                ("changed_on", models.DateTimeField(default=django.utils.timezone.now)),
+                (
+                    "project",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="projects.project",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["project", "field", "new_value", "changed_on"],
+                        name="transition_metrics_idx",
+                    ),
+                    models.Index(
+                        fields=["issue_id", "field", "changed_on"],
+                        name="transition_issue_idx",
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.14 on 2026-10-19 11:35
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0014_issue_transition"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="issue",
+            index=models.Index(
+                condition=models.Q(("deleted_at__isnull", True)),
+                fields=["project", "status", "assign_to", "priority"],
+                name="issue_workload_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.0.14 on 2026-10-19 11:42
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0007_contributor_joined_idx"),
+        ("projects", "0015_issue_workload_idx"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="archivedcomment",
+            index=models.Index(
+                fields=["issue", "-created_on"], name="archived_comment_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="archivedcomment",
+            index=models.Index(
+                fields=["issue", "-updated_on"], name="archived_comment_updated_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="archivedissue",
+            index=models.Index(
+                fields=["project", "-created_on"], name="archived_issue_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="archivedissue",
+            index=models.Index(
+                fields=["project", "-updated_on"], name="archived_issue_updated_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                condition=models.Q(("deleted_at__isnull", True)),
+                fields=["issue", "-updated_on"],
+                name="comment_updated_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="issue",
+            index=models.Index(
+                condition=models.Q(("deleted_at__isnull", True)),
+                fields=["project", "-updated_on"],
+                name="issue_updated_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="project",
+            index=models.Index(
+                condition=models.Q(("deleted_at__isnull", True)),
+                fields=["-updated_on"],
+                name="project_updated_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.0.14 on 2026-10-19 14:05
+
+from django.db import migrations, models
+
+from softdesk.renderers import pack
+
+
+def pack_response_bodies(apps, schema_editor):
+    IdempotencyKey = apps.get_model("projects", "IdempotencyKey")
+    keys = list(IdempotencyKey.objects.filter(response_status__isnull=False))
+    for key in keys:
+        key.response_data = pack(key.response_body)
+    IdempotencyKey.objects.bulk_update(keys, ["response_data"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0016_date_range_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="idempotencykey",
+            name="response_data",
+            field=models.BinaryField(null=True),
+        ),
+        migrations.RunPython(pack_response_bodies, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name="idempotencykey",
+            name="response_body",
+        ),
+        migrations.RenameField(
+            model_name="idempotencykey",
+            old_name="response_data",
+            new_name="response_body",
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.0.14 on 2026-10-19 14:31
+
+from django.db import migrations, models
+
+
+def fill_name_lower(apps, schema_editor):
+    # In Python rather than with LOWER(), which SQLite limits to ASCII.
+    Project = apps.get_model("projects", "Project")
+    projects = []
+    for project in Project.objects.only("name").iterator():
+        project.name_lower = project.name.lower()
+        projects.append(project)
+    Project.objects.bulk_update(projects, ["name_lower"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0017_idempotencykey_msgpack_body"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="project",
+            name="project_name_nocase_idx",
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="name_lower",
+            field=models.CharField(default="", editable=False, max_length=100),
+            preserve_default=False,
+        ),
+        migrations.RunPython(fill_name_lower, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="project",
+            index=models.Index(fields=["name_lower"], name="project_name_lower_idx"),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.0.14 on 2026-10-19 14:48
+
+import softdesk.projects.models
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0018_project_name_lower"),
+    ]
+
+    # The columns are unchanged: only the fields' save behaviour differs.
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name="issue",
+                    name="comment_count",
+                    field=softdesk.projects.models.KeptOnSaveCountField(
+                        default=0, editable=False
+                    ),
+                ),
+                migrations.AlterField(
+                    model_name="issue",
+                    name="last_comment_at",
+                    field=softdesk.projects.models.KeptOnSaveDateTimeField(
+                        blank=True, editable=False, null=True
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -1,12 +1,50 @@
 import uuid
 
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, F, Max, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
 
 from softdesk.accounts.models import SoftUser, Contributor
 
+LIVE = Q(deleted_at__isnull=True)
+DELETED = Q(deleted_at__isnull=False)
+
+
+class LiveManager(models.Manager):
+    """
+    Manager leaving out the rows marked for deletion, a condition covered by
+    the partial indexes of the models using it.
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
+
+class KeptOnSaveMixin:
+    """
+    Field written when its row is inserted, and only by queryset updates
+    afterwards: saving an instance leaves the column as it is in the row.
+    """
+
+    def pre_save(self, model_instance, add):
+        if add:
+            return super().pre_save(model_instance, add)
+        return F(self.attname)
+
+
+class KeptOnSaveCountField(KeptOnSaveMixin, models.PositiveIntegerField):
+    pass
+
+
+class KeptOnSaveDateTimeField(KeptOnSaveMixin, models.DateTimeField):
+    pass
+
 
 class Project(models.Model):
     name = models.CharField(max_length=100, unique=True)
+    # Set by save() and create_projects(), for the prefix searches.
+    name_lower = models.CharField(max_length=100, editable=False)
     description = models.TextField(blank=True, null=True)
     created_on = models.DateTimeField(auto_now_add=True)
     updated_on = models.DateTimeField(auto_now=True)
@@ -25,15 +63,59 @@ class Project(models.Model):
     contributors = models.ManyToManyField(
         SoftUser, through=Contributor, related_name="contributed_projects"
     )
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = LiveManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["-created_on"], condition=LIVE, name="project_live_idx"
+            ),
+            models.Index(
+                fields=["deleted_at"], condition=DELETED, name="project_tombstone_idx"
+            ),
+            models.Index(fields=["name_lower"], name="project_name_lower_idx"),
+            # ?updated_since=
+            models.Index(
+                fields=["-updated_on"], condition=LIVE, name="project_updated_idx"
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
     def save(self, *args, **kwargs):
+        self.name_lower = self.name.lower()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "name" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "name_lower"}
         have_not_been_created = not self.pk
-        super().save(*args, **kwargs)
-        if have_not_been_created:
-            self.contributors.add(self.author)
+        if not have_not_been_created:
+            return super().save(*args, **kwargs)
+        # Insert the author row directly: contributors.add() would first
+        # look for existing rows and send m2m_changed signals.
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+            Contributor.objects.create(project=self, user_id=self.author_id)
+
+
+ISSUE_STATUSES = [
+    ("TODO", "to do"),
+    ("WIP", "work in progress"),
+    ("END", "finished"),
+]
+ISSUE_PRIORITIES = [
+    ("LOW", "low"),
+    ("MED", "medium"),
+    ("HIG", "high"),
+]
+ISSUE_TAGS = [
+    ("BUG", "bug"),
+    ("TASK", "task"),
+    ("FEAT", "feature"),
+]
 
 
 class Issue(models.Model):
@@ -50,37 +132,103 @@ class Issue(models.Model):
     )
     created_on = models.DateTimeField(auto_now_add=True)
     updated_on = models.DateTimeField(auto_now=True)
-    status = models.CharField(
-        max_length=4,
-        choices=[
-            ("TODO", "to do"),
-            ("WIP", "work in progress"),
-            ("END", "finished"),
-        ],
-        default="TODO",
-    )
-    priority = models.CharField(
-        max_length=3,
-        choices=[
-            ("LOW", "low"),
-            ("MED", "medium"),
-            ("HIG", "high"),
-        ],
-        default="LOW",
-    )
-    tag = models.CharField(
-        max_length=4,
-        choices=[
-            ("BUG", "bug"),
-            ("TASK", "task"),
-            ("FEAT", "feature"),
-        ],
-        default="TASK",
-    )
+    status = models.CharField(max_length=4, choices=ISSUE_STATUSES, default="TODO")
+    priority = models.CharField(max_length=3, choices=ISSUE_PRIORITIES, default="LOW")
+    tag = models.CharField(max_length=4, choices=ISSUE_TAGS, default="TASK")
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+    # Live comments of the issue, kept up to date by Comment. Saving an
+    # issue loaded before a comment was added must not roll them back.
+    comment_count = KeptOnSaveCountField(default=0, editable=False)
+    last_comment_at = KeptOnSaveDateTimeField(null=True, blank=True, editable=False)
+
+    objects = LiveManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["project", "-created_on"], condition=LIVE, name="issue_live_idx"
+            ),
+            models.Index(
+                fields=["deleted_at"], condition=DELETED, name="issue_tombstone_idx"
+            ),
+            # Board columns, newest issues of a project per status.
+            models.Index(
+                fields=["project", "status", "-created_on"],
+                condition=LIVE,
+                name="issue_board_idx",
+            ),
+            models.Index(
+                fields=["project", "-last_comment_at"],
+                condition=LIVE,
+                name="issue_activity_idx",
+            ),
+            models.Index(
+                fields=["project", "-comment_count"],
+                condition=LIVE,
+                name="issue_comment_count_idx",
+            ),
+            # Covers the open issues per assignee and priority of projects.
+            models.Index(
+                fields=["project", "status", "assign_to", "priority"],
+                condition=LIVE,
+                name="issue_workload_idx",
+            ),
+            # ?updated_since=, within the projects of the user.
+            models.Index(
+                fields=["project", "-updated_on"],
+                condition=LIVE,
+                name="issue_updated_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        issue = super().from_db(db, field_names, values)
+        issue._tracked_values = issue.tracked_values()
+        issue._loaded_project_id = issue.__dict__.get("project_id")
+        return issue
+
+    def tracked_values(self) -> dict:
+        """
+        Loaded values of the fields whose changes are logged as transitions.
+        """
+        attnames = {
+            name: self._meta.get_field(name).attname for name in IssueTransition.FIELDS
+        }
+        return {
+            name: self.__dict__[attname]
+            for name, attname in attnames.items()
+            if attname in self.__dict__
+        }
+
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            super().save(*args, **kwargs)
+            # Later saves of this instance log their changes from here.
+            self._tracked_values = self.tracked_values()
+            return
+        update_fields = kwargs.get("update_fields")
+        loaded = getattr(self, "_tracked_values", {})
+        current = self.tracked_values()
+        changes = [
+            (name, loaded[name], current[name])
+            for name in loaded
+            if (update_fields is None or name in update_fields)
+            and loaded[name] != current.get(name)
+        ]
+        if not changes:
+            return super().save(*args, **kwargs)
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+            IssueTransition.objects.bulk_create(
+                IssueTransition.from_changes(self.pk, self.project_id, changes)
+            )
+        self._tracked_values = current
+
 
 class Comment(models.Model):
     author = models.ForeignKey(
@@ -91,6 +239,303 @@ class Comment(models.Model):
     created_on = models.DateTimeField(auto_now_add=True)
     updated_on = models.DateTimeField(auto_now=True)
     uuid = models.UUIDField(unique=True, default=uuid.uuid4, editable=False)
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = LiveManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["issue", "-created_on"], condition=LIVE, name="comment_live_idx"
+            ),
+            models.Index(
+                fields=["deleted_at"], condition=DELETED, name="comment_tombstone_idx"
+            ),
+            # ?updated_since=, within the issues of the projects of the user.
+            models.Index(
+                fields=["issue", "-updated_on"],
+                condition=LIVE,
+                name="comment_updated_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return self.content
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        comment = super().from_db(db, field_names, values)
+        comment._loaded_issue_id = comment.__dict__.get("issue_id")
+        return comment
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        moved_from = getattr(self, "_loaded_issue_id", self.issue_id)
+        if not adding and moved_from == self.issue_id:
+            return super().save(*args, **kwargs)
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+            if adding:
+                # Incremented in SQL, so concurrent comments are all counted.
+                Issue.all_objects.filter(pk=self.issue_id).update(
+                    comment_count=F("comment_count") + 1,
+                    last_comment_at=Greatest(
+                        Coalesce("last_comment_at", Value(self.created_on)),
+                        Value(self.created_on),
+                    ),
+                )
+            else:
+                refresh_comment_stats(
+                    Issue.all_objects.filter(pk__in=[moved_from, self.issue_id])
+                )
+        self._loaded_issue_id = self.issue_id
+
+    def soft_delete(self):
+        """
+        Mark the comment as deleted and take it out of the stats of its
+        issue, once however many requests delete it at the same time.
+        """
+        with transaction.atomic(savepoint=False):
+            self.deleted_at = timezone.now()
+            deleted = Comment.objects.filter(pk=self.pk).update(
+                deleted_at=self.deleted_at
+            )
+            if deleted:
+                Issue.all_objects.filter(pk=self.issue_id).update(
+                    comment_count=F("comment_count") - 1,
+                    last_comment_at=Subquery(
+                        Comment.objects.filter(issue=OuterRef("pk"))
+                        .order_by("-created_on")
+                        .values("created_on")[:1]
+                    ),
+                )
+
+
+def live_comment_stats() -> dict:
+    """
+    Expressions computing the comment stats of an issue from its live
+    comments, for `annotate()` or `update()`.
+    """
+    comments = Comment.objects.filter(issue=OuterRef("pk")).order_by().values("issue")
+    return {
+        "comment_count": Coalesce(
+            Subquery(comments.annotate(count=Count("pk")).values("count")), 0
+        ),
+        "last_comment_at": Subquery(
+            comments.annotate(last=Max("created_on")).values("last")
+        ),
+    }
+
+
+def refresh_comment_stats(issues: models.QuerySet) -> int:
+    """
+    Recompute the comment stats of `issues` in one UPDATE. Returns the
+    number of issues updated.
+    """
+    return issues.update(**live_comment_stats())
+
+
+class ArchivedIssue(models.Model):
+    """
+    Finished issue moved out of the `Issue` table by the `archive_issues`
+    command, keeping its original id.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    name = models.CharField(max_length=100, db_index=True)
+    description = models.TextField(blank=True, null=True)
+    author = models.ForeignKey(SoftUser, on_delete=models.CASCADE, related_name="+")
+    assign_to = models.ForeignKey(SoftUser, on_delete=models.CASCADE, related_name="+")
+    project = models.ForeignKey(
+        Project, on_delete=models.CASCADE, related_name="archived_issues"
+    )
+    created_on = models.DateTimeField()
+    updated_on = models.DateTimeField()
+    status = models.CharField(max_length=4, choices=ISSUE_STATUSES)
+    priority = models.CharField(max_length=3, choices=ISSUE_PRIORITIES)
+    tag = models.CharField(max_length=4, choices=ISSUE_TAGS)
+    comment_count = models.PositiveIntegerField(default=0)
+    last_comment_at = models.DateTimeField(null=True, blank=True)
+    archived_on = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        # Date ranges of ?include_archived=1 lists, as on Issue.
+        indexes = [
+            models.Index(
+                fields=["project", "-created_on"], name="archived_issue_created_idx"
+            ),
+            models.Index(
+                fields=["project", "-updated_on"], name="archived_issue_updated_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+class ArchivedComment(models.Model):
+    """
+    Comment archived together with its issue, keeping its original id.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    author = models.ForeignKey(SoftUser, on_delete=models.CASCADE, related_name="+")
+    issue = models.ForeignKey(
+        ArchivedIssue, on_delete=models.CASCADE, related_name="comments"
+    )
+    content = models.TextField(blank=True, null=True)
+    created_on = models.DateTimeField()
+    updated_on = models.DateTimeField()
+    uuid = models.UUIDField(unique=True, editable=False)
+    archived_on = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["issue", "-created_on"], name="archived_comment_created_idx"
+            ),
+            models.Index(
+                fields=["issue", "-updated_on"], name="archived_comment_updated_idx"
+            ),
+        ]
 
     def __str__(self):
         return self.content
+
+
+class IdempotencyKey(models.Model):
+    """
+    Response of a create request sent with an `Idempotency-Key` header,
+    replayed when the same user retries with the same key.
+
+    The body is kept as MessagePack, which keeps the UUIDs and datetimes of
+    the response data: replays are rendered like the original response,
+    whatever the renderer.
+    """
+
+    user = models.ForeignKey(SoftUser, on_delete=models.CASCADE)
+    key = models.CharField(max_length=255)
+    request_fingerprint = models.CharField(max_length=64)
+    response_status = models.PositiveSmallIntegerField(null=True)
+    response_body = models.BinaryField(null=True)
+    created_on = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        unique_together = ["user", "key"]
+
+
+class ImportCheckpoint(models.Model):
+    """
+    Number of records of a bulk import source already committed, saved in
+    the same transaction as each chunk so an interrupted import can resume.
+    """
+
+    source = models.CharField(max_length=255, unique=True)
+    position = models.PositiveBigIntegerField(default=0)
+    updated_on = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.source} ({self.position})"
+
+
+class Deletion(models.Model):
+    """
+    Progress of the background deletion of a project or an issue, marked as
+    deleted when requested then purged in batches by `purge_deletion` once
+    `purge_after` is reached.
+    """
+
+    PROJECT = "PRJ"
+    ISSUE = "ISS"
+    QUEUED = "QUE"
+    RUNNING = "RUN"
+    DONE = "END"
+
+    kind = models.CharField(
+        max_length=3, choices=[(PROJECT, "project"), (ISSUE, "issue")]
+    )
+    object_id = models.BigIntegerField()
+    name = models.CharField(max_length=100)
+    requested_by = models.ForeignKey(
+        SoftUser, on_delete=models.SET_NULL, null=True, related_name="+"
+    )
+    status = models.CharField(
+        max_length=3,
+        choices=[(QUEUED, "queued"), (RUNNING, "running"), (DONE, "done")],
+        default=QUEUED,
+    )
+    issues_total = models.PositiveIntegerField(null=True)
+    comments_total = models.PositiveIntegerField(null=True)
+    issues_deleted = models.PositiveIntegerField(default=0)
+    comments_deleted = models.PositiveIntegerField(default=0)
+    requested_on = models.DateTimeField(auto_now_add=True)
+    purge_after = models.DateTimeField(default=timezone.now)
+    finished_on = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ["kind", "object_id"]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} {self.name} ({self.get_status_display()})"
+
+
+class IssueTransition(models.Model):
+    """
+    Change of the status, priority or assignee of an issue, appended by
+    `Issue.save` and `update_issues`.
+
+    Rows only keep the id of their issue, so they outlive its archiving and
+    project metrics cover the whole history of the project.
+    """
+
+    STATUS = "S"
+    PRIORITY = "P"
+    ASSIGNEE = "A"
+    FIELDS = {"status": STATUS, "priority": PRIORITY, "assign_to": ASSIGNEE}
+
+    issue_id = models.BigIntegerField()
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name="+")
+    field = models.CharField(
+        max_length=1,
+        choices=[(STATUS, "status"), (PRIORITY, "priority"), (ASSIGNEE, "assignee")],
+    )
+    old_value = models.CharField(max_length=20, null=True)
+    new_value = models.CharField(max_length=20, null=True)
+    changed_on = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # Project metrics: the transitions to a status over a period.
+            models.Index(
+                fields=["project", "field", "new_value", "changed_on"],
+                name="transition_metrics_idx",
+            ),
+            models.Index(
+                fields=["issue_id", "field", "changed_on"],
+                name="transition_issue_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.get_field_display()} {self.old_value} -> {self.new_value}"
+
+    @classmethod
+    def from_changes(
+        cls, issue_id: int, project_id: int, changes: list[tuple], changed_on=None
+    ) -> list["IssueTransition"]:
+        """
+        Transitions of the (field name, old value, new value) `changes`.
+        """
+        changed_on = changed_on or timezone.now()
+        return [
+            cls(
+                issue_id=issue_id,
+                project_id=project_id,
+                field=cls.FIELDS[name],
+                old_value=None if old is None else str(old),
+                new_value=None if new is None else str(new),
+                changed_on=changed_on,
+            )
+            for name, old, new in changes
+        ]
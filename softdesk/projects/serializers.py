@@ -1,6 +1,87 @@
+from collections import defaultdict
+
+from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework import serializers
-from softdesk.accounts.models import SoftUser
-from softdesk.projects.models import Issue, Project, Comment
+from rest_framework.fields import empty
+from rest_framework.validators import UniqueValidator
+from softdesk.accounts.models import Contributor, SoftUser
+from softdesk.projects.services import create_project
+from softdesk.projects.models import (
+    ArchivedComment,
+    ArchivedIssue,
+    Comment,
+    Deletion,
+    Issue,
+    Project,
+)
+
+
+class NativeUUIDField(serializers.UUIDField):
+    """
+    UUID field handing `uuid.UUID` objects to the renderer, so each format
+    picks its own encoding (hex string in JSON, raw bytes in MessagePack).
+    """
+
+    def to_representation(self, value):
+        return value
+
+
+class BulkPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Primary key field taking its object from those its parent, a
+    `BulkRelatedFieldsMixin` serializer, fetched for all such fields at once.
+    """
+
+    def to_internal_value(self, data):
+        fetched = getattr(self.parent, "_fetched_related", {}).get(self.fetch_key())
+        if fetched is None or isinstance(data, bool):
+            return super().to_internal_value(data)
+        pk = self.parse_pk(data)
+        if pk is None:
+            return super().to_internal_value(data)
+        if pk not in fetched:
+            self.fail("does_not_exist", pk_value=data)
+        return fetched[pk]
+
+    def fetch_key(self) -> str:
+        # Fields whose querysets run the same query share one lookup.
+        return str(self.get_queryset().query)
+
+    def parse_pk(self, data):
+        try:
+            return self.get_queryset().model._meta.pk.to_python(data)
+        except (DjangoValidationError, TypeError, ValueError):
+            return None
+
+
+class BulkRelatedFieldsMixin:
+    """
+    Look up the objects of the `BulkPrimaryKeyRelatedField` fields of a
+    serializer with one query per queryset, instead of one per field.
+    """
+
+    def to_internal_value(self, data):
+        fields = {}
+        pks = defaultdict(set)
+        for field in self._writable_fields:
+            if not isinstance(field, BulkPrimaryKeyRelatedField):
+                continue
+            value = field.get_value(data)
+            if value is empty or value is None or isinstance(value, bool):
+                continue
+            pk = field.parse_pk(value)
+            if pk is not None:
+                key = field.fetch_key()
+                fields.setdefault(key, field)
+                pks[key].add(pk)
+        self._fetched_related = {
+            key: fields[key].get_queryset().in_bulk(key_pks)
+            for key, key_pks in pks.items()
+        }
+        try:
+            return super().to_internal_value(data)
+        finally:
+            del self._fetched_related
 
 
 class ProjectSerializer(serializers.ModelSerializer):
@@ -18,11 +99,18 @@ class ProjectSerializer(serializers.ModelSerializer):
             "type",
             "contributors",
         ]
+        # Names stay taken until the rows marked for deletion are purged.
+        extra_kwargs = {
+            "name": {"validators": [UniqueValidator(Project.all_objects.all())]}
+        }
 
+    def create(self, validated_data):
+        return create_project(**validated_data)
 
-class IssueSerializer(serializers.ModelSerializer):
-    author = serializers.PrimaryKeyRelatedField(queryset=SoftUser.objects.all())
-    assign_to = serializers.PrimaryKeyRelatedField(queryset=SoftUser.objects.all())
+
+class IssueSerializer(BulkRelatedFieldsMixin, serializers.ModelSerializer):
+    author = BulkPrimaryKeyRelatedField(queryset=SoftUser.objects.all())
+    assign_to = BulkPrimaryKeyRelatedField(queryset=SoftUser.objects.all())
     project = serializers.PrimaryKeyRelatedField(queryset=Project.objects.all())
 
     class Meta:
@@ -39,23 +127,34 @@ class IssueSerializer(serializers.ModelSerializer):
             "status",
             "tag",
             "priority",
+            "comment_count",
+            "last_comment_at",
         ]
+        extra_kwargs = {
+            "name": {"validators": [UniqueValidator(Issue.all_objects.all())]}
+        }
 
-    def validate_assign_to(self, assign_to):
+    def validate(self, attrs):
         issue: Issue = self.instance
-        if issue:
-            project = issue.project
-        else:
-            project_id = self.context["request"].data["project"]
-            project = Project.objects.get(pk=project_id)
-        if project and assign_to not in project.contributors.all():
-            raise serializers.ValidationError(
-                "Assignee must be a contributor of the project."
+        if "assign_to" in attrs or "project" in attrs:
+            # The project and assignee resolved by the fields, or those of the
+            # issue, rather than fetched again. Membership is read from the
+            # database, not from the contributor graph, which may be stale.
+            project_id = attrs["project"].pk if "project" in attrs else issue.project_id
+            assignee_id = (
+                attrs["assign_to"].pk if "assign_to" in attrs else issue.assign_to_id
             )
-        return assign_to
+            if not Contributor.objects.filter(
+                project_id=project_id, user_id=assignee_id
+            ).exists():
+                raise serializers.ValidationError(
+                    {"assign_to": ["Assignee must be a contributor of the project."]}
+                )
+        return attrs
 
 
 class CommentSerializer(serializers.ModelSerializer):
+    uuid = NativeUUIDField(read_only=True)
     author = serializers.PrimaryKeyRelatedField(queryset=SoftUser.objects.all())
     issue = serializers.PrimaryKeyRelatedField(queryset=Issue.objects.all())
     project = serializers.PrimaryKeyRelatedField(source="issue.project", read_only=True)
@@ -72,3 +171,39 @@ class CommentSerializer(serializers.ModelSerializer):
             "created_on",
             "updated_on",
         ]
+
+
+class ArchivedIssueSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ArchivedIssue
+        fields = IssueSerializer.Meta.fields + ["archived_on"]
+        read_only_fields = fields
+
+
+class ArchivedCommentSerializer(serializers.ModelSerializer):
+    uuid = NativeUUIDField(read_only=True)
+    project = serializers.PrimaryKeyRelatedField(source="issue.project", read_only=True)
+
+    class Meta:
+        model = ArchivedComment
+        fields = CommentSerializer.Meta.fields + ["archived_on"]
+        read_only_fields = fields
+
+
+class DeletionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Deletion
+        fields = [
+            "id",
+            "kind",
+            "object_id",
+            "name",
+            "status",
+            "issues_total",
+            "issues_deleted",
+            "comments_total",
+            "comments_deleted",
+            "requested_on",
+            "finished_on",
+        ]
+        read_only_fields = fields
@@ -0,0 +1,107 @@
+from django.db import models, transaction
+from django.utils import timezone
+
+from softdesk.accounts.graph import record_memberships
+from softdesk.accounts.models import Contributor
+from softdesk.notifications.inbox import record_assignments
+from softdesk.projects.models import Issue, IssueTransition, Project
+from softdesk.projects.workload import bump_versions
+
+
+def create_projects(
+    projects: list[Project], contributors: list[set[int]] | None = None
+) -> list[Project]:
+    """
+    Insert `projects` and their contributor rows with one statement each.
+
+    Every author becomes a contributor of its project, along with the user
+    ids of the matching item of `contributors` if given. Unlike calling
+    `Project.save` for each project, this doesn't depend on the number of
+    projects and sends no m2m_changed signals.
+    """
+    if contributors is None:
+        contributors = [set() for _ in projects]
+    for project in projects:
+        project.name_lower = project.name.lower()
+    with transaction.atomic(savepoint=False):
+        Project.objects.bulk_create(projects)
+        memberships = Contributor.objects.bulk_create(
+            Contributor(project=project, user_id=user_id)
+            for project, user_ids in zip(projects, contributors)
+            for user_id in {project.author_id, *user_ids}
+        )
+        record_memberships(
+            (membership.user_id, membership.project_id) for membership in memberships
+        )
+    return projects
+
+
+def create_project(**fields) -> Project:
+    """
+    Create a project with its author as contributor.
+    """
+    return create_projects([Project(**fields)])[0]
+
+
+def update_issues(issues: models.QuerySet, **fields) -> int:
+    """
+    Update `issues` with one UPDATE, logging the changes of their status,
+    priority and assignee with one batched INSERT, moving reassigned issues
+    between inboxes and invalidating the workloads of their projects.
+    Returns the number of issues updated.
+
+    Fields take plain values or model instances, not expressions, so that
+    the changes can be logged.
+    """
+    now = timezone.now()
+    fields.setdefault("updated_on", now)
+    tracked = {
+        name: getattr(value, "pk", value)
+        for name, value in fields.items()
+        if name in IssueTransition.FIELDS
+    }
+    # Moving issues changes the workload of their new project too.
+    moved_to = getattr(fields.get("project"), "pk", fields.get("project"))
+    with transaction.atomic(savepoint=False):
+        if not tracked:
+            if "project" in fields or "deleted_at" in fields:
+                project_ids = issues.order_by().values_list("project_id", flat=True)
+                bump_versions({*project_ids, moved_to} - {None})
+            return issues.update(**fields)
+        attnames = [Issue._meta.get_field(name).attname for name in tracked]
+        # Locked in id order, like any other bulk update, so that two of
+        # them can't deadlock.
+        rows = list(
+            issues.select_for_update()
+            .order_by("pk")
+            .values_list("pk", "project_id", *attnames)
+        )
+        updated = issues.update(**fields)
+        IssueTransition.objects.bulk_create(
+            (
+                transition
+                for pk, project_id, *old_values in rows
+                for transition in IssueTransition.from_changes(
+                    pk,
+                    project_id,
+                    [
+                        (name, old, new)
+                        for (name, new), old in zip(tracked.items(), old_values)
+                        if old != new
+                    ],
+                    now,
+                )
+            ),
+            batch_size=1000,
+        )
+        bump_versions({*(project_id for _, project_id, *_ in rows), moved_to} - {None})
+        if "assign_to" in tracked:
+            position = list(tracked).index("assign_to")
+            record_assignments(
+                (
+                    (pk, old_values[position], tracked["assign_to"])
+                    for pk, _, *old_values in rows
+                ),
+                now,
+            )
+    return updated
@@ -1,10 +1,71 @@
-from django.test import TestCase
-from rest_framework.test import APIClient
+import gzip
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from io import StringIO
+from unittest import mock
+
+import msgpack
+from django.http import HttpResponse, StreamingHttpResponse
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.db.models import F
+from asgiref.sync import async_to_sync
+from django.test import (
+    AsyncClient,
+    RequestFactory,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
 from rest_framework import status
 from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import RefreshToken
 from django.urls import reverse
-from softdesk.projects.models import Comment, Issue, Project
-from softdesk.accounts.models import SoftUser
+from django.utils import timezone
+from softdesk.authentication import BatchAuthentication
+from softdesk.batch import build_request
+from softdesk.pagination import table_row_estimate
+from softdesk.projects.archive import archive_issues
+from softdesk.projects.deletion import purge, purge_comments
+from softdesk.projects.importer import BulkImporter, read_csv, read_ndjson
+from softdesk.projects.services import create_project, create_projects, update_issues
+from softdesk.projects.models import (
+    ArchivedComment,
+    ArchivedIssue,
+    Comment,
+    Deletion,
+    IdempotencyKey,
+    ImportCheckpoint,
+    Issue,
+    IssueTransition,
+    Project,
+)
+from softdesk.projects.views import CommentViewSet
+from softdesk.filters import (
+    ArchivedCommentFilter,
+    ArchivedIssueFilter,
+    CommentFilter,
+    ContributorFilter,
+    IssueFilter,
+    ProjectFilter,
+)
+from softdesk.accounts.models import Contributor, SoftUser
+from softdesk.notifications.models import NotificationEvent
+from softdesk import batch
+from softdesk.middleware import CompressionMiddleware, parse_accept_encoding
+from softdesk.renderers import decode_msgpack_ext
+from softdesk.throttling import CacheBucketStore, LocalBucketStore
 
 
 class ProjectViewSetTestCase(TestCase):
@@ -111,7 +172,7 @@ class ProjectViewSetTestCase(TestCase):
             (self.anonymous_client, status.HTTP_401_UNAUTHORIZED),
             (self.noperm_client, status.HTTP_403_FORBIDDEN),
             (self.contributor_client, status.HTTP_403_FORBIDDEN),
-            (self.project_client, status.HTTP_204_NO_CONTENT),
+            (self.project_client, status.HTTP_202_ACCEPTED),
         ]
         for client, expected_status in clients_and_responses:
             response: Response = client.delete(
@@ -235,7 +296,7 @@ class IssueViewSetTestCase(TestCase):
             (self.anonymous_client, status.HTTP_401_UNAUTHORIZED),
             (self.noperm_client, status.HTTP_403_FORBIDDEN),
             (self.contributor_client, status.HTTP_403_FORBIDDEN),
-            (self.issue_client, status.HTTP_204_NO_CONTENT),
+            (self.issue_client, status.HTTP_202_ACCEPTED),
         ]
         for client, expected_status in clients_and_responses:
             response: Response = client.delete(
@@ -266,6 +327,44 @@ class IssueViewSetTestCase(TestCase):
                     ["Assignee must be a contributor of the project."],
                 )
 
+    def test_issue_creation_looks_up_related_objects_once(self):
+        issue_data = {
+            "name": "New Issue",
+            "project": self.project.pk,
+            "author": self.issue_user.pk,
+            "assign_to": self.contributor.pk,
+        }
+        with CaptureQueriesContext(connection) as context:
+            response: Response = self.issue_client.post(
+                reverse("issue-list"), issue_data
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        selects = [
+            query["sql"]
+            for query in context.captured_queries
+            if query["sql"].startswith("SELECT")
+        ]
+        # Author and assignee come with one query, the project with another.
+        self.assertEqual(sum('FROM "accounts_softuser"' in sql for sql in selects), 1)
+        self.assertEqual(sum('FROM "projects_project"' in sql for sql in selects), 1)
+
+    def test_issue_update_checks_assignee_against_issue_project(self):
+        response: Response = self.issue_client.patch(
+            reverse("issue-detail", args=[self.issue.pk]),
+            {"assign_to": self.noperm_user.pk},
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data["assign_to"],
+            ["Assignee must be a contributor of the project."],
+        )
+        response = self.issue_client.patch(
+            reverse("issue-detail", args=[self.issue.pk]),
+            {"assign_to": self.contributor.pk},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["assign_to"], self.contributor.pk)
+
 
 class CommentViewSetTestCase(TestCase):
     def setUp(self):
@@ -397,3 +496,2087 @@ class CommentViewSetTestCase(TestCase):
                 reverse("comment-detail", args=[self.comment.pk])
             )
             self.assertEqual(response.status_code, expected_status)
+
+
+class MessagePackNegotiationTestCase(TestCase):
+    def setUp(self):
+        self.user: SoftUser = SoftUser.objects.create(
+            username="msgpackuser",
+            email="msgpack@mail.com",
+            password="msgpackpassword",
+            birthdate="2000-01-01",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.project = Project.objects.create(
+            name="Test Project",
+            description="Test Description",
+            author=self.user,
+            type="BAE",
+        )
+        self.issue = Issue.objects.create(
+            name="Test Issue",
+            project=self.project,
+            author=self.user,
+            assign_to=self.user,
+        )
+        self.comment = Comment.objects.create(
+            content="Test Comment",
+            author=self.user,
+            issue=self.issue,
+        )
+
+    def test_msgpack_round_trips_json_output(self):
+        urls = [
+            reverse("softuser-list"),
+            reverse("contributor-list"),
+            reverse("project-list"),
+            reverse("issue-list"),
+            reverse("comment-list"),
+            reverse("comment-detail", args=[self.comment.pk]),
+        ]
+        for url in urls:
+            json_response: Response = self.client.get(url)
+            msgpack_response: Response = self.client.get(
+                url, HTTP_ACCEPT="application/msgpack"
+            )
+            self.assertEqual(msgpack_response["Content-Type"], "application/msgpack")
+            decoded = msgpack.unpackb(
+                msgpack_response.content, ext_hook=decode_msgpack_ext, timestamp=3
+            )
+            self.assertEqual(
+                json.loads(json.dumps(decoded, cls=JSONEncoder)), json_response.json()
+            )
+
+    def test_msgpack_uses_compact_encodings(self):
+        response: Response = self.client.get(
+            reverse("comment-detail", args=[self.comment.pk]),
+            HTTP_ACCEPT="application/msgpack",
+        )
+        decoded = msgpack.unpackb(
+            response.content, ext_hook=decode_msgpack_ext, timestamp=3
+        )
+        self.assertEqual(decoded["uuid"], self.comment.uuid)
+        self.assertEqual(decoded["created_on"], self.comment.created_on)
+
+    def test_msgpack_request_body(self):
+        response: Response = self.client.post(
+            reverse("comment-list"),
+            msgpack.packb(
+                {
+                    "content": "Packed Comment",
+                    "author": self.user.pk,
+                    "issue": self.issue.pk,
+                }
+            ),
+            content_type="application/msgpack",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(Comment.objects.filter(content="Packed Comment").exists())
+
+
+class CompressionMiddlewareTestCase(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.middleware = CompressionMiddleware(lambda request: HttpResponse())
+        self.payload = b"softdesk issue payload " * 200
+
+    def test_parse_accept_encoding(self):
+        self.assertEqual(
+            parse_accept_encoding("gzip;q=0.5, br, zstd;q=0"),
+            {"gzip": 0.5, "br": 1.0, "zstd": 0.0},
+        )
+
+    def test_small_response_is_not_compressed(self):
+        request = self.factory.get("/", HTTP_ACCEPT_ENCODING="gzip")
+        response = self.middleware.process_response(request, HttpResponse(b"small"))
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(response.content, b"small")
+
+    def test_large_response_uses_accepted_encoding(self):
+        request = self.factory.get("/", HTTP_ACCEPT_ENCODING="gzip, deflate")
+        response = self.middleware.process_response(request, HttpResponse(self.payload))
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.content), self.payload)
+        self.assertEqual(response["Content-Length"], str(len(response.content)))
+        self.assertIn("compression;dur=", response["Server-Timing"])
+        self.assertIn("Accept-Encoding", response["Vary"])
+
+    def test_refused_encodings_are_not_used(self):
+        request = self.factory.get("/", HTTP_ACCEPT_ENCODING="gzip;q=0, identity")
+        response = self.middleware.process_response(request, HttpResponse(self.payload))
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+    def test_streaming_response_is_compressed(self):
+        request = self.factory.get("/", HTTP_ACCEPT_ENCODING="gzip")
+        chunks = [b"softdesk issue payload "] * 200
+        response = self.middleware.process_response(
+            request, StreamingHttpResponse(iter(chunks))
+        )
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(
+            gzip.decompress(b"".join(response.streaming_content)), self.payload
+        )
+
+    def test_short_streaming_response_is_not_compressed(self):
+        request = self.factory.get("/", HTTP_ACCEPT_ENCODING="gzip")
+        response = self.middleware.process_response(
+            request, StreamingHttpResponse(iter([b"a", b"b"]))
+        )
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(b"".join(response.streaming_content), b"ab")
+
+
+@override_settings(
+    REST_FRAMEWORK={
+        **settings.REST_FRAMEWORK,
+        "DEFAULT_THROTTLE_RATES": {
+            "issues.create": "2/min",
+            "token.anon": "1/min",
+            "token.user": "2/min",
+        },
+    },
+    THROTTLE_BUCKET_STORE={"BACKEND": "softdesk.throttling.LocalBucketStore"},
+)
+class TokenBucketThrottleTestCase(TestCase):
+    def setUp(self):
+        self.user: SoftUser = SoftUser.objects.create_user(
+            username="throttleuser",
+            email="throttle@mail.com",
+            password="throttlepassword",
+            birthdate="2000-01-01",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.project = Project.objects.create(
+            name="Test Project", author=self.user, type="BAE"
+        )
+
+    def test_create_action_is_throttled_with_retry_after(self):
+        responses = []
+        for issue_number in range(3):
+            responses.append(
+                self.client.post(
+                    reverse("issue-list"),
+                    {
+                        "name": f"Issue {issue_number}",
+                        "project": self.project.pk,
+                        "author": self.user.pk,
+                        "assign_to": self.user.pk,
+                    },
+                )
+            )
+        self.assertEqual(
+            [response.status_code for response in responses],
+            [
+                status.HTTP_201_CREATED,
+                status.HTTP_201_CREATED,
+                status.HTTP_429_TOO_MANY_REQUESTS,
+            ],
+        )
+        self.assertEqual(responses[-1]["Retry-After"], "30")
+        self.assertEqual(
+            self.client.get(reverse("issue-list")).status_code, status.HTTP_200_OK
+        )
+
+    def test_token_endpoint_limits_anonymous_and_authenticated_callers(self):
+        credentials = {"username": "throttleuser", "password": "throttlepassword"}
+        anonymous_client = APIClient()
+        first: Response = anonymous_client.post(
+            reverse("token_obtain_pair"), credentials
+        )
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            anonymous_client.post(
+                reverse("token_obtain_pair"), credentials
+            ).status_code,
+            status.HTTP_429_TOO_MANY_REQUESTS,
+        )
+        user_client = APIClient()
+        user_client.credentials(HTTP_AUTHORIZATION=f"Bearer {first.data['access']}")
+        self.assertEqual(
+            user_client.post(reverse("token_obtain_pair"), credentials).status_code,
+            status.HTTP_200_OK,
+        )
+
+    def test_bucket_refills_over_time(self):
+        store = LocalBucketStore()
+        self.assertEqual(store.consume("key", 1, 0.5, now=0), 0)
+        self.assertEqual(store.consume("key", 1, 0.5, now=1), 1)
+        self.assertEqual(store.consume("key", 1, 0.5, now=2), 0)
+
+    def test_shared_bucket_allows_while_locked(self):
+        store = CacheBucketStore()
+        store.cache.delete("throttle:locked")
+        store.cache.add("throttle:locked:lock", 1, timeout=1)
+        try:
+            self.assertEqual(store.consume("throttle:locked", 1, 0.5, now=0), 0)
+        finally:
+            store.cache.delete("throttle:locked:lock")
+        # No token was taken while the lock was busy.
+        self.assertEqual(store.consume("throttle:locked", 1, 0.5, now=0), 0)
+        self.assertEqual(store.consume("throttle:locked", 1, 0.5, now=0), 2)
+
+    def test_shared_bucket_allows_concurrent_requests_within_budget(self):
+        store = CacheBucketStore()
+        store.cache.delete("throttle:concurrent")
+        barrier = threading.Barrier(8)
+
+        def consume(_):
+            barrier.wait()
+            return store.consume("throttle:concurrent", 8, 8 / 60, now=0)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            waits = list(executor.map(consume, range(8)))
+        self.assertEqual(waits, [0] * 8)
+
+    def test_bucket_store_is_bounded(self):
+        store = LocalBucketStore(max_entries=2)
+        for key in ("a", "b", "c"):
+            store.consume(key, 1, 1, now=0)
+        self.assertEqual(list(store._buckets), ["b", "c"])
+
+
+class IdempotencyKeyTestCase(TestCase):
+    def setUp(self):
+        self.user: SoftUser = SoftUser.objects.create(
+            username="idempotencyuser",
+            email="idempotency@mail.com",
+            password="idempotencypassword",
+            birthdate="2000-01-01",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.project = Project.objects.create(
+            name="Test Project", author=self.user, type="BAE"
+        )
+        self.issue = Issue.objects.create(
+            name="Test Issue",
+            project=self.project,
+            author=self.user,
+            assign_to=self.user,
+        )
+        self.comment_data = {
+            "content": "Retried Comment",
+            "author": self.user.pk,
+            "issue": self.issue.pk,
+        }
+
+    def post_comment(self, data, key="retry-key"):
+        return self.client.post(reverse("comment-list"), data, HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retry_replays_original_response(self):
+        first: Response = self.post_comment(self.comment_data)
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        # The project of the issue, the membership and the stored response.
+        with self.assertNumQueries(3):
+            retry: Response = self.post_comment(self.comment_data)
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(Comment.objects.filter(content="Retried Comment").count(), 1)
+
+    def test_msgpack_retry_replays_original_response(self):
+        first: Response = self.client.post(
+            reverse("comment-list"),
+            self.comment_data,
+            HTTP_IDEMPOTENCY_KEY="retry-key",
+            HTTP_ACCEPT="application/msgpack",
+        )
+        retry: Response = self.client.post(
+            reverse("comment-list"),
+            self.comment_data,
+            HTTP_IDEMPOTENCY_KEY="retry-key",
+            HTTP_ACCEPT="application/msgpack",
+        )
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(retry.content, first.content)
+        decoded = msgpack.unpackb(
+            retry.content, ext_hook=decode_msgpack_ext, timestamp=3
+        )
+        self.assertIsInstance(decoded["uuid"], uuid.UUID)
+        self.assertIsInstance(decoded["created_on"], datetime)
+
+    def test_key_reused_for_another_request_is_rejected(self):
+        self.post_comment(self.comment_data)
+        response: Response = self.post_comment(
+            {**self.comment_data, "content": "Other Comment"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertFalse(Comment.objects.filter(content="Other Comment").exists())
+
+    def test_keys_are_scoped_per_user(self):
+        self.post_comment(self.comment_data)
+        other_user = SoftUser.objects.create(
+            username="otheruser", email="other@mail.com", birthdate="2000-01-01"
+        )
+        self.project.contributors.add(other_user)
+        self.client.force_authenticate(user=other_user)
+        response: Response = self.post_comment(self.comment_data)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Comment.objects.filter(content="Retried Comment").count(), 2)
+
+    def test_failed_request_does_not_consume_key(self):
+        response: Response = self.post_comment({"content": "No Issue"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+    def test_retry_of_a_removed_contributor_is_denied(self):
+        other_user = SoftUser.objects.create(
+            username="otheruser", email="other@mail.com", birthdate="2000-01-01"
+        )
+        self.project.contributors.add(other_user)
+        self.client.force_authenticate(user=other_user)
+        data = {**self.comment_data, "author": other_user.pk}
+        self.assertEqual(self.post_comment(data).status_code, status.HTTP_201_CREATED)
+        self.project.contributors.remove(other_user)
+        response: Response = self.post_comment(data)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertNotIn("Idempotent-Replayed", response)
+
+    def test_duplicate_stored_meanwhile_replays_the_stored_response(self):
+        first: Response = self.post_comment(self.comment_data)
+        with mock.patch.object(
+            CommentViewSet, "get_idempotency_record", return_value=None
+        ):
+            duplicate: Response = self.post_comment(self.comment_data)
+        self.assertEqual(duplicate.json(), first.json())
+        self.assertEqual(Comment.objects.filter(content="Retried Comment").count(), 1)
+
+
+class IssueArchiveTestCase(TestCase):
+    def setUp(self):
+        self.user: SoftUser = SoftUser.objects.create(
+            username="archiveuser", email="archive@mail.com", birthdate="2000-01-01"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.project = Project.objects.create(
+            name="Test Project", author=self.user, type="BAE"
+        )
+        self.finished_issues = [
+            Issue.objects.create(
+                name=f"Finished Issue {number}",
+                project=self.project,
+                author=self.user,
+                assign_to=self.user,
+                status="END",
+            )
+            for number in range(3)
+        ]
+        self.comment = Comment.objects.create(
+            content="Archived Comment", author=self.user, issue=self.finished_issues[0]
+        )
+        self.live_issue = Issue.objects.create(
+            name="Live Issue",
+            project=self.project,
+            author=self.user,
+            assign_to=self.user,
+            status="WIP",
+        )
+        Issue.objects.filter(status="END").update(
+            updated_on=timezone.now() - timedelta(days=200)
+        )
+
+    def test_command_moves_old_finished_issues_with_their_comments(self):
+        call_command(
+            "archive_issues", "--days=180", "--batch-size=2", stdout=StringIO()
+        )
+        self.assertEqual(list(Issue.objects.all()), [self.live_issue])
+        self.assertEqual(
+            sorted(ArchivedIssue.objects.values_list("pk", flat=True)),
+            [issue.pk for issue in self.finished_issues],
+        )
+        archived_comment = ArchivedComment.objects.get()
+        self.assertEqual(archived_comment.pk, self.comment.pk)
+        self.assertEqual(archived_comment.uuid, self.comment.uuid)
+        self.assertFalse(Comment.objects.exists())
+
+    def test_recent_finished_issues_are_kept(self):
+        call_command("archive_issues", "--days=365", stdout=StringIO())
+        self.assertFalse(ArchivedIssue.objects.exists())
+
+    def test_archived_issue_detail_is_read_through(self):
+        response: Response = self.client.get(
+            reverse("issue-detail", args=[self.finished_issues[0].pk])
+        )
+        live_data = response.json()
+        list(archive_issues(timezone.now()))
+        response = self.client.get(
+            reverse("issue-detail", args=[self.finished_issues[0].pk])
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        archived_data = response.json()
+        self.assertIsNotNone(archived_data.pop("archived_on"))
+        self.assertEqual(archived_data, live_data)
+        response = self.client.get(reverse("comment-detail", args=[self.comment.pk]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["content"], "Archived Comment")
+
+    def test_archived_issue_detail_requires_contributor(self):
+        list(archive_issues(timezone.now()))
+        outsider = SoftUser.objects.create(
+            username="outsider", email="outsider@mail.com", birthdate="2000-01-01"
+        )
+        self.client.force_authenticate(user=outsider)
+        response: Response = self.client.get(
+            reverse("issue-detail", args=[self.finished_issues[0].pk])
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_list_includes_archived_issues_on_demand(self):
+        list(archive_issues(timezone.now()))
+        response: Response = self.client.get(reverse("issue-list"))
+        self.assertEqual(response.data["count"], 1)
+        response = self.client.get(
+            reverse("issue-list"), {"include_archived": 1, "status": "END"}
+        )
+        self.assertEqual(response.data["count"], 3)
+        self.assertTrue(all(issue["archived_on"] for issue in response.data["results"]))
+        response = self.client.get(reverse("issue-list"), {"include_archived": 1})
+        self.assertEqual(
+            [issue["id"] for issue in response.data["results"]],
+            [self.live_issue.pk] + [issue.pk for issue in self.finished_issues[::-1]],
+        )
+        response = self.client.get(reverse("comment-list"), {"include_archived": 1})
+        self.assertEqual(response.data["count"], 1)
+
+    def test_archived_rows_of_deleted_projects_are_hidden(self):
+        list(archive_issues(timezone.now()))
+        response: Response = self.client.delete(
+            reverse("project-detail", args=[self.project.pk])
+        )
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        response = self.client.get(
+            reverse("issue-detail", args=[self.finished_issues[0].pk])
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get(reverse("comment-detail", args=[self.comment.pk]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        for name in ("issue-list", "comment-list"):
+            with self.subTest(name):
+                response = self.client.get(reverse(name), {"include_archived": 1})
+                self.assertEqual(response.data["count"], 0)
+
+
+class BulkImportTestCase(TestCase):
+    def setUp(self):
+        self.users = [
+            SoftUser.objects.create(
+                username=f"user{number}",
+                email=f"user{number}@mail.com",
+                birthdate="2000-01-01",
+            )
+            for number in range(3)
+        ]
+        self.records = [
+            {
+                "kind": "project",
+                "name": "Imported Project",
+                "author": "user0",
+                "type": "BAE",
+                "contributors": ["user1"],
+            },
+            {
+                "kind": "issue",
+                "name": "Imported Issue",
+                "project": "Imported Project",
+                "author": "user0",
+                "assign_to": "user1",
+                "status": "WIP",
+            },
+            {
+                "kind": "issue",
+                "name": "Badly Assigned Issue",
+                "project": "Imported Project",
+                "author": "user0",
+                "assign_to": "user2",
+            },
+            {
+                "kind": "comment",
+                "issue": "Imported Issue",
+                "author": "user1",
+                "content": "Imported Comment",
+            },
+        ]
+        self.ndjson = "\n".join(json.dumps(record) for record in self.records)
+
+    def test_import_creates_rows_and_author_contributors(self):
+        report = BulkImporter(batch_size=2).run(read_ndjson(StringIO(self.ndjson)))
+        self.assertEqual(dict(report.created), {"project": 1, "issue": 1, "comment": 1})
+        self.assertEqual(
+            report.errors,
+            [{"record": 3, "error": "assignee must be a contributor of the project"}],
+        )
+        project = Project.objects.get(name="Imported Project")
+        self.assertEqual(
+            set(project.contributors.values_list("username", flat=True)),
+            {"user0", "user1"},
+        )
+        issue = Issue.objects.get(name="Imported Issue")
+        self.assertEqual((issue.status, issue.assign_to), ("WIP", self.users[1]))
+        self.assertEqual(issue.comments.get().content, "Imported Comment")
+
+    def test_malformed_records_are_reported(self):
+        comment = {"kind": "comment", "issue": "Imported Issue", "author": "user1"}
+        used_uuid = "6f1c0cf4-5a4e-4c55-9a3c-3b6b1f4a8a01"
+        lines = [
+            *(json.dumps(record) for record in self.records[:2]),
+            "123",
+            "[1]",
+            json.dumps({**self.records[2], "author": ["user0"]}),
+            json.dumps({**self.records[2], "assign_to": {"id": 2}}),
+            json.dumps({**comment, "uuid": "not-a-uuid"}),
+            json.dumps({**comment, "uuid": used_uuid}),
+            json.dumps({**comment, "uuid": used_uuid}),
+        ]
+        report = BulkImporter().run(read_ndjson(StringIO("\n".join(lines))))
+        self.assertEqual(
+            report.errors,
+            [
+                {"record": 3, "error": "record is not a JSON object"},
+                {"record": 4, "error": "record is not a JSON object"},
+                {"record": 5, "error": "author must be a string"},
+                {"record": 6, "error": "assign_to must be a string"},
+                {"record": 7, "error": "invalid uuid 'not-a-uuid'"},
+                {"record": 9, "error": f"uuid {used_uuid!r} is already used"},
+            ],
+        )
+        self.assertEqual(str(Comment.objects.get().uuid), used_uuid)
+
+        report = BulkImporter().run([123, {**comment, "uuid": used_uuid}])
+        self.assertEqual(
+            report.errors,
+            [
+                {"record": 1, "error": "record is not an object"},
+                {"record": 2, "error": f"uuid {used_uuid!r} is already used"},
+            ],
+        )
+
+    def test_chunk_queries_do_not_depend_on_its_size(self):
+        records = [
+            {
+                "kind": "project",
+                "name": f"Project {number}",
+                "author": "user0",
+                "type": "FRE",
+                "contributors": ["user1", "user2"],
+            }
+            for number in range(50)
+        ]
+        with self.assertNumQueries(6):
+            BulkImporter(batch_size=50).run(records)
+        self.assertEqual(Contributor.objects.count(), 150)
+
+    def test_import_resumes_from_checkpoint(self):
+        BulkImporter(checkpoint="tracker").run(self.records[:2])
+        report = BulkImporter(checkpoint="tracker").run(self.records)
+        self.assertEqual(report.skipped, 2)
+        self.assertEqual(dict(report.created), {"issue": 0, "comment": 1})
+        self.assertEqual(Project.objects.count(), 1)
+        self.assertEqual(ImportCheckpoint.objects.get(source="tracker").position, 4)
+
+    def test_csv_import(self):
+        csv_file = StringIO(
+            "name,author,type,contributors\n"
+            "CSV Project,user0,IOS,user1;user2\n"
+            "CSV Project,user0,IOS,\n"
+        )
+        report = BulkImporter().run(read_csv(csv_file, "project"))
+        self.assertEqual(dict(report.created), {"project": 1})
+        self.assertEqual(len(report.errors), 1)
+        self.assertEqual(Contributor.objects.count(), 3)
+
+    def test_upload_endpoint_is_admin_only(self):
+        client = APIClient()
+        client.force_authenticate(user=self.users[0])
+        upload = SimpleUploadedFile("tracker.ndjson", self.ndjson.encode())
+        response: Response = client.post(reverse("bulk_import"), {"file": upload})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.users[0].is_staff = True
+        self.users[0].save()
+        upload.seek(0)
+        response = client.post(reverse("bulk_import"), {"file": upload})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["created"], {"project": 1, "issue": 1, "comment": 1}
+        )
+
+        upload = SimpleUploadedFile("tracker.ndjson", b'123\n{"kind": [1]}\n')
+        response = client.post(reverse("bulk_import"), {"file": upload})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["errors"]), 2)
+
+
+class ProjectCreationTestCase(TestCase):
+    def setUp(self):
+        self.users = [
+            SoftUser.objects.create(
+                username=f"user{number}",
+                email=f"user{number}@mail.com",
+                birthdate="2000-01-01",
+            )
+            for number in range(3)
+        ]
+
+    def assertAuthorsAreContributors(self):
+        self.assertFalse(
+            Project.objects.exclude(contributor__user=F("author")).exists(),
+            "Every project author must be a contributor of the project.",
+        )
+
+    def test_save_inserts_author_contributor_without_lookup(self):
+        with self.assertNumQueries(2):
+            Project.objects.create(
+                name="Saved Project", author=self.users[0], type="BAE"
+            )
+        self.assertAuthorsAreContributors()
+
+    def test_create_projects_uses_two_statements(self):
+        projects = [
+            Project(name=f"Project {number}", author=user, type="BAE")
+            for number, user in enumerate(self.users * 5)
+        ]
+        with self.assertNumQueries(2):
+            create_projects(projects, [{self.users[1].pk}] * len(projects))
+        self.assertAuthorsAreContributors()
+        self.assertEqual(Contributor.objects.count(), 25)
+
+    def test_api_creation_goes_through_the_service(self):
+        client = APIClient()
+        client.force_authenticate(user=self.users[0])
+        with mock.patch(
+            "softdesk.projects.serializers.create_project", wraps=create_project
+        ) as service:
+            response: Response = client.post(
+                reverse("project-list"),
+                {"name": "API Project", "author": self.users[1].pk, "type": "AND"},
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        service.assert_called_once()
+        self.assertEqual(response.data["contributors"], [self.users[1].pk])
+        self.assertAuthorsAreContributors()
+
+    def test_admin_creation_adds_author_contributor(self):
+        admin_user = SoftUser.objects.create_superuser(
+            username="admin",
+            email="admin@mail.com",
+            password="adminpassword",
+            birthdate="2000-01-01",
+        )
+        self.client.force_login(admin_user)
+        response = self.client.post(
+            reverse("admin:projects_project_add"),
+            {
+                "name": "Admin Project",
+                "author": self.users[2].pk,
+                "type": "IOS",
+                "contributor_set-TOTAL_FORMS": "0",
+                "contributor_set-INITIAL_FORMS": "0",
+                "contributor_set-2-TOTAL_FORMS": "1",
+                "contributor_set-2-INITIAL_FORMS": "0",
+                "contributor_set-2-0-user": self.users[0].pk,
+            },
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertCountEqual(
+            Project.objects.get(name="Admin Project").contributors.values_list(
+                "pk", flat=True
+            ),
+            [self.users[0].pk, self.users[2].pk],
+        )
+
+
+@override_settings(
+    TASKS={"BACKEND": "softdesk.tasks.backends.ImmediateBackend"},
+    SOFT_DELETE_RETENTION=timedelta(0),
+)
+class DeferredDeletionTestCase(TestCase):
+    def setUp(self):
+        self.author = SoftUser.objects.create(
+            username="author", email="author@mail.com", birthdate="2000-01-01"
+        )
+        self.contributor = SoftUser.objects.create(
+            username="contributor", email="contributor@mail.com", birthdate="2000-01-01"
+        )
+        self.project = Project.objects.create(
+            name="Doomed Project", author=self.author, type="BAE"
+        )
+        self.project.contributors.add(self.contributor)
+        self.issues = [
+            Issue.objects.create(
+                name=f"Issue {number}",
+                author=self.author,
+                assign_to=self.contributor,
+                project=self.project,
+            )
+            for number in range(3)
+        ]
+        for issue in self.issues:
+            for number in range(4):
+                comment = Comment.objects.create(
+                    issue=issue, author=self.contributor, content=f"Comment {number}"
+                )
+        NotificationEvent.objects.create(
+            kind=NotificationEvent.COMMENT,
+            project=self.project,
+            issue=issue,
+            comment=comment,
+            actor=self.contributor,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.author)
+
+    def test_destroy_hides_project_before_purge(self):
+        response: Response = self.client.delete(
+            reverse("project-detail", args=[self.project.pk])
+        )
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data["status"], Deletion.QUEUED)
+        self.assertTrue(
+            response["Location"].endswith(
+                reverse("project-deletion", args=[self.project.pk])
+            )
+        )
+        self.assertFalse(Project.objects.filter(pk=self.project.pk).exists())
+        self.assertFalse(Issue.objects.filter(project=self.project).exists())
+        self.assertEqual(Comment.objects.count(), 12)
+        for name in ("project-detail", "issue-list", "comment-list"):
+            args = [self.project.pk] if name == "project-detail" else []
+            response = self.client.get(reverse(name, args=args))
+            if name == "project-detail":
+                self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+            else:
+                self.assertEqual(response.data["count"], 0)
+
+    def test_project_rows_are_purged_in_batches(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(reverse("project-detail", args=[self.project.pk]))
+        self.assertFalse(Project.all_objects.filter(pk=self.project.pk).exists())
+        self.assertFalse(Issue.all_objects.exists())
+        self.assertFalse(Comment.objects.exists())
+        self.assertFalse(
+            Contributor.objects.filter(project_id=self.project.pk).exists()
+        )
+        self.assertFalse(NotificationEvent.objects.exists())
+        response: Response = self.client.get(
+            reverse("project-deletion", args=[self.project.pk])
+        )
+        self.assertEqual(response.data["status"], Deletion.DONE)
+        self.assertEqual(response.data["issues_deleted"], 3)
+        self.assertEqual(response.data["comments_deleted"], 12)
+        self.assertIsNotNone(response.data["finished_on"])
+
+    def test_purge_is_bounded_and_resumable(self):
+        self.client.delete(reverse("project-detail", args=[self.project.pk]))
+        deletion = Deletion.objects.get(kind=Deletion.PROJECT)
+        self.assertFalse(purge(deletion, batch_size=5, max_batches=2))
+        deletion.refresh_from_db()
+        self.assertEqual(deletion.status, Deletion.RUNNING)
+        self.assertEqual((deletion.comments_total, deletion.issues_total), (12, 3))
+        self.assertEqual(deletion.comments_deleted, 10)
+        # Whatever the batch size: the ids, the comments, their notification
+        # events, the comments again and the progress, in a savepoint.
+        with self.assertNumQueries(7):
+            self.assertFalse(purge(deletion, batch_size=2, max_batches=1))
+        call_command("purge_deletions", stdout=StringIO())
+        deletion.refresh_from_db()
+        self.assertEqual(deletion.status, Deletion.DONE)
+        self.assertFalse(Project.all_objects.exists())
+
+    def test_issue_deletion(self):
+        issue = self.issues[0]
+        with self.captureOnCommitCallbacks(execute=True):
+            response: Response = self.client.delete(
+                reverse("issue-detail", args=[issue.pk])
+            )
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertFalse(Issue.all_objects.filter(pk=issue.pk).exists())
+        self.assertEqual(Comment.objects.count(), 8)
+        self.assertTrue(Project.objects.filter(pk=self.project.pk).exists())
+        response = self.client.get(reverse("issue-deletion", args=[issue.pk]))
+        self.assertEqual(response.data["comments_deleted"], 4)
+
+    def test_deletion_progress_is_only_shown_to_its_requester(self):
+        self.client.delete(reverse("project-detail", args=[self.project.pk]))
+        client = APIClient()
+        client.force_authenticate(user=self.contributor)
+        response: Response = client.get(
+            reverse("project-deletion", args=[self.project.pk])
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_name_stays_taken_until_purged(self):
+        self.client.delete(reverse("project-detail", args=[self.project.pk]))
+        response: Response = self.client.post(
+            reverse("project-list"),
+            {"name": "Doomed Project", "author": self.author.pk, "type": "BAE"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class SoftDeleteTestCase(TestCase):
+    def setUp(self):
+        self.author = SoftUser.objects.create(
+            username="author", email="author@mail.com", birthdate="2000-01-01"
+        )
+        self.project = Project.objects.create(
+            name="Synced Project", author=self.author, type="BAE"
+        )
+        self.issue = Issue.objects.create(
+            name="Synced Issue",
+            author=self.author,
+            assign_to=self.author,
+            project=self.project,
+        )
+        self.comments = [
+            Comment.objects.create(
+                issue=self.issue, author=self.author, content=f"Comment {number}"
+            )
+            for number in range(5)
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.author)
+
+    def delete_comments(self, count: int):
+        for comment in self.comments[:count]:
+            response: Response = self.client.delete(
+                reverse("comment-detail", args=[comment.pk])
+            )
+            self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+    def test_deleted_comment_is_kept_as_tombstone(self):
+        self.delete_comments(1)
+        comment = Comment.all_objects.get(pk=self.comments[0].pk)
+        self.assertIsNotNone(comment.deleted_at)
+        self.assertFalse(Comment.objects.filter(pk=comment.pk).exists())
+        self.assertEqual(self.issue.comments.count(), 4)
+        response: Response = self.client.get(
+            reverse("comment-detail", args=[comment.pk])
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get(reverse("comment-tombstones"))
+        self.assertEqual(
+            response.data["results"],
+            [{"id": comment.pk, "deleted_at": comment.deleted_at}],
+        )
+
+    def test_tombstones_since(self):
+        self.delete_comments(2)
+        first = Comment.all_objects.get(pk=self.comments[0].pk)
+        response: Response = self.client.get(
+            reverse("comment-tombstones"), {"since": first.deleted_at.isoformat()}
+        )
+        self.assertEqual(
+            [tombstone["id"] for tombstone in response.data["results"]],
+            [self.comments[1].pk],
+        )
+        response = self.client.get(reverse("comment-tombstones"), {"since": "never"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("since", response.data)
+
+    def test_project_and_issue_tombstones(self):
+        self.client.delete(reverse("project-detail", args=[self.project.pk]))
+        response: Response = self.client.get(reverse("project-tombstones"))
+        self.assertEqual(
+            [row["id"] for row in response.data["results"]], [self.project.pk]
+        )
+        response = self.client.get(reverse("issue-tombstones"))
+        self.assertEqual(
+            [row["id"] for row in response.data["results"]], [self.issue.pk]
+        )
+        deletion = Deletion.objects.get()
+        self.assertEqual(deletion.status, Deletion.QUEUED)
+        self.assertGreater(deletion.purge_after, timezone.now())
+
+    def test_tombstones_of_other_projects_are_hidden(self):
+        self.delete_comments(1)
+        self.client.delete(reverse("issue-detail", args=[self.issue.pk]))
+        self.client.delete(reverse("project-detail", args=[self.project.pk]))
+        outsider = SoftUser.objects.create(
+            username="outsider", email="outsider@mail.com", birthdate="2000-01-01"
+        )
+        self.client.force_authenticate(user=outsider)
+        for name in ("project-tombstones", "issue-tombstones", "comment-tombstones"):
+            with self.subTest(name):
+                response: Response = self.client.get(reverse(name))
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(response.data["count"], 0)
+
+    def test_list_query_count_ignores_deleted_rows(self):
+        url = reverse("comment-list")
+        self.client.get(url)  # Load the projects of the user.
+        with self.assertNumQueries(2):
+            self.client.get(url)
+        self.delete_comments(3)
+        with self.assertNumQueries(2):
+            response: Response = self.client.get(url)
+        self.assertEqual(response.data["count"], 2)
+
+    def test_permissions_still_apply_to_live_rows(self):
+        stranger = SoftUser.objects.create(
+            username="stranger", email="stranger@mail.com", birthdate="2000-01-01"
+        )
+        client = APIClient()
+        client.force_authenticate(user=stranger)
+        response: Response = client.delete(
+            reverse("comment-detail", args=[self.comments[0].pk])
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.client.delete(reverse("issue-detail", args=[self.issue.pk]))
+        response = self.client.post(
+            reverse("comment-list"),
+            {"content": "Late", "author": self.author.pk, "issue": self.issue.pk},
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_expired_tombstones_are_purged(self):
+        self.delete_comments(2)
+        self.assertEqual(purge_comments(), 0)
+        Comment.all_objects.filter(deleted_at__isnull=False).update(
+            deleted_at=timezone.now() - settings.SOFT_DELETE_RETENTION
+        )
+        self.client.delete(reverse("issue-detail", args=[self.issue.pk]))
+        Deletion.objects.update(purge_after=timezone.now())
+        output = StringIO()
+        call_command("purge_deletions", stdout=output)
+        self.assertIn("1 deletions to finish", output.getvalue())
+        self.assertFalse(Comment.all_objects.exists())
+        self.assertFalse(Issue.all_objects.exists())
+
+
+class ProjectAdminTestCase(TestCase):
+    def setUp(self):
+        self.admin_user = SoftUser.objects.create_superuser(
+            username="admin",
+            email="admin@mail.com",
+            password="adminpassword",
+            birthdate="2000-01-01",
+        )
+        self.client.force_login(self.admin_user)
+        self.users = SoftUser.objects.bulk_create(
+            SoftUser(
+                username=f"user{number}",
+                email=f"user{number}@mail.com",
+                birthdate="2000-01-01",
+            )
+            for number in range(120)
+        )
+
+    def count_queries(self, url: str, **params) -> int:
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def test_changelist_queries_do_not_depend_on_rows(self):
+        url = reverse("admin:projects_project_changelist")
+        create_projects([Project(name="Project 0", author=self.users[0], type="BAE")])
+        few = self.count_queries(url)
+        create_projects(
+            [
+                Project(name=f"Project {number}", author=user, type="AND")
+                for number, user in enumerate(self.users[1:60], start=1)
+            ]
+        )
+        self.assertEqual(self.count_queries(url), few)
+
+    def test_contributor_inline_is_paginated(self):
+        small, large = create_projects(
+            [
+                Project(name="Small Project", author=self.admin_user, type="BAE"),
+                Project(name="Large Project", author=self.admin_user, type="BAE"),
+            ],
+            [{user.pk for user in self.users[:2]}, {user.pk for user in self.users}],
+        )
+        small_url = reverse("admin:projects_project_change", args=[small.pk])
+        self.client.get(small_url)  # Warm the content types cache.
+        few = self.count_queries(small_url)
+        url = reverse("admin:projects_project_change", args=[large.pk])
+        response = self.client.get(url, {"contributors_page": 3})
+        formset = response.context["inline_admin_formsets"][0].formset
+        self.assertEqual(len(formset.get_queryset()), 21)
+        self.assertContains(response, "?contributors_page=3")
+        self.assertEqual(self.count_queries(url, contributors_page=3), few)
+
+    def test_search_seeks_the_lowercase_name_index(self):
+        project, _ = create_projects(
+            [
+                Project(name="Érable", author=self.admin_user, type="BAE"),
+                Project(name="Other", author=self.admin_user, type="BAE"),
+            ]
+        )
+        url = reverse("admin:projects_project_changelist")
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, {"q": " éRA "})
+        self.assertEqual(list(response.context["cl"].result_list), [project])
+        searches = [
+            query["sql"]
+            for query in context.captured_queries
+            if '"projects_project"."name_lower" >=' in query["sql"]
+        ]
+        self.assertTrue(searches)
+        for sql in searches:
+            with connection.cursor() as cursor:
+                cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+                plan = "\n".join(row[-1] for row in cursor.fetchall())
+            self.assertRegex(
+                plan,
+                "SEARCH projects_project USING (COVERING )?INDEX project_name_lower_idx",
+            )
+
+        project.name = "Renamed"
+        project.save(update_fields=["name"])
+        response = self.client.get(url, {"q": "ren"})
+        self.assertEqual(list(response.context["cl"].result_list), [project])
+
+    def test_deletions_are_scheduled(self):
+        first, second, kept = create_projects(
+            [
+                Project(name=f"Deleted {number}", author=self.admin_user, type="BAE")
+                for number in range(3)
+            ]
+        )
+        issue = Issue.objects.create(
+            name="Deleted Issue",
+            project=first,
+            author=self.admin_user,
+            assign_to=self.admin_user,
+        )
+        response = self.client.post(
+            reverse("admin:projects_project_delete", args=[first.pk]), {"post": "yes"}
+        )
+        self.assertEqual(response.status_code, 302)
+        response = self.client.post(
+            reverse("admin:projects_project_changelist"),
+            {
+                "action": "delete_selected",
+                "_selected_action": [second.pk],
+                "post": "yes",
+            },
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(list(Project.objects.all()), [kept])
+        self.assertEqual(Project.all_objects.count(), 3)
+        self.assertIsNotNone(Issue.all_objects.get(pk=issue.pk).deleted_at)
+        self.assertEqual(
+            sorted(
+                Deletion.objects.filter(
+                    kind=Deletion.PROJECT, requested_by=self.admin_user
+                ).values_list("object_id", flat=True)
+            ),
+            [first.pk, second.pk],
+        )
+
+
+@override_settings(PAGINATION_EXACT_COUNT_LIMIT=3)
+class EstimatedCountPaginationTestCase(TestCase):
+    def setUp(self):
+        self.author = SoftUser.objects.create(
+            username="author", email="author@mail.com", birthdate="2000-01-01"
+        )
+        projects = create_projects(
+            [
+                Project(name=f"Project {number}", author=self.author, type="BAE")
+                for number in range(25)
+            ]
+        )
+        self.issue = Issue.objects.create(
+            name="Issue", author=self.author, assign_to=self.author, project=projects[0]
+        )
+        Comment.objects.bulk_create(
+            Comment(issue=self.issue, author=self.author, content=f"Comment {number}")
+            for number in range(5)
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.author)
+
+    def test_small_counts_are_exact(self):
+        with override_settings(PAGINATION_EXACT_COUNT_LIMIT=10):
+            response: Response = self.client.get(reverse("comment-list"))
+        self.assertEqual(response.data["count"], 5)
+        self.assertTrue(response.data["count_exact"])
+
+    def test_large_counts_are_bounded_without_statistics(self):
+        response: Response = self.client.get(reverse("comment-list"))
+        self.assertEqual(response.data["count"], 4)
+        self.assertFalse(response.data["count_exact"])
+        self.assertEqual(len(response.data["results"]), 5)
+        self.assertIsNone(response.data["next"])
+
+    def test_exact_count_on_demand(self):
+        response: Response = self.client.get(
+            reverse("comment-list"), {"exact_count": 1}
+        )
+        self.assertEqual(response.data["count"], 5)
+        self.assertTrue(response.data["count_exact"])
+
+    def test_whole_table_uses_planner_statistics(self):
+        SoftUser.objects.bulk_create(
+            SoftUser(
+                username=f"user{number}",
+                email=f"user{number}@mail.com",
+                birthdate="2000-01-01",
+            )
+            for number in range(24)
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        response: Response = self.client.get(reverse("softuser-list"))
+        self.assertEqual(response.data["count"], 25)
+        self.assertFalse(response.data["count_exact"])
+
+    def test_table_estimate_ignores_partial_indexes(self):
+        Comment.objects.filter(pk=self.issue.comments.first().pk).update(
+            deleted_at=timezone.now()
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+            # Listed first, the tombstone index only counts deleted rows.
+            cursor.execute(
+                "SELECT idx, stat FROM sqlite_stat1 WHERE tbl = %s",
+                [Comment._meta.db_table],
+            )
+            stats = sorted(
+                cursor.fetchall(), key=lambda row: row[0] != "comment_tombstone_idx"
+            )
+            cursor.execute(
+                "DELETE FROM sqlite_stat1 WHERE tbl = %s", [Comment._meta.db_table]
+            )
+            cursor.executemany(
+                "INSERT INTO sqlite_stat1 (tbl, idx, stat) VALUES (%s, %s, %s)",
+                [(Comment._meta.db_table, idx, stat) for idx, stat in stats],
+            )
+        self.assertEqual(stats[0][1].split()[0], "1")
+        self.assertEqual(table_row_estimate(Comment), 5)
+
+    def test_scoped_lists_report_a_bounded_count_on_sqlite(self):
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        response: Response = self.client.get(reverse("project-list"))
+        self.assertEqual(response.data["count"], 4)
+        self.assertFalse(response.data["count_exact"])
+        self.assertIsNotNone(response.data["next"])
+
+    def test_pages_past_the_estimate_stay_reachable(self):
+        url = reverse("project-list")
+        response: Response = self.client.get(url, {"page": 3})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 5)
+        self.assertIsNone(response.data["next"])
+        self.assertIsNotNone(response.data["previous"])
+        response = self.client.get(url, {"page": 2})
+        self.assertIsNotNone(response.data["next"])
+        response = self.client.get(url, {"page": 4})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class NestedRoutesTestCase(TestCase):
+    def setUp(self):
+        self.user = SoftUser.objects.create(
+            username="member", email="member@mail.com", birthdate="2000-01-01"
+        )
+        self.outsider = SoftUser.objects.create(
+            username="outsider", email="outsider@mail.com", birthdate="2000-01-01"
+        )
+        self.project = create_project(name="Nested", author=self.user, type="BAE")
+        self.other_project = create_project(
+            name="Other", author=self.outsider, type="BAE"
+        )
+        self.issue = Issue.objects.create(
+            name="Nested Issue",
+            project=self.project,
+            author=self.user,
+            assign_to=self.user,
+        )
+        self.other_issue = Issue.objects.create(
+            name="Other Issue",
+            project=self.other_project,
+            author=self.outsider,
+            assign_to=self.outsider,
+        )
+        self.comment = Comment.objects.create(
+            issue=self.issue, author=self.user, content="Nested comment"
+        )
+        Comment.objects.create(
+            issue=self.other_issue, author=self.outsider, content="Other comment"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_lists_only_the_children_of_the_parent(self):
+        response: Response = self.client.get(
+            reverse("project-issue-list", args=[self.project.pk])
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [issue["id"] for issue in response.data["results"]], [self.issue.pk]
+        )
+        response = self.client.get(reverse("issue-comment-list", args=[self.issue.pk]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [comment["id"] for comment in response.data["results"]],
+            [self.comment.pk],
+        )
+
+    def test_parent_is_checked(self):
+        response: Response = self.client.get(
+            reverse("project-issue-list", args=[self.other_project.pk])
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.get(
+            reverse("issue-comment-list", args=[self.other_issue.pk])
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.get(reverse("project-issue-list", args=[0]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = APIClient().get(
+            reverse("project-issue-list", args=[self.project.pk])
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_children_of_other_parents_are_not_found(self):
+        # Even to a contributor of the other parent.
+        self.other_project.contributors.add(self.user)
+        response: Response = self.client.get(
+            reverse("project-issue-detail", args=[self.project.pk, self.other_issue.pk])
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_create_takes_the_parent_from_the_route(self):
+        response: Response = self.client.post(
+            reverse("project-issue-list", args=[self.project.pk]),
+            {
+                "name": "Routed Issue",
+                "author": self.user.pk,
+                "assign_to": self.user.pk,
+                "project": self.other_project.pk,
+            },
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["project"], self.project.pk)
+        response = self.client.post(
+            reverse("issue-comment-list", args=[self.issue.pk]),
+            {"content": "Routed", "author": self.user.pk},
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["issue"], self.issue.pk)
+
+    def test_object_permissions_cost_no_query(self):
+        self.client.get(reverse("issue-comment-list", args=[self.issue.pk]))
+        # The parent issue, the count and the page.
+        with self.assertNumQueries(3):
+            self.client.get(reverse("issue-comment-list", args=[self.issue.pk]))
+        url = reverse("issue-comment-detail", args=[self.issue.pk, self.comment.pk])
+        self.client.get(url)
+        # The comment alone, its project membership is known to the graph.
+        with self.assertNumQueries(1):
+            response: Response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["content"], "Nested comment")
+
+
+@override_settings(INCLUDE_CHILDREN_LIMIT=3)
+class CompoundDocumentTestCase(TestCase):
+    def setUp(self):
+        self.users = SoftUser.objects.bulk_create(
+            SoftUser(
+                username=f"user{number}",
+                email=f"user{number}@mail.com",
+                birthdate="2000-01-01",
+            )
+            for number in range(5)
+        )
+        self.project = create_project(name="Compound", author=self.users[0], type="BAE")
+        self.project.contributors.add(*self.users[1:])
+        self.issue = Issue.objects.create(
+            name="Compound Issue",
+            project=self.project,
+            author=self.users[0],
+            assign_to=self.users[1],
+        )
+        self.comments = [
+            Comment.objects.create(
+                issue=self.issue, author=self.users[number], content=f"{number}"
+            )
+            for number in range(5)
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.users[0])
+
+    def test_issue_includes_comments_and_users(self):
+        url = reverse("issue-detail", args=[self.issue.pk])
+        self.client.get(url)
+        # The issue, its comments and their users, whatever their number.
+        with self.assertNumQueries(3):
+            response: Response = self.client.get(
+                url, {"include": "comments,author,assign_to,comments.author"}
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [comment["content"] for comment in response.data["comments"]],
+            ["4", "3", "2"],
+        )
+        self.assertTrue(response.data["comments_truncated"])
+        # Shared users are included once.
+        self.assertEqual(
+            [user["id"] for user in response.data["included"]["users"]],
+            [user.pk for user in self.users],
+        )
+
+    def test_project_list_includes_issues_and_contributors(self):
+        other = create_project(name="Other Compound", author=self.users[0], type="BAE")
+        url = reverse("project-list")
+        self.client.get(url)
+        # The count, the page with its contributors, the issues and users.
+        with self.assertNumQueries(5):
+            response: Response = self.client.get(
+                url, {"include": "issues,contributors,issues.assign_to"}
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        projects = {project["id"]: project for project in response.data["results"]}
+        self.assertEqual(
+            [issue["id"] for issue in projects[self.project.pk]["issues"]],
+            [self.issue.pk],
+        )
+        self.assertFalse(projects[self.project.pk]["issues_truncated"])
+        self.assertEqual(projects[other.pk]["issues"], [])
+        self.assertEqual(len(response.data["included"]["users"]), 5)
+
+    def test_unknown_include_is_rejected(self):
+        response: Response = self.client.get(
+            reverse("issue-detail", args=[self.issue.pk]), {"include": "project"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("include", response.data)
+
+    def test_responses_are_unchanged_without_include(self):
+        response: Response = self.client.get(
+            reverse("issue-detail", args=[self.issue.pk])
+        )
+        self.assertNotIn("comments", response.data)
+        self.assertNotIn("included", response.data)
+
+
+class BatchTestCase(TestCase):
+    def setUp(self):
+        self.user = SoftUser.objects.create(
+            username="batcher", email="batcher@mail.com", birthdate="2000-01-01"
+        )
+        self.project = create_project(name="Batched", author=self.user, type="BAE")
+        self.issue = Issue.objects.create(
+            name="Batched Issue",
+            project=self.project,
+            author=self.user,
+            assign_to=self.user,
+        )
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(self.user).access_token}"
+        )
+
+    def test_sub_requests_share_one_authentication(self):
+        with mock.patch.object(
+            JWTAuthentication,
+            "get_validated_token",
+            autospec=True,
+            side_effect=JWTAuthentication.get_validated_token,
+        ) as get_validated_token:
+            response: Response = self.client.post(
+                reverse("batch"),
+                {
+                    "requests": [
+                        {"method": "GET", "url": f"/projects/{self.project.pk}/"},
+                        {"method": "GET", "url": f"/issues/{self.issue.pk}/"},
+                        {
+                            "method": "GET",
+                            "url": f"/projects/{self.project.pk}/issues/?page=1",
+                        },
+                    ]
+                },
+                format="json",
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(get_validated_token.call_count, 1)
+        responses = response.data["responses"]
+        self.assertEqual([sub["status"] for sub in responses], [200, 200, 200])
+        self.assertEqual(responses[0]["body"]["name"], "Batched")
+        self.assertEqual(responses[1]["body"]["name"], "Batched Issue")
+        self.assertEqual(responses[2]["body"]["results"][0]["id"], self.issue.pk)
+
+    def test_only_sub_requests_use_the_batch_authentication(self):
+        authentication = BatchAuthentication()
+        response: Response = self.client.post(
+            reverse("batch"),
+            {"requests": [{"method": "GET", "url": "/projects/"}]},
+            format="json",
+        )
+        self.assertEqual(response.data["responses"][0]["status"], 200)
+
+        request = APIRequestFactory().post(reverse("batch"))
+        force_authenticate(request, user=self.user, token="token")
+        sub_request = build_request(Request(request), "GET", "/projects/")
+        self.assertEqual(
+            authentication.authenticate(Request(sub_request)), (self.user, "token")
+        )
+        self.assertIsNone(authentication.authenticate(Request(request)))
+        response = APIClient().get(reverse("project-list"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_sub_requests_fail_on_their_own(self):
+        response: Response = self.client.post(
+            reverse("batch"),
+            {
+                "requests": [
+                    {
+                        "method": "POST",
+                        "url": "/issues/",
+                        "body": {
+                            "name": "Batch Created",
+                            "project": self.project.pk,
+                            "author": self.user.pk,
+                            "assign_to": self.user.pk,
+                        },
+                    },
+                    {"method": "GET", "url": "/issues/0/"},
+                    {"method": "GET", "url": "/nowhere/"},
+                    {"method": "GET", "url": "/admin/"},
+                    {"method": "POST", "url": "/batch/", "body": {}},
+                ]
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [sub["status"] for sub in response.data["responses"]],
+            [201, 404, 404, 400, 400],
+        )
+        self.assertTrue(Issue.objects.filter(name="Batch Created").exists())
+
+    @override_settings(
+        REST_FRAMEWORK={
+            **settings.REST_FRAMEWORK,
+            "DEFAULT_THROTTLE_RATES": {"issues.create": "1/min"},
+        },
+        THROTTLE_BUCKET_STORE={"BACKEND": "softdesk.throttling.LocalBucketStore"},
+    )
+    def test_throttled_sub_requests_fail_on_their_own(self):
+        response: Response = self.client.post(
+            reverse("batch"),
+            {
+                "requests": [
+                    {
+                        "method": "POST",
+                        "url": "/issues/",
+                        "body": {
+                            "name": f"Throttled {number}",
+                            "project": self.project.pk,
+                            "author": self.user.pk,
+                            "assign_to": self.user.pk,
+                        },
+                    }
+                    for number in range(2)
+                ]
+                + [{"method": "GET", "url": f"/issues/{self.issue.pk}/"}]
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        responses = response.data["responses"]
+        self.assertEqual([sub["status"] for sub in responses], [201, 429, 200])
+        self.assertEqual(responses[1]["headers"]["Retry-After"], "60")
+        self.assertIn("throttled", responses[1]["body"]["detail"])
+
+    def test_sub_requests_get_their_own_environ(self):
+        request = APIRequestFactory().post(
+            reverse("batch"),
+            REMOTE_ADDR="203.0.113.7",
+            HTTP_COOKIE="sessionid=secret",
+            HTTP_X_FORWARDED_FOR="198.51.100.1",
+        )
+        force_authenticate(request, user=self.user, token="token")
+        sub_request = build_request(
+            Request(request), "GET", "/projects/", {"Accept": "application/msgpack"}
+        )
+        for key in ("REMOTE_ADDR", "HTTP_COOKIE", "HTTP_X_FORWARDED_FOR"):
+            self.assertNotIn(key, sub_request.META)
+        self.assertEqual(sub_request.META["SERVER_NAME"], "testserver")
+        self.assertEqual(sub_request.META["HTTP_ACCEPT"], "application/json")
+
+    @override_settings(BATCH={"MAX_REQUESTS": 2, "MAX_WORKERS": 2})
+    def test_batch_size_is_capped(self):
+        response: Response = self.client.post(
+            reverse("batch"),
+            {"requests": [{"method": "GET", "url": "/projects/"}] * 3},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("requests", response.data)
+
+    def test_anonymous_batches_are_refused(self):
+        response: Response = APIClient().post(
+            reverse("batch"),
+            {"requests": [{"method": "GET", "url": "/projects/"}]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class ParallelBatchTestCase(TransactionTestCase):
+    def setUp(self):
+        self.user = SoftUser.objects.create(
+            username="batcher", email="batcher@mail.com", birthdate="2000-01-01"
+        )
+        self.projects = [
+            create_project(name=f"Parallel {number}", author=self.user, type="BAE")
+            for number in range(4)
+        ]
+        self.token = str(RefreshToken.for_user(self.user).access_token)
+
+    def test_reads_run_in_threads_under_asgi(self):
+        threads = set()
+        dispatch = batch.dispatch
+
+        def record_thread(*args, **kwargs):
+            threads.add(threading.current_thread().name)
+            return dispatch(*args, **kwargs)
+
+        with mock.patch.object(batch, "dispatch", side_effect=record_thread):
+            response = async_to_sync(AsyncClient().post)(
+                reverse("batch"),
+                {
+                    "parallel": True,
+                    "requests": [
+                        {"method": "GET", "url": f"/projects/{project.pk}/"}
+                        for project in self.projects
+                    ],
+                },
+                content_type="application/json",
+                headers={"Authorization": f"Bearer {self.token}"},
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [sub["body"]["name"] for sub in response.json()["responses"]],
+            [project.name for project in self.projects],
+        )
+        self.assertTrue(threads)
+        self.assertTrue(all(name.startswith("softdesk-batch") for name in threads))
+
+
+class ProjectBoardTestCase(TestCase):
+    def setUp(self):
+        self.user = SoftUser.objects.create(
+            username="boarder", email="boarder@mail.com", birthdate="2000-01-01"
+        )
+        self.project = create_project(name="Board", author=self.user, type="BAE")
+        self.issues = {
+            status: [
+                Issue.objects.create(
+                    name=f"{status} {number}",
+                    project=self.project,
+                    author=self.user,
+                    assign_to=self.user,
+                    status=status,
+                )
+                for number in range(count)
+            ]
+            for status, count in (("TODO", 5), ("WIP", 2), ("END", 0))
+        }
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("project-board", args=[self.project.pk])
+
+    def test_board_returns_every_column_in_fixed_queries(self):
+        self.client.get(self.url)
+        # The project, the ranked issues and the counts.
+        with self.assertNumQueries(3):
+            response: Response = self.client.get(self.url, {"limit": 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        columns = {column["status"]: column for column in response.data["columns"]}
+        self.assertEqual(list(columns), ["TODO", "WIP", "END"])
+        self.assertEqual(
+            [issue["name"] for issue in columns["TODO"]["issues"]],
+            ["TODO 4", "TODO 3"],
+        )
+        self.assertEqual([column["count"] for column in columns.values()], [5, 2, 0])
+        self.assertIsNotNone(columns["TODO"]["next"])
+        self.assertIsNone(columns["WIP"]["next"])
+        self.assertEqual(columns["END"]["issues"], [])
+
+    def test_cursors_continue_their_column(self):
+        response: Response = self.client.get(self.url, {"limit": 2})
+        names = []
+        next_url = response.data["columns"][0]["next"]
+        while next_url:
+            response = self.client.get(next_url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            [column] = response.data["columns"]
+            self.assertEqual(column["status"], "TODO")
+            self.assertEqual(column["count"], 5)
+            names += [issue["name"] for issue in column["issues"]]
+            next_url = column["next"]
+        self.assertEqual(names, ["TODO 2", "TODO 1", "TODO 0"])
+
+    def test_invalid_parameters_are_rejected(self):
+        for params in ({"limit": 0}, {"limit": "x"}, {"cursor": "garbage"}):
+            response: Response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_board_is_for_contributors(self):
+        outsider = SoftUser.objects.create(
+            username="outsider", email="outsider@mail.com", birthdate="2000-01-01"
+        )
+        self.client.force_authenticate(user=outsider)
+        response: Response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class CommentStatsTestCase(TestCase):
+    def setUp(self):
+        self.user = SoftUser.objects.create(
+            username="commenter", email="commenter@mail.com", birthdate="2000-01-01"
+        )
+        self.project = create_project(name="Stats", author=self.user, type="BAE")
+        self.issue = Issue.objects.create(
+            name="Stats Issue",
+            project=self.project,
+            author=self.user,
+            assign_to=self.user,
+        )
+        self.other_issue = Issue.objects.create(
+            name="Other Stats Issue",
+            project=self.project,
+            author=self.user,
+            assign_to=self.user,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def comment(self, issue: Issue, content: str = "Hello") -> Comment:
+        return Comment.objects.create(issue=issue, author=self.user, content=content)
+
+    def test_comments_update_the_stats_of_their_issue(self):
+        first = self.comment(self.issue)
+        second = self.comment(self.issue)
+        self.issue.refresh_from_db()
+        self.assertEqual(self.issue.comment_count, 2)
+        self.assertEqual(self.issue.last_comment_at, second.created_on)
+        response: Response = self.client.delete(
+            reverse("comment-detail", args=[second.pk])
+        )
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        # A second deletion of the same comment changes nothing.
+        second.soft_delete()
+        self.issue.refresh_from_db()
+        self.assertEqual(self.issue.comment_count, 1)
+        self.assertEqual(self.issue.last_comment_at, first.created_on)
+        response = self.client.get(reverse("issue-detail", args=[self.issue.pk]))
+        self.assertEqual(response.data["comment_count"], 1)
+        self.assertEqual(response.data["last_comment_at"], first.created_on)
+
+    def test_saving_a_stale_issue_keeps_its_stats(self):
+        stale = Issue.objects.get(pk=self.issue.pk)
+        self.comment(self.issue)
+        stale.name = "Renamed"
+        stale.save()
+        self.issue.refresh_from_db()
+        self.assertEqual(self.issue.name, "Renamed")
+        self.assertEqual(self.issue.comment_count, 1)
+
+    def test_saving_an_issue_whose_row_was_deleted_inserts_it(self):
+        self.comment(self.issue)
+        issue = Issue.objects.get(pk=self.issue.pk)
+        Issue.all_objects.filter(pk=issue.pk).delete()
+        issue.status = "WIP"
+        issue.save()
+        issue = Issue.objects.get(pk=issue.pk)
+        self.assertEqual((issue.name, issue.status), ("Stats Issue", "WIP"))
+        self.assertEqual(issue.comment_count, 1)
+
+    def test_moving_a_comment_moves_its_stats(self):
+        comment = Comment.objects.get(pk=self.comment(self.issue).pk)
+        comment.issue = self.other_issue
+        comment.save()
+        self.issue.refresh_from_db()
+        self.other_issue.refresh_from_db()
+        self.assertEqual(
+            (self.issue.comment_count, self.issue.last_comment_at), (0, None)
+        )
+        self.assertEqual(
+            (self.other_issue.comment_count, self.other_issue.last_comment_at),
+            (1, comment.created_on),
+        )
+
+    def test_issues_sort_by_comment_stats(self):
+        self.comment(self.other_issue)
+        response: Response = self.client.get(
+            reverse("issue-list"), {"ordering": "-comment_count"}
+        )
+        self.assertEqual(
+            [issue["id"] for issue in response.data["results"]],
+            [self.other_issue.pk, self.issue.pk],
+        )
+
+    def test_reconcile_fixes_drifted_stats(self):
+        self.comment(self.issue)
+        Issue.objects.filter(pk=self.issue.pk).update(comment_count=7)
+        out = StringIO()
+        call_command("reconcile_comment_stats", batch_size=1, stdout=out)
+        self.assertIn("Fixed the comment stats of 1/2 issues.", out.getvalue())
+        self.issue.refresh_from_db()
+        self.assertEqual(self.issue.comment_count, 1)
+
+
+class ConcurrentIdempotencyKeyTestCase(TransactionTestCase):
+    def test_overlapping_duplicates_create_one_comment(self):
+        user = SoftUser.objects.create(
+            username="retrier", email="retrier@mail.com", birthdate="2000-01-01"
+        )
+        project = create_project(name="Retried", author=user, type="BAE")
+        issue = Issue.objects.create(
+            name="Retried Issue", project=project, author=user, assign_to=user
+        )
+        data = {"content": "Retried", "author": user.pk, "issue": issue.pk}
+        barrier = threading.Barrier(2)
+        responses, errors = [], []
+
+        def post_comment():
+            client = APIClient()
+            client.force_authenticate(user=user)
+            try:
+                barrier.wait()
+                while True:
+                    try:
+                        response = client.post(
+                            reverse("comment-list"),
+                            data,
+                            HTTP_IDEMPOTENCY_KEY="overlapping",
+                        )
+                        break
+                    except OperationalError as exc:
+                        # SQLite lets one connection write at a time: send
+                        # the request again, as a client would.
+                        if "locked" not in str(exc):
+                            raise
+                        time.sleep(0.001)
+                responses.append(response)
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=post_comment) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(Comment.objects.filter(content="Retried").count(), 1)
+        self.assertEqual(IdempotencyKey.objects.count(), 1)
+        self.assertEqual(
+            sorted(response.status_code for response in responses), [201, 201]
+        )
+        self.assertEqual(responses[0].json(), responses[1].json())
+
+
+class ConcurrentCommentStatsTestCase(TransactionTestCase):
+    def test_concurrent_comments_are_all_counted(self):
+        user = SoftUser.objects.create(
+            username="racer", email="racer@mail.com", birthdate="2000-01-01"
+        )
+        project = create_project(name="Race", author=user, type="BAE")
+        issue = Issue.objects.create(
+            name="Race Issue", project=project, author=user, assign_to=user
+        )
+        barrier = threading.Barrier(4)
+        errors = []
+
+        def add_comments():
+            try:
+                barrier.wait()
+                created = 0
+                while created < 5:
+                    try:
+                        Comment.objects.create(issue=issue, author=user, content="Race")
+                        created += 1
+                    except OperationalError as exc:
+                        # SQLite lets one connection write at a time: the
+                        # transaction was rolled back, try again.
+                        if "locked" not in str(exc):
+                            raise
+                        time.sleep(0.001)
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=add_comments) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        issue.refresh_from_db()
+        self.assertEqual(issue.comment_count, 20)
+        self.assertEqual(
+            issue.last_comment_at,
+            Comment.objects.filter(issue=issue).latest("created_on").created_on,
+        )
+
+
+class IssueTransitionTestCase(TestCase):
+    def setUp(self):
+        self.user = SoftUser.objects.create(
+            username="mover", email="mover@mail.com", birthdate="2000-01-01"
+        )
+        self.other = SoftUser.objects.create(
+            username="other", email="other@mail.com", birthdate="2000-01-01"
+        )
+        self.project = create_project(name="Flow", author=self.user, type="BAE")
+        self.project.contributors.add(self.other)
+        self.issues = [
+            Issue.objects.create(
+                name=f"Flow {number}",
+                project=self.project,
+                author=self.user,
+                assign_to=self.user,
+            )
+            for number in range(3)
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def transitions(self) -> list[tuple]:
+        return list(
+            IssueTransition.objects.order_by("pk").values_list(
+                "issue_id", "field", "old_value", "new_value"
+            )
+        )
+
+    def test_updating_a_created_instance_logs_its_changes(self):
+        issue = Issue.objects.create(
+            name="Fresh", project=self.project, author=self.user, assign_to=self.user
+        )
+        issue.status = "WIP"
+        issue.save()
+        self.assertEqual(
+            self.transitions(), [(issue.pk, IssueTransition.STATUS, "TODO", "WIP")]
+        )
+
+    def test_saving_an_issue_logs_its_changes(self):
+        issue = self.issues[0]
+        response: Response = self.client.patch(
+            reverse("issue-detail", args=[issue.pk]),
+            {"status": "WIP", "assign_to": self.other.pk, "name": "Renamed"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            self.transitions(),
+            [
+                (issue.pk, IssueTransition.STATUS, "TODO", "WIP"),
+                (
+                    issue.pk,
+                    IssueTransition.ASSIGNEE,
+                    str(self.user.pk),
+                    str(self.other.pk),
+                ),
+            ],
+        )
+        self.client.patch(
+            reverse("issue-detail", args=[issue.pk]), {"description": "Unchanged flow"}
+        )
+        self.assertEqual(len(self.transitions()), 2)
+
+    def test_bulk_updates_log_changes_in_one_insert(self):
+        update_issues(Issue.objects.filter(pk=self.issues[0].pk), status="WIP")
+        # Read and lock the issues, update them, insert the transitions.
+        with self.assertNumQueries(3):
+            updated = update_issues(
+                Issue.objects.filter(project=self.project), status="WIP", priority="LOW"
+            )
+        self.assertEqual(updated, 3)
+        self.assertEqual(
+            self.transitions(),
+            [(self.issues[0].pk, IssueTransition.STATUS, "TODO", "WIP")]
+            + [
+                (issue.pk, IssueTransition.STATUS, "TODO", "WIP")
+                for issue in self.issues[1:]
+            ],
+        )
+
+    def test_metrics_time_finished_issues(self):
+        now = timezone.now()
+        Issue.objects.update(created_on=now - timedelta(days=10))
+        # Both started 6 days ago, then finished 2 and 4 days ago.
+        for issue, finished_days_ago in zip(self.issues, [2, 4]):
+            IssueTransition.objects.bulk_create(
+                IssueTransition.from_changes(
+                    issue.pk,
+                    self.project.pk,
+                    [("status", "TODO", "WIP")],
+                    now - timedelta(days=6),
+                )
+                + IssueTransition.from_changes(
+                    issue.pk,
+                    self.project.pk,
+                    [("status", "WIP", "END")],
+                    now - timedelta(days=finished_days_ago),
+                )
+            )
+        response: Response = self.client.get(
+            reverse("project-metrics", args=[self.project.pk]), {"weeks": 4}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["finished"], 2)
+        self.assertEqual(
+            sum(week["finished"] for week in response.data["throughput"]), 2
+        )
+        day = 24 * 3600
+        self.assertEqual(response.data["lead_time"], 7 * day)
+        self.assertEqual(response.data["cycle_time"], 3 * day)
+        self.assertEqual(response.data["stages"], {"TODO": 4 * day, "WIP": 3 * day})
+
+    def test_metrics_without_finished_issues(self):
+        response: Response = self.client.get(
+            reverse("project-metrics", args=[self.project.pk])
+        )
+        self.assertEqual(response.data["finished"], 0)
+        self.assertEqual(response.data["throughput"], [])
+        self.assertIsNone(response.data["lead_time"])
+        response = self.client.get(
+            reverse("project-metrics", args=[self.project.pk]), {"weeks": 0}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class FilterIndexTestCase(TestCase):
+    """
+    Date range and `in` filters, with the plans SQLite picks for the
+    querysets of the list endpoints they filter.
+    """
+
+    since = "2024-01-01T00:00:00Z"
+
+    def setUp(self):
+        self.user = SoftUser.objects.create(
+            username="user", email="user@mail.com", birthdate="2000-01-01"
+        )
+        self.project = create_project(name="Filtered Project", author=self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def assertSearches(self, filterset, queryset, params: dict, table: str, index: str):
+        plan = filterset(params, queryset=queryset).qs.explain()
+        self.assertRegex(plan, rf"SEARCH {table} USING (COVERING )?INDEX {index} ")
+        self.assertNotRegex(plan, r"\bSCAN ")
+
+    def test_issue_filters(self):
+        for number, (status_, tag) in enumerate(
+            [("TODO", "BUG"), ("WIP", "TASK"), ("END", "BUG")]
+        ):
+            Issue.objects.create(
+                name=f"Issue {number}",
+                project=self.project,
+                author=self.user,
+                assign_to=self.user,
+                status=status_,
+                tag=tag,
+            )
+        Issue.objects.filter(name="Issue 0").update(
+            created_on=timezone.now() - timedelta(days=2)
+        )
+        yesterday = (timezone.now() - timedelta(days=1)).isoformat()
+        response: Response = self.client.get(
+            reverse("issue-list"),
+            {"status__in": "TODO,END", "created_after": yesterday},
+        )
+        self.assertEqual(
+            [issue["name"] for issue in response.data["results"]], ["Issue 2"]
+        )
+        response = self.client.get(
+            reverse("issue-list"),
+            {"tag__in": "BUG", "project_id__in": f"{self.project.pk},0"},
+        )
+        self.assertEqual(response.data["count"], 2)
+        response = self.client.get(reverse("issue-list"), {"updated_since": "never"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_issue_ranges_use_indexes(self):
+        issues = Issue.objects.filter(project_id__in=[1, 2]).order_by("-created_on")
+        for params, index in [
+            ({"created_after": self.since}, "issue_live_idx"),
+            ({"created_before": self.since}, "issue_live_idx"),
+            ({"updated_since": self.since}, "issue_updated_idx"),
+            (
+                {"status__in": "TODO,WIP", "created_after": self.since},
+                "issue_board_idx",
+            ),
+        ]:
+            with self.subTest(**params):
+                self.assertSearches(
+                    IssueFilter, issues, params, "projects_issue", index
+                )
+        archived = ArchivedIssue.objects.filter(project_id__in=[1, 2])
+        for params, index in [
+            ({"created_after": self.since}, "archived_issue_created_idx"),
+            ({"updated_since": self.since}, "archived_issue_updated_idx"),
+        ]:
+            with self.subTest(archived=True, **params):
+                self.assertSearches(
+                    ArchivedIssueFilter,
+                    archived,
+                    params,
+                    "projects_archivedissue",
+                    index,
+                )
+
+    def test_comment_ranges_use_indexes(self):
+        comments = CommentViewSet.queryset.filter(issue__project_id__in=[1, 2])
+        for params, index in [
+            ({"created_after": self.since}, "comment_live_idx"),
+            ({"updated_since": self.since}, "comment_updated_idx"),
+            ({"project_id__in": "1", "created_before": self.since}, "comment_live_idx"),
+        ]:
+            with self.subTest(**params):
+                self.assertSearches(
+                    CommentFilter, comments, params, "projects_comment", index
+                )
+        archived = ArchivedComment.objects.filter(issue__project_id__in=[1, 2])
+        for params, index in [
+            ({"created_after": self.since}, "archived_comment_created_idx"),
+            ({"updated_since": self.since}, "archived_comment_updated_idx"),
+        ]:
+            with self.subTest(archived=True, **params):
+                self.assertSearches(
+                    ArchivedCommentFilter,
+                    archived,
+                    params,
+                    "projects_archivedcomment",
+                    index,
+                )
+
+    def test_project_and_contributor_ranges_use_indexes(self):
+        self.assertSearches(
+            ProjectFilter,
+            Project.objects.order_by("-created_on"),
+            {"created_after": self.since},
+            "projects_project",
+            "project_live_idx",
+        )
+        contributors = Contributor.objects.order_by("-date_joined")
+        for params, index in [
+            ({"created_after": self.since}, "contributor_joined_idx"),
+            (
+                {"project_id__in": "1,2", "created_after": self.since},
+                "contributor_project_joined_idx",
+            ),
+        ]:
+            with self.subTest(**params):
+                self.assertSearches(
+                    ContributorFilter,
+                    contributors,
+                    params,
+                    "accounts_contributor",
+                    index,
+                )
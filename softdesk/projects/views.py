@@ -1,32 +1,112 @@
-from django.http import HttpRequest
-from rest_framework import viewsets, permissions
-from softdesk.filters import CommentFilter
-from softdesk.projects.models import Comment, Issue, Project
+import hashlib
+import io
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Prefetch, Value, Window
+from django.db.models.functions import RowNumber
+from django.http import Http404, HttpRequest
+from django.utils import timezone
+from rest_framework import (
+    exceptions,
+    filters,
+    parsers,
+    permissions,
+    serializers,
+    status,
+    viewsets,
+)
+from rest_framework.decorators import action
+from rest_framework.generics import get_object_or_404
+from rest_framework.reverse import reverse
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.utils.urls import replace_query_param
+from rest_framework.views import APIView
+from django_filters.rest_framework import DjangoFilterBackend
+from django_filters.utils import translate_validation
+from softdesk.accounts.graph import get_contributor_graph
+from softdesk.accounts.models import Contributor, SoftUser
+from softdesk.accounts.serializers import SoftUserSerializer
+from softdesk.filters import (
+    ArchivedCommentFilter,
+    ArchivedIssueFilter,
+    CommentFilter,
+    IssueFilter,
+    ProjectFilter,
+)
+from softdesk.projects.models import (
+    ArchivedComment,
+    ArchivedIssue,
+    Comment,
+    Deletion,
+    IdempotencyKey,
+    Issue,
+    Project,
+)
+from softdesk.projects.board import board_columns, decode_cursor
+from softdesk.projects.deletion import schedule_deletion
+from softdesk.projects.metrics import project_metrics
+from softdesk.projects.importer import BulkImporter, read_csv, read_ndjson
+from softdesk.notifications.digests import record_assignment, record_comment
+from softdesk.notifications.inbox import fan_out_comment, record_assignments
 from softdesk.projects.serializers import (
+    ArchivedCommentSerializer,
+    ArchivedIssueSerializer,
     CommentSerializer,
+    DeletionSerializer,
     IssueSerializer,
     ProjectSerializer,
 )
+from softdesk.renderers import pack, unpack
 
 
 class IsContributor(permissions.BasePermission):
     """
     Custom permission to only allow contributors of a project to edit it.
+
+    Reads are checked against the contributor graph of the process, which
+    may still hold a membership removed by another process for up to
+    `CONTRIBUTOR_GRAPH["TTL"]` seconds. Writes are checked against the
+    database.
     """
 
+    @staticmethod
+    def is_member(request, project_id: int) -> bool:
+        if request.method in permissions.SAFE_METHODS:
+            return get_contributor_graph().is_contributor(request.user.pk, project_id)
+        return Contributor.objects.filter(
+            user_id=request.user.pk, project_id=project_id
+        ).exists()
+
     def has_permission(self, request: HttpRequest, view) -> bool:
         """
         Return True if permission is granted to the request, else False
         """
-        if view.action == "create":
+        if view.action == "create" and not getattr(view, "parent_url_kwarg", None):
+            # Unknown or deleted parents are reported by the serializer.
             if "project" in request.data:
-                project_id = request.data.get("project")
-                project = Project.objects.get(pk=project_id)
-                return request.user in project.contributors.all()
+                try:
+                    project_id = int(request.data.get("project"))
+                except (TypeError, ValueError):
+                    return True
+                return (
+                    self.is_member(request, project_id)
+                    or not Project.objects.filter(pk=project_id).exists()
+                )
             elif "issue" in request.data:
-                issue_id = request.data.get("issue")
-                issue = Issue.objects.get(pk=issue_id)
-                return request.user in issue.project.contributors.all()
+                try:
+                    issue_id = int(request.data.get("issue"))
+                except (TypeError, ValueError):
+                    return True
+                project_id = (
+                    Issue.objects.filter(pk=issue_id)
+                    .values_list("project_id", flat=True)
+                    .first()
+                )
+                return project_id is None or self.is_member(request, project_id)
         return True
 
     def has_object_permission(self, request: HttpRequest, view, obj) -> bool:
@@ -35,13 +115,18 @@ class IsContributor(permissions.BasePermission):
         """
         if not request.user.is_authenticated:
             return False
-        if type(obj) is Comment:
-            return request.user in obj.issue.project.contributors.all()
-        elif type(obj) is Issue:
-            return request.user in obj.project.contributors.all()
+        if getattr(view, "parent_project_id", None) is not None:
+            # Nested views only serve the children of a parent already checked.
+            return True
+        if type(obj) in (Comment, ArchivedComment):
+            project_id = obj.issue.project_id
+        elif type(obj) in (Issue, ArchivedIssue):
+            project_id = obj.project_id
         elif type(obj) is Project:
-            return request.user in obj.contributors.all()
-        return False
+            project_id = obj.pk
+        else:
+            return False
+        return self.is_member(request, project_id)
 
 
 class IsAuthor(permissions.BasePermission):
@@ -56,11 +141,413 @@ class IsAuthor(permissions.BasePermission):
         if not request.user.is_authenticated:
             return False
         if view.action in ["update", "partial_update", "destroy"]:
-            return obj.author == request.user
+            return obj.author_id == request.user.pk
         return True
 
 
-class ProjectViewSet(viewsets.ModelViewSet):
+class ContributorScopedMixin:
+    """
+    Limit lists to the objects of the projects the user contributes to,
+    found through the `project_lookup` of the model.
+    """
+
+    project_lookup = "project_id"
+
+    def scope_queryset(self, queryset):
+        project_ids = get_contributor_graph().project_ids(self.request.user.pk)
+        return queryset.filter(**{f"{self.project_lookup}__in": project_ids})
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == "list":
+            queryset = self.scope_queryset(queryset)
+        return queryset
+
+
+class ParentScopedMixin:
+    """
+    Serve the children of the parent named by `parent_url_kwarg` in a nested
+    route, e.g. the issues of `/projects/{project_pk}/issues/`.
+
+    Querysets are constrained to the parent in SQL. List and create look the
+    parent up and check the membership of the user in its project once per
+    request, so their object permissions cost nothing more. Detail actions
+    skip that lookup: their object, found under the parent or not at all,
+    tells its project to the usual object permissions. Written objects are
+    given the parent of the route, whatever the request data says.
+    """
+
+    parent_model = None
+    parent_field = None
+    parent_project_lookup = "project_id"
+    parent_url_kwarg = None
+    parent_project_id = None
+
+    def check_permissions(self, request):
+        super().check_permissions(request)
+        if self.detail:
+            return
+        self.parent_project_id = (
+            self.parent_model.objects.filter(pk=self.kwargs[self.parent_url_kwarg])
+            .values_list(self.parent_project_lookup, flat=True)
+            .first()
+        )
+        if self.parent_project_id is None:
+            raise exceptions.NotFound()
+        if not IsContributor.is_member(request, self.parent_project_id):
+            self.permission_denied(request)
+
+    def scope_queryset(self, queryset):
+        return queryset.filter(
+            **{self.parent_field: self.kwargs[self.parent_url_kwarg]}
+        )
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        # Lists are scoped by ContributorScopedMixin, through scope_queryset.
+        if self.action != "list":
+            queryset = self.scope_queryset(queryset)
+        return queryset
+
+    def get_archived_queryset(self):
+        return self.scope_queryset(super().get_archived_queryset())
+
+    def get_serializer(self, *args, **kwargs):
+        if "data" in kwargs:
+            kwargs["data"] = kwargs["data"].copy()
+            kwargs["data"][self.parent_field] = self.kwargs[self.parent_url_kwarg]
+        return super().get_serializer(*args, **kwargs)
+
+
+class CompoundDocumentMixin:
+    """
+    Embed the related resources named by `?include=`, e.g.
+    `?include=comments,author,assign_to`, in retrieve and list responses.
+
+    `include_children` maps names to the (queryset, parent field, serializer
+    class) of the children embedded in each object: at most
+    `INCLUDE_CHILDREN_LIMIT` of them, the most recent first, fetched for
+    every object with one windowed query, with a `<name>_truncated` flag.
+    `include_users` names the user fields, dotted for those of children,
+    whose users are fetched with one query and side-loaded once each in the
+    `included` section of the response.
+    """
+
+    include_children = {}
+    include_users = ()
+    include_query_param = "include"
+
+    def get_includes(self, request) -> list[str]:
+        value = request.query_params.get(self.include_query_param, "")
+        includes = [name.strip() for name in value.split(",") if name.strip()]
+        unknown = [
+            name
+            for name in includes
+            if name not in self.include_children and name not in self.include_users
+        ]
+        if unknown:
+            choices = ", ".join([*self.include_children, *self.include_users])
+            raise exceptions.ValidationError(
+                {
+                    self.include_query_param: [
+                        f"Unknown {', '.join(unknown)}, use {choices}."
+                    ]
+                }
+            )
+        return includes
+
+    def include_related(self, objects: list[dict], includes: list[str]) -> dict:
+        """
+        Embed the children named in `includes` in the serialized `objects`,
+        and return the `included` section holding their users.
+        """
+        limit = settings.INCLUDE_CHILDREN_LIMIT
+        for name in includes:
+            if name not in self.include_children:
+                continue
+            queryset, parent_field, serializer_class = self.include_children[name]
+            rows = (
+                queryset.filter(
+                    **{f"{parent_field}__in": [obj["id"] for obj in objects]}
+                )
+                .annotate(
+                    position=Window(
+                        RowNumber(),
+                        partition_by=F(parent_field),
+                        order_by=F("created_on").desc(),
+                    )
+                )
+                .filter(position__lte=limit + 1)
+                .order_by(parent_field, "position")
+            )
+            children = {obj["id"]: [] for obj in objects}
+            for child in rows:
+                children[getattr(child, f"{parent_field}_id")].append(child)
+            context = self.get_serializer_context()
+            for obj in objects:
+                obj_children = children[obj["id"]]
+                obj[name] = serializer_class(
+                    obj_children[:limit], many=True, context=context
+                ).data
+                obj[f"{name}_truncated"] = len(obj_children) > limit
+        user_ids = set()
+        for name in includes:
+            if name not in self.include_users:
+                continue
+            field, _, child_field = name.rpartition(".")
+            for obj in objects:
+                for item in obj[field] if field else [obj]:
+                    value = item[child_field]
+                    user_ids.update(value if isinstance(value, list) else [value])
+        user_ids.discard(None)
+        if not user_ids:
+            return {}
+        users = SoftUser.objects.order_by("pk").filter(pk__in=user_ids)
+        return {"users": SoftUserSerializer(users, many=True).data}
+
+    def retrieve(self, request, *args, **kwargs):
+        includes = self.get_includes(request)
+        response = super().retrieve(request, *args, **kwargs)
+        if includes:
+            included = self.include_related([response.data], includes)
+            response.data["included"] = included
+        return response
+
+    def list(self, request, *args, **kwargs):
+        includes = self.get_includes(request)
+        response = super().list(request, *args, **kwargs)
+        if includes:
+            paginated = isinstance(response.data, dict)
+            objects = response.data["results"] if paginated else response.data
+            included = self.include_related(objects, includes)
+            if paginated:
+                response.data["included"] = included
+            else:
+                response.data = {"results": objects, "included": included}
+        return response
+
+
+class IdempotencyKeyReused(exceptions.APIException):
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    default_detail = "This Idempotency-Key was already used for a different request."
+    default_code = "idempotency_key_reused"
+
+
+class IdempotentCreateMixin:
+    """
+    Make `create` idempotent for requests sent with an `Idempotency-Key`
+    header.
+
+    The key is reserved in the same transaction as the write, so concurrent
+    duplicates wait on the unique (user, key) constraint and then replay the
+    response stored by the first request. Replays go through the permission
+    checks, so a user removed from the project since gets no response body,
+    but skip the write. Keys expire after `IDEMPOTENCY_KEY_TTL`.
+    """
+
+    def get_idempotency_key(self, request) -> str | None:
+        if self.action != "create" or not request.user.is_authenticated:
+            return None
+        return request.headers.get("Idempotency-Key")
+
+    def get_idempotency_record(self, request) -> IdempotencyKey | None:
+        key = self.get_idempotency_key(request)
+        if not key:
+            return None
+        expired_on = timezone.now() - settings.IDEMPOTENCY_KEY_TTL
+        return IdempotencyKey.objects.filter(
+            user=request.user, key=key, created_on__gte=expired_on
+        ).first()
+
+    def create(self, request, *args, **kwargs):
+        key = self.get_idempotency_key(request)
+        if not key:
+            return super().create(request, *args, **kwargs)
+        fingerprint = hashlib.sha256(
+            json.dumps(
+                [request.path, request.data], sort_keys=True, cls=JSONEncoder
+            ).encode()
+        ).hexdigest()
+        record = self.get_idempotency_record(request)
+        if record is None:
+            IdempotencyKey.objects.filter(
+                user=request.user,
+                key=key,
+                created_on__lt=timezone.now() - settings.IDEMPOTENCY_KEY_TTL,
+            ).delete()
+            try:
+                with transaction.atomic():
+                    record = IdempotencyKey.objects.create(
+                        user=request.user, key=key, request_fingerprint=fingerprint
+                    )
+                    response = super().create(request, *args, **kwargs)
+                    record.response_status = response.status_code
+                    record.response_body = pack(response.data)
+                    record.save(update_fields=["response_status", "response_body"])
+                    return response
+            except IntegrityError:
+                record = IdempotencyKey.objects.filter(
+                    user=request.user, key=key
+                ).first()
+                if record is None:
+                    raise
+        if record.request_fingerprint != fingerprint:
+            raise IdempotencyKeyReused()
+        return Response(
+            unpack(record.response_body),
+            status=record.response_status,
+            headers={"Idempotent-Replayed": "true"},
+        )
+
+
+class ArchiveReadThroughMixin:
+    """
+    Serve archived rows alongside the live ones.
+
+    `retrieve` falls back on `archived_queryset` when the object is not
+    found, and `list` merges archived rows, filtered by
+    `archived_filterset_class` and scoped by the `scope_queryset` of
+    `ContributorScopedMixin`, when called with `?include_archived=1`.
+    Archived rows are read-only and carry an `archived_on` field.
+    """
+
+    archived_queryset = None
+    archived_serializer_class = None
+    archived_filterset_class = None
+
+    def get_archived_queryset(self):
+        return self.archived_queryset.all()
+
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            return super().retrieve(request, *args, **kwargs)
+        except Http404:
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            archived = get_object_or_404(
+                self.get_archived_queryset(), pk=self.kwargs[lookup_url_kwarg]
+            )
+            self.check_object_permissions(request, archived)
+            return Response(
+                self.archived_serializer_class(
+                    archived, context=self.get_serializer_context()
+                ).data
+            )
+
+    def list(self, request, *args, **kwargs):
+        if request.query_params.get("include_archived") not in ("1", "true"):
+            return super().list(request, *args, **kwargs)
+        archived_filterset = self.archived_filterset_class(
+            request.query_params,
+            queryset=self.scope_queryset(self.get_archived_queryset()),
+            request=request,
+        )
+        if not archived_filterset.is_valid():
+            raise translate_validation(archived_filterset.errors)
+        columns = ["id", "created_on", "archived"]
+        live_keys = (
+            self.filter_queryset(self.get_queryset())
+            .order_by()
+            .annotate(archived=Value(False))
+            .values_list(*columns)
+        )
+        archived_keys = (
+            archived_filterset.qs.order_by()
+            .annotate(archived=Value(True))
+            .values_list(*columns)
+        )
+        keys = live_keys.union(archived_keys, all=True).order_by("-created_on", "-id")
+        page = self.paginate_queryset(keys)
+        if page is None:
+            page = list(keys)
+        live = self.get_queryset().in_bulk(
+            [pk for pk, _, is_archived in page if not is_archived]
+        )
+        archived = self.get_archived_queryset().in_bulk(
+            [pk for pk, _, is_archived in page if is_archived]
+        )
+        context = self.get_serializer_context()
+        data = [
+            (
+                self.archived_serializer_class(archived[pk], context=context).data
+                if is_archived
+                else self.get_serializer(live[pk]).data
+            )
+            for pk, _, is_archived in page
+        ]
+        return self.get_paginated_response(data)
+
+
+class DeferredDestroyMixin:
+    """
+    Delete objects in the background instead of cascading in the request.
+
+    `destroy` marks the object as deleted, hiding it at once, and answers
+    202 with a `Deletion` whose progress is served to its requester by the
+    `deletion` action while the rows are purged in batches.
+    """
+
+    deletion_kind = None
+
+    def destroy(self, request, *args, **kwargs):
+        deletion = schedule_deletion(self.get_object(), request.user)
+        location = reverse(
+            f"{self.basename}-deletion", args=[deletion.object_id], request=request
+        )
+        return Response(
+            DeletionSerializer(deletion).data,
+            status=status.HTTP_202_ACCEPTED,
+            headers={"Location": location},
+        )
+
+    @action(detail=True, methods=["get"])
+    def deletion(self, request, pk=None):
+        deletion = get_object_or_404(
+            Deletion.objects.all(),
+            kind=self.deletion_kind,
+            object_id=pk,
+            requested_by=request.user,
+        )
+        return Response(DeletionSerializer(deletion).data)
+
+
+class TombstonesMixin:
+    """
+    Serve the ids and deletion dates of the rows deleted after `?since=`, for
+    incremental sync clients.
+
+    Tombstones are kept for `SOFT_DELETE_RETENTION`: clients which did not
+    sync for longer must reload everything. Like lists, they are limited by
+    the `scope_queryset` of `ContributorScopedMixin` to the projects of the
+    user.
+    """
+
+    @action(detail=False)
+    def tombstones(self, request):
+        queryset = self.scope_queryset(
+            self.queryset.model.all_objects.filter(deleted_at__isnull=False)
+        )
+        if "since" in request.query_params:
+            try:
+                since = serializers.DateTimeField().to_internal_value(
+                    request.query_params["since"]
+                )
+            except exceptions.ValidationError as exc:
+                raise exceptions.ValidationError({"since": exc.detail})
+            queryset = queryset.filter(deleted_at__gt=since)
+        queryset = queryset.order_by("deleted_at", "pk").values("id", "deleted_at")
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            return Response(list(queryset))
+        return self.get_paginated_response(page)
+
+
+class ProjectViewSet(
+    CompoundDocumentMixin,
+    DeferredDestroyMixin,
+    TombstonesMixin,
+    ContributorScopedMixin,
+    viewsets.ModelViewSet,
+):
     """
     API endpoint that allows projects to be viewed or edited.
 
@@ -70,12 +557,91 @@ class ProjectViewSet(viewsets.ModelViewSet):
         permission_classes (list): The list of permission classes for the viewset.
     """
 
-    queryset = Project.objects.all().order_by("-created_on")
+    queryset = (
+        Project.objects.all()
+        .prefetch_related(
+            Prefetch("contributors", queryset=SoftUser.objects.only("pk"))
+        )
+        .order_by("-created_on")
+    )
     serializer_class = ProjectSerializer
     permission_classes = [IsContributor, IsAuthor, permissions.IsAuthenticated]
+    filterset_class = ProjectFilter
+    deletion_kind = Deletion.PROJECT
+    project_lookup = "pk"
+    include_children = {"issues": (Issue.objects.all(), "project", IssueSerializer)}
+    include_users = ("author", "contributors", "issues.author", "issues.assign_to")
+    board_column_size = 10
+    board_max_column_size = 100
+    metrics_weeks = 12
+    metrics_max_weeks = 520
 
+    @action(detail=True)
+    def board(self, request, pk=None):
+        """
+        Kanban board of the project: the newest `?limit=` issues of each
+        status column, with the number of issues of the column and a link to
+        the following ones. Links pass a `?cursor=`, which may be repeated,
+        to continue the columns they name only.
+        """
+        project = get_object_or_404(Project.objects.all(), pk=pk)
+        self.check_object_permissions(request, project)
+        try:
+            limit = int(request.query_params.get("limit", self.board_column_size))
+        except ValueError:
+            limit = 0
+        if not 0 < limit <= self.board_max_column_size:
+            raise exceptions.ValidationError(
+                {"limit": [f"Use 1 to {self.board_max_column_size}."]}
+            )
+        try:
+            cursors = [
+                decode_cursor(cursor)
+                for cursor in request.query_params.getlist("cursor")
+            ]
+        except ValueError:
+            raise exceptions.ValidationError({"cursor": ["Invalid cursor."]})
+        columns = board_columns(project.pk, limit, cursors)
+        context = self.get_serializer_context()
+        url = request.build_absolute_uri()
+        for column in columns:
+            column["issues"] = IssueSerializer(
+                column["issues"], many=True, context=context
+            ).data
+            column["next"] = column["next"] and replace_query_param(
+                url, "cursor", column["next"]
+            )
+        return Response({"columns": columns})
 
-class IssueViewSet(viewsets.ModelViewSet):
+    @action(detail=True)
+    def metrics(self, request, pk=None):
+        """
+        Throughput per week and average lead, cycle and stage times of the
+        issues of the project finished over the last `?weeks=`.
+        """
+        project = get_object_or_404(Project.objects.all(), pk=pk)
+        self.check_object_permissions(request, project)
+        try:
+            weeks = int(request.query_params.get("weeks", self.metrics_weeks))
+        except ValueError:
+            weeks = 0
+        if not 0 < weeks <= self.metrics_max_weeks:
+            raise exceptions.ValidationError(
+                {"weeks": [f"Use 1 to {self.metrics_max_weeks}."]}
+            )
+        since = timezone.now() - timedelta(weeks=weeks)
+        return Response(project_metrics(project.pk, since))
+
+
+class IssueViewSet(
+    CompoundDocumentMixin,
+    ArchiveReadThroughMixin,
+    IdempotentCreateMixin,
+    DeferredDestroyMixin,
+    TombstonesMixin,
+    ContributorScopedMixin,
+    viewsets.ModelViewSet,
+):
     """
     API endpoint that allows issues to be viewed or edited.
 
@@ -88,13 +654,48 @@ class IssueViewSet(viewsets.ModelViewSet):
     queryset = Issue.objects.all().order_by("-created_on")
     serializer_class = IssueSerializer
     permission_classes = [IsContributor, IsAuthor, permissions.IsAuthenticated]
-    filterset_fields = ["project_id", "assign_to_id", "status", "priority"]
+    filterset_class = IssueFilter
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    ordering_fields = ["created_on", "last_comment_at", "comment_count"]
+    throttle_scope = "issues"
+    # Archived rows have no tombstone of their own: those of deleted projects
+    # are hidden until the purge deletes them.
+    archived_queryset = ArchivedIssue.objects.filter(project__deleted_at__isnull=True)
+    archived_serializer_class = ArchivedIssueSerializer
+    archived_filterset_class = ArchivedIssueFilter
+    deletion_kind = Deletion.ISSUE
+    include_children = {
+        "comments": (
+            Comment.objects.select_related("issue"),
+            "issue",
+            CommentSerializer,
+        )
+    }
+    include_users = ("author", "assign_to", "comments.author")
 
     def perform_create(self, serializer: IssueSerializer):
-        serializer.save(author=self.request.user)
+        issue = serializer.save(author=self.request.user)
+        record_assignment(issue, self.request.user)
+        record_assignments([(issue.pk, None, issue.assign_to_id)], issue.created_on)
+
+    def perform_update(self, serializer: IssueSerializer):
+        previous_assignee_id = serializer.instance.assign_to_id
+        issue = serializer.save()
+        if issue.assign_to_id != previous_assignee_id:
+            record_assignment(issue, self.request.user)
+            record_assignments(
+                [(issue.pk, previous_assignee_id, issue.assign_to_id)],
+                issue.updated_on,
+            )
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(
+    ArchiveReadThroughMixin,
+    IdempotentCreateMixin,
+    TombstonesMixin,
+    ContributorScopedMixin,
+    viewsets.ModelViewSet,
+):
     """
     API endpoint that allows comments to be viewed or edited.
 
@@ -104,10 +705,80 @@ class CommentViewSet(viewsets.ModelViewSet):
         permission_classes (list): The list of permission classes for the viewset.
     """
 
-    queryset = Comment.objects.all().order_by("-created_on")
+    queryset = (
+        Comment.objects.filter(issue__deleted_at__isnull=True)
+        .select_related("issue")
+        .order_by("-created_on")
+    )
     serializer_class = CommentSerializer
     permission_classes = [IsContributor, IsAuthor, permissions.IsAuthenticated]
     filterset_class = CommentFilter
+    project_lookup = "issue__project_id"
+    throttle_scope = "comments"
+    archived_queryset = ArchivedComment.objects.filter(
+        issue__project__deleted_at__isnull=True
+    ).select_related("issue")
+    archived_serializer_class = ArchivedCommentSerializer
+    archived_filterset_class = ArchivedCommentFilter
 
     def perform_create(self, serializer: CommentSerializer):
-        serializer.save(author=self.request.user)
+        comment = serializer.save(author=self.request.user)
+        record_comment(comment)
+        fan_out_comment.enqueue(comment.pk)
+
+    def perform_destroy(self, instance: Comment):
+        instance.soft_delete()
+
+
+class ProjectIssueViewSet(ParentScopedMixin, IssueViewSet):
+    """
+    API endpoint serving the issues of a project, at `/projects/{id}/issues/`.
+    """
+
+    parent_model = Project
+    parent_field = "project"
+    parent_project_lookup = "pk"
+    parent_url_kwarg = "project_pk"
+
+
+class IssueCommentViewSet(ParentScopedMixin, CommentViewSet):
+    """
+    API endpoint serving the comments of an issue, at `/issues/{id}/comments/`.
+    """
+
+    parent_model = Issue
+    parent_field = "issue"
+    parent_url_kwarg = "issue_pk"
+
+
+class BulkImportView(APIView):
+    """
+    API endpoint allowing admins to upload a NDJSON or CSV `file` of
+    projects, issues and comments to import in bulk.
+
+    The format is taken from the `format` field or the file extension, CSV
+    files also need the `kind` of their records. Responds with the import
+    report; use the `bulk_import` command for resumable imports.
+    """
+
+    permission_classes = [permissions.IsAdminUser]
+    parser_classes = [parsers.MultiPartParser]
+
+    def post(self, request, *args, **kwargs):
+        upload = request.FILES.get("file")
+        if upload is None:
+            raise exceptions.ValidationError({"file": ["This field is required."]})
+        file_format = request.data.get("format") or upload.name.rpartition(".")[2]
+        kind = request.data.get("kind")
+        if file_format not in ("ndjson", "csv"):
+            raise exceptions.ValidationError({"format": ["Use ndjson or csv."]})
+        if file_format == "csv" and kind not in ("project", "issue", "comment"):
+            raise exceptions.ValidationError(
+                {"kind": ["Use project, issue or comment for CSV files."]}
+            )
+        stream = io.TextIOWrapper(upload.file, encoding="utf-8", newline="")
+        records = (
+            read_csv(stream, kind) if file_format == "csv" else read_ndjson(stream)
+        )
+        report = BulkImporter().run(records)
+        return Response(report.as_dict())
@@ -0,0 +1,118 @@
+import hashlib
+import json
+import time
+from typing import Iterable
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from softdesk.projects.models import ISSUE_PRIORITIES, Issue
+
+PRIORITIES = [value for value, _ in ISSUE_PRIORITIES]
+
+
+def assignee_workload(project_ids: Iterable[int]) -> list[dict]:
+    """
+    Open issues of the projects `project_ids` per assignee and priority, in
+    one query grouped by both.
+
+    Assignees are {"user", "username", "total", "priorities"} dicts, the
+    busiest first.
+    """
+    rows = (
+        Issue.objects.filter(project_id__in=list(project_ids))
+        .exclude(status="END")
+        .values_list("assign_to_id", "assign_to__username", "priority")
+        .annotate(count=Count("pk"))
+        .order_by()
+    )
+    workload = {}
+    for user_id, username, priority, count in rows:
+        assignee = workload.setdefault(
+            user_id,
+            {
+                "user": user_id,
+                "username": username,
+                "total": 0,
+                "priorities": dict.fromkeys(PRIORITIES, 0),
+            },
+        )
+        assignee["priorities"][priority] = count
+        assignee["total"] += count
+    return sorted(workload.values(), key=lambda item: (-item["total"], item["user"]))
+
+
+def get_cache():
+    return caches[settings.WORKLOAD_CACHE["ALIAS"]]
+
+
+def version_key(project_id: int) -> str:
+    return f"workload:version:{project_id}"
+
+
+def project_versions(project_ids: Iterable[int]) -> dict[int, int]:
+    """
+    Current workload version of each project, starting versions missing from
+    the cache at the current time so that they don't meet a version cached
+    before their eviction.
+    """
+    cache = get_cache()
+    keys = {version_key(project_id): project_id for project_id in project_ids}
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        now = time.time_ns()
+        for key in missing:
+            cache.add(key, now, timeout=None)
+        versions.update(cache.get_many(missing))
+    return {keys[key]: version for key, version in versions.items()}
+
+
+def bump_versions(project_ids: Iterable[int]) -> None:
+    """
+    Invalidate the cached workloads covering `project_ids` once the current
+    transaction commits, so they are not computed again from the rows it
+    changes before they are visible.
+    """
+    project_ids = set(project_ids)
+
+    def bump():
+        cache = get_cache()
+        for project_id in project_ids:
+            try:
+                cache.incr(version_key(project_id))
+            except ValueError:
+                # Not cached: the next read starts a new version.
+                pass
+
+    transaction.on_commit(bump)
+
+
+def cached_workload(project_ids: Iterable[int]) -> list[dict]:
+    """
+    `assignee_workload` of `project_ids`, cached under the versions of the
+    projects for `WORKLOAD_CACHE["TIMEOUT"]` seconds: changing the issues
+    of a project only misses the workloads including it.
+    """
+    versions = sorted(project_versions(project_ids).items())
+    digest = hashlib.sha1(json.dumps(versions).encode()).hexdigest()
+    key = f"workload:{digest}"
+    cache = get_cache()
+    workload = cache.get(key)
+    if workload is None:
+        workload = assignee_workload(project_id for project_id, _ in versions)
+        cache.set(key, workload, settings.WORKLOAD_CACHE["TIMEOUT"])
+    return workload
+
+
+@receiver(post_save, sender=Issue)
+def issue_saved(sender, instance: Issue, **kwargs):
+    # An issue moved to another project changes the workload of both.
+    bump_versions(
+        {instance.project_id, getattr(instance, "_loaded_project_id", None)} - {None}
+    )
+    instance._loaded_project_id = instance.project_id
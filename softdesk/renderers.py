@@ -0,0 +1,63 @@
+import datetime
+import uuid
+
+import msgpack
+from django.utils.encoding import force_str
+from django.utils.functional import Promise
+from rest_framework import renderers
+
+# msgpack extension type used for UUIDs, packed as their 16 raw bytes.
+UUID_EXT_TYPE = 1
+
+
+def encode_msgpack_default(obj):
+    """
+    Encodes the values msgpack does not handle natively.
+
+    Timezone-aware datetimes are handled by msgpack itself (timestamp
+    extension type -1), so only the remaining serializer outputs are
+    converted here.
+    """
+    if isinstance(obj, uuid.UUID):
+        return msgpack.ExtType(UUID_EXT_TYPE, obj.bytes)
+    if isinstance(obj, datetime.date):
+        return obj.isoformat()
+    if isinstance(obj, Promise):
+        return force_str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not msgpack serializable")
+
+
+def decode_msgpack_ext(code: int, data: bytes):
+    """
+    Decodes the extension types produced by `encode_msgpack_default`.
+    """
+    if code == UUID_EXT_TYPE:
+        return uuid.UUID(bytes=data)
+    return msgpack.ExtType(code, data)
+
+
+def pack(data) -> bytes:
+    return msgpack.packb(data, default=encode_msgpack_default, datetime=True)
+
+
+def unpack(content: bytes):
+    return msgpack.unpackb(content, ext_hook=decode_msgpack_ext, timestamp=3)
+
+
+class MessagePackRenderer(renderers.BaseRenderer):
+    """
+    Renderer which serializes to MessagePack.
+
+    Datetimes are sent as msgpack timestamps and UUIDs as a 16 bytes
+    extension type instead of their ISO 8601 / hex string forms.
+    """
+
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None) -> bytes:
+        if data is None:
+            return b""
+        return pack(data)
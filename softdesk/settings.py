@@ -40,6 +40,8 @@ INSTALLED_APPS = [
     "django.contrib.staticfiles",
     "softdesk.projects",
     "softdesk.accounts",
+    "softdesk.tasks",
+    "softdesk.notifications",
     "rest_framework",
     "rest_framework_simplejwt",
     "django_filters",
@@ -49,15 +51,91 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.AllowAny",
     ],
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
+    "DEFAULT_PAGINATION_CLASS": "softdesk.pagination.EstimatedCountPagination",
     "PAGE_SIZE": 10,
     "DEFAULT_FILTER_BACKENDS": ["django_filters.rest_framework.DjangoFilterBackend"],
+    "DEFAULT_RENDERER_CLASSES": [
+        "rest_framework.renderers.JSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+        "softdesk.renderers.MessagePackRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "rest_framework.parsers.JSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+        "softdesk.parsers.MessagePackParser",
+    ],
+    "DEFAULT_THROTTLE_CLASSES": ["softdesk.throttling.TokenBucketThrottle"],
+    # Token bucket rates, looked up per view scope, action and audience.
+    "DEFAULT_THROTTLE_RATES": {
+        "token.anon": "20/min",
+        "token.user": "60/min",
+        "issues": "300/min",
+        "issues.create": "60/min",
+        "comments": "300/min",
+        "comments.create": "60/min",
+    },
+    # Serializers hand native datetimes to the renderers: JSON still gets
+    # ISO 8601 strings while MessagePack uses its compact timestamp type.
+    "DATETIME_FORMAT": None,
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "rest_framework_simplejwt.authentication.JWTAuthentication",
         "rest_framework.authentication.SessionAuthentication",
+        # Last: the first class gives the WWW-Authenticate header of 401s.
+        "softdesk.authentication.BatchAuthentication",
     ),
 }
 
+# Where token buckets live: LocalBucketStore is per process, use
+# softdesk.throttling.CacheBucketStore to share them through a cache.
+THROTTLE_BUCKET_STORE = {
+    "BACKEND": "softdesk.throttling.LocalBucketStore",
+    "OPTIONS": {"max_entries": 10000},
+}
+
+# Above this number of rows, list endpoints and admin changelists report an
+# estimated count instead of running COUNT(*).
+PAGINATION_EXACT_COUNT_LIMIT = 10000
+
+# Most sub-requests per /batch/ call, and most threads running the reads of
+# a parallel batch under ASGI.
+BATCH = {"MAX_REQUESTS": 50, "MAX_WORKERS": 8}
+
+# Most children embedded per object by ?include=, the most recent first.
+INCLUDE_CHILDREN_LIMIT = 20
+
+# Contributors whose inbox gets a new comment per fan-out task, and issues
+# per /inbox/ page.
+INBOX = {"FAN_OUT_BATCH_SIZE": 1000, "PAGE_SIZE": 50}
+
+# Cache of /users/workload/, and how long its entries are kept. Versions are
+# bumped in this cache on every issue change: use a cache shared by every
+# worker, such as redis or memcached, when running several processes.
+WORKLOAD_CACHE = {"ALIAS": "default", "TIMEOUT": 300}
+
+# Users returned by /users/autocomplete/, and how long the results of each
+# prefix are cached per user.
+AUTOCOMPLETE = {"MAX_RESULTS": 10, "CACHE_ALIAS": "default", "CACHE_TIMEOUT": 60}
+
+# Size of the in-process cache of the projects of each user and the
+# contributors of each project, and how long its entries are trusted.
+CONTRIBUTOR_GRAPH = {"MAX_ENTRIES": 100_000, "TTL": 60}
+
+# How long create responses are kept for Idempotency-Key replays.
+IDEMPOTENCY_KEY_TTL = timedelta(hours=24)
+
+# How long deleted projects, issues and comments are kept as tombstones for
+# sync clients before purge_deletions removes them.
+SOFT_DELETE_RETENTION = timedelta(days=7)
+
+# Backend running slow side effects out of the request: ThreadPoolBackend
+# runs them in this process, DatabaseBackend queues them for the
+# run_task_worker command.
+TASKS = {
+    "BACKEND": "softdesk.tasks.backends.ThreadPoolBackend",
+    "OPTIONS": {"max_workers": 4},
+}
+
 AUTH_USER_MODEL = "accounts.SoftUser"
 if DEBUG:
     SIMPLE_JWT = {
@@ -72,6 +150,7 @@ else:
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "softdesk.middleware.CompressionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -80,6 +159,11 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Responses smaller than this many bytes are not worth compressing.
+COMPRESSION_MIN_SIZE = 1024
+# Levels per encoding, clamped to softdesk.middleware.MAX_LEVELS.
+COMPRESSION_LEVELS = {"zstd": 3, "br": 4, "gzip": 6}
+
 ROOT_URLCONF = "softdesk.urls"
 
 TEMPLATES = [
@@ -131,6 +215,16 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Email
+# https://docs.djangoproject.com/en/5.0/topics/email/
+
+if DEBUG:
+    EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
+DEFAULT_FROM_EMAIL = "SoftDesk <noreply@softdesk.local>"
+# How often send_digests --loop emails the collected notifications.
+NOTIFICATION_DIGEST_INTERVAL = timedelta(minutes=15)
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.0/topics/i18n/
 
@@ -0,0 +1,11 @@
+from django.contrib import admin
+
+from .models import Task
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    model = Task
+    list_display = ("name", "status", "attempts", "run_after", "created_on")
+    list_filter = ("status",)
+    search_fields = ("name",)
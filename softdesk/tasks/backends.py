@@ -0,0 +1,152 @@
+import logging
+import os
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from softdesk.tasks.models import Task
+from softdesk.tasks.queue import retry_delay, run
+
+logger = logging.getLogger("softdesk.tasks")
+
+
+class ImmediateBackend:
+    """
+    Run tasks synchronously when enqueued, retrying without waiting.
+    Meant for tests and debugging.
+    """
+
+    def enqueue_many(self, calls: list):
+        for name, max_attempts, args, kwargs in calls:
+            for attempt in range(1, max_attempts + 1):
+                try:
+                    run(name, args, kwargs)
+                    break
+                except Exception:
+                    logger.exception("Task %s failed (attempt %d)", name, attempt)
+
+
+class ThreadPoolBackend:
+    """
+    Run tasks in a pool of threads of the current process.
+
+    Nothing is persisted: tasks still queued when the process stops are
+    lost, use DatabaseBackend for side effects which must not be dropped.
+    """
+
+    def __init__(self, max_workers: int = 4):
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="softdesk-task"
+        )
+
+    def enqueue_many(self, calls: list):
+        for call in calls:
+            self.executor.submit(self.execute, *call)
+
+    def execute(self, name: str, max_attempts: int, args, kwargs):
+        try:
+            for attempt in range(1, max_attempts + 1):
+                try:
+                    run(name, args, kwargs)
+                    return
+                except Exception:
+                    logger.exception("Task %s failed (attempt %d)", name, attempt)
+                    if attempt < max_attempts:
+                        time.sleep(retry_delay(attempt))
+        finally:
+            close_old_connections()
+
+
+class DatabaseBackend:
+    """
+    Store tasks in the `Task` table, run by the `run_task_worker` command.
+    """
+
+    def enqueue_many(self, calls: list):
+        Task.objects.bulk_create(
+            [
+                Task(name=name, max_attempts=max_attempts, args=args, kwargs=kwargs)
+                for name, max_attempts, args, kwargs in calls
+            ]
+        )
+
+
+class DatabaseWorker:
+    """
+    Claim and run batches of due tasks from the `Task` table.
+
+    Tasks are claimed by tagging them with the worker id in one UPDATE, so
+    several workers never run the same task. A claim expires after
+    `lease` seconds, letting another worker take over the tasks of a
+    worker which died.
+    """
+
+    def __init__(self, batch_size: int = 50, lease: int = 300):
+        self.batch_size = batch_size
+        self.lease = lease
+        self.worker_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+    def claim(self) -> list[Task]:
+        now = timezone.now()
+        due = Task.objects.filter(
+            Q(status=Task.QUEUED, run_after__lte=now)
+            | Q(status=Task.RUNNING, locked_until__lt=now)
+        ).order_by("run_after")
+        with transaction.atomic():
+            ids = list(due.values_list("pk", flat=True)[: self.batch_size])
+            Task.objects.filter(pk__in=ids).filter(
+                Q(status=Task.QUEUED) | Q(status=Task.RUNNING, locked_until__lt=now)
+            ).update(
+                status=Task.RUNNING,
+                locked_by=self.worker_id,
+                locked_until=now + timedelta(seconds=self.lease),
+            )
+        return list(
+            Task.objects.filter(
+                pk__in=ids, status=Task.RUNNING, locked_by=self.worker_id
+            )
+        )
+
+    def run_batch(self) -> int:
+        """
+        Run one batch of due tasks, returning how many were claimed.
+        """
+        tasks = self.claim()
+        done, retried = [], []
+        for queued_task in tasks:
+            queued_task.attempts += 1
+            try:
+                run(queued_task.name, queued_task.args, queued_task.kwargs)
+                done.append(queued_task.pk)
+            except Exception:
+                logger.exception("Task %s failed", queued_task.name)
+                queued_task.last_error = traceback.format_exc()
+                if queued_task.attempts < queued_task.max_attempts:
+                    queued_task.status = Task.QUEUED
+                    queued_task.run_after = timezone.now() + timedelta(
+                        seconds=retry_delay(queued_task.attempts)
+                    )
+                else:
+                    queued_task.status = Task.FAILED
+                queued_task.locked_by = ""
+                queued_task.locked_until = None
+                retried.append(queued_task)
+        Task.objects.filter(pk__in=done).delete()
+        Task.objects.bulk_update(
+            retried,
+            [
+                "status",
+                "attempts",
+                "run_after",
+                "locked_by",
+                "locked_until",
+                "last_error",
+            ],
+        )
+        return len(tasks)
@@ -0,0 +1,52 @@
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from softdesk.tasks.backends import DatabaseWorker
+
+
+class Command(BaseCommand):
+    help = "Run the tasks stored in the database queue."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=50)
+        parser.add_argument(
+            "--lease",
+            type=int,
+            default=300,
+            help="Seconds after which tasks of a dead worker are run again.",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=1.0,
+            help="Seconds to wait when the queue is empty.",
+        )
+        parser.add_argument(
+            "--once", action="store_true", help="Stop once the queue is empty."
+        )
+
+    def handle(self, *args, **options):
+        worker = DatabaseWorker(
+            batch_size=options["batch_size"], lease=options["lease"]
+        )
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        self.stdout.write(f"Worker {worker.worker_id} started.")
+        processed = 0
+        while not self.stopping:
+            # Drops connections broken meanwhile, by a database restart say.
+            close_old_connections()
+            claimed = worker.run_batch()
+            processed += claimed
+            if not claimed:
+                if options["once"]:
+                    break
+                time.sleep(options["sleep"])
+        self.stdout.write(f"Worker {worker.worker_id} stopped after {processed} tasks.")
+
+    def stop(self, signum, frame):
+        self.stopping = True
@@ -0,0 +1,41 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Task(models.Model):
+    """
+    Call of a task function waiting in the database queue.
+
+    Rows are deleted once the task succeeded, failed ones are kept with
+    their last error for inspection.
+    """
+
+    QUEUED = "QUE"
+    RUNNING = "RUN"
+    FAILED = "FAIL"
+
+    name = models.CharField(max_length=255)
+    args = models.JSONField(default=list)
+    kwargs = models.JSONField(default=dict)
+    status = models.CharField(
+        max_length=4,
+        choices=[
+            (QUEUED, "queued"),
+            (RUNNING, "running"),
+            (FAILED, "failed"),
+        ],
+        default=QUEUED,
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=64, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_on = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "run_after"])]
+
+    def __str__(self):
+        return f"{self.name} ({self.get_status_display()})"
@@ -0,0 +1,122 @@
+import logging
+import threading
+import time
+import weakref
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger("softdesk.tasks")
+
+
+def task(max_attempts: int = 3):
+    """
+    Register a function as a task.
+
+    Tasks are called with JSON-serializable arguments and retried with an
+    exponential backoff until they succeed or `max_attempts` is reached.
+    """
+
+    def decorator(func):
+        func.task_name = f"{func.__module__}.{func.__name__}"
+        func.max_attempts = max_attempts
+        func.enqueue = lambda *args, **kwargs: enqueue(func, *args, **kwargs)
+        return func
+
+    return decorator
+
+
+@lru_cache(maxsize=None)
+def get_backend():
+    """
+    Return the backend configured by the `TASKS` setting.
+    """
+    config = getattr(settings, "TASKS", {})
+    return import_string(
+        config.get("BACKEND", "softdesk.tasks.backends.ThreadPoolBackend")
+    )(**config.get("OPTIONS", {}))
+
+
+def reset_backend(*, setting, **kwargs):
+    if setting == "TASKS":
+        get_backend.cache_clear()
+
+
+setting_changed.connect(reset_backend)
+
+
+class Batch:
+    """
+    Calls enqueued in a transaction, handed to the backend in a single
+    `enqueue_many()` call once it commits.
+
+    Each call registers a `Marker` with `transaction.on_commit()`. Django
+    drops the markers of a transaction or savepoint rolled back, and runs
+    the others in order on commit: the first one to run hands over the
+    calls of every marker still alive. Markers are only referenced weakly
+    here, so those dropped by Django are freed right away.
+    """
+
+    def __init__(self):
+        self.markers = []
+
+    def add(self, call) -> "Marker":
+        marker = Marker(self, call)
+        self.markers.append(weakref.ref(marker))
+        return marker
+
+    def is_pending(self) -> bool:
+        return any(marker() is not None for marker in self.markers)
+
+    def flush(self):
+        markers = [marker() for marker in self.markers]
+        self.markers = []
+        calls = [marker.call for marker in markers if marker is not None]
+        if calls:
+            get_backend().enqueue_many(calls)
+
+
+class Marker:
+    def __init__(self, batch: Batch, call: tuple):
+        self.batch = batch
+        self.call = call
+
+    def __call__(self):
+        self.batch.flush()
+
+
+local = threading.local()
+
+
+def enqueue(func, *args, **kwargs):
+    """
+    Enqueue a call of the task `func` once the current transaction commits,
+    or right away outside of a transaction.
+
+    Calls enqueued during a transaction are handed to the backend in one
+    `Batch`, without those enqueued in a savepoint rolled back.
+    """
+    call = (func.task_name, func.max_attempts, args, kwargs)
+    batch = getattr(local, "batch", None)
+    if batch is None or not batch.is_pending():
+        batch = local.batch = Batch()
+    transaction.on_commit(batch.add(call))
+
+
+def retry_delay(attempts: int) -> float:
+    """
+    Seconds to wait before the next attempt: 1, 2, 4... capped at 5 minutes.
+    """
+    return min(2 ** (attempts - 1), 300)
+
+
+def run(name: str, args, kwargs) -> None:
+    """
+    Call the task registered under `name`, logging how long it took.
+    """
+    started = time.perf_counter()
+    import_string(name)(*args, **kwargs)
+    logger.debug("Ran %s in %.3fs", name, time.perf_counter() - started)
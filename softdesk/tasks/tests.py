@@ -0,0 +1,148 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from softdesk.tasks.backends import DatabaseBackend, DatabaseWorker
+from softdesk.tasks.models import Task
+from softdesk.tasks.queue import task
+
+calls = []
+
+
+@task(max_attempts=2)
+def record_call(value):
+    calls.append(value)
+
+
+@task(max_attempts=2)
+def always_fail():
+    raise RuntimeError("boom")
+
+
+@override_settings(TASKS={"BACKEND": "softdesk.tasks.backends.DatabaseBackend"})
+class DatabaseQueueTestCase(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_enqueued_calls_are_stored_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            record_call.enqueue(1)
+            record_call.enqueue(2)
+            self.assertFalse(Task.objects.exists())
+        self.assertEqual(
+            list(Task.objects.values_list("name", "args")),
+            [
+                ("softdesk.tasks.tests.record_call", [1]),
+                ("softdesk.tasks.tests.record_call", [2]),
+            ],
+        )
+
+    def test_rolled_back_calls_are_dropped(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    record_call.enqueue(1)
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            record_call.enqueue(2)
+        self.assertEqual(list(Task.objects.values_list("args", flat=True)), [[2]])
+
+    def test_calls_of_a_transaction_are_stored_in_one_batch(self):
+        with mock.patch.object(
+            DatabaseBackend,
+            "enqueue_many",
+            autospec=True,
+            side_effect=DatabaseBackend.enqueue_many,
+        ) as enqueue_many:
+            with self.captureOnCommitCallbacks(execute=True):
+                record_call.enqueue(1)
+                try:
+                    with transaction.atomic():
+                        record_call.enqueue(2)
+                        raise RuntimeError
+                except RuntimeError:
+                    pass
+                with transaction.atomic():
+                    record_call.enqueue(3)
+                record_call.enqueue(4)
+        self.assertEqual(enqueue_many.call_count, 1)
+        self.assertEqual(
+            list(Task.objects.values_list("args", flat=True)), [[1], [3], [4]]
+        )
+
+    def test_worker_closes_broken_connections_between_batches(self):
+        with mock.patch(
+            "softdesk.tasks.management.commands.run_task_worker.close_old_connections"
+        ) as close_old_connections:
+            call_command("run_task_worker", once=True, stdout=StringIO())
+        close_old_connections.assert_called_once_with()
+
+    def test_calls_enqueued_after_a_rolled_back_savepoint_are_kept(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            record_call.enqueue(1)
+            try:
+                with transaction.atomic():
+                    record_call.enqueue(2)
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            record_call.enqueue(3)
+        self.assertEqual(list(Task.objects.values_list("args", flat=True)), [[1], [3]])
+
+    def test_worker_runs_and_deletes_tasks(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            record_call.enqueue("a")
+            record_call.enqueue("b")
+        self.assertEqual(DatabaseWorker().run_batch(), 2)
+        self.assertEqual(calls, ["a", "b"])
+        self.assertFalse(Task.objects.exists())
+
+    def test_failed_task_is_retried_then_marked_failed(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            always_fail.enqueue()
+        worker = DatabaseWorker()
+        with self.assertLogs("softdesk.tasks", "ERROR"):
+            worker.run_batch()
+        failed_task = Task.objects.get()
+        self.assertEqual(failed_task.status, Task.QUEUED)
+        self.assertEqual(failed_task.attempts, 1)
+        self.assertGreater(failed_task.run_after, timezone.now())
+        self.assertEqual(worker.run_batch(), 0)
+
+        Task.objects.update(run_after=timezone.now())
+        with self.assertLogs("softdesk.tasks", "ERROR"):
+            worker.run_batch()
+        failed_task.refresh_from_db()
+        self.assertEqual(failed_task.status, Task.FAILED)
+        self.assertIn("boom", failed_task.last_error)
+
+    def test_claimed_tasks_are_not_run_twice(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            record_call.enqueue(1)
+        first_worker, second_worker = DatabaseWorker(), DatabaseWorker()
+        self.assertEqual(len(first_worker.claim()), 1)
+        self.assertEqual(second_worker.claim(), [])
+
+    def test_expired_claims_are_taken_over(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            record_call.enqueue(1)
+        DatabaseWorker(lease=-1).claim()
+        self.assertEqual(DatabaseWorker().run_batch(), 1)
+        self.assertEqual(calls, [1])
+
+
+@override_settings(TASKS={"BACKEND": "softdesk.tasks.backends.ImmediateBackend"})
+class ImmediateBackendTestCase(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_tasks_run_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            record_call.enqueue(1)
+            self.assertEqual(calls, [])
+        self.assertEqual(calls, [1])
@@ -0,0 +1,168 @@
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.utils.module_loading import import_string
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_rate(rate: str) -> tuple[int, int]:
+    """
+    Parse a "<requests>/<period>" rate ("100/min", "5/s"...) into the bucket
+    capacity and the number of seconds needed to refill it.
+    """
+    num, period = rate.split("/")
+    return int(num), PERIODS[period[0]]
+
+
+class LocalBucketStore:
+    """
+    Token buckets kept in the memory of the current process.
+
+    Updates are serialized by a lock and the number of buckets is bounded,
+    least recently used buckets (hence mostly full ones) being dropped first.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key: str, capacity: int, refill_rate: float, now: float):
+        """
+        Take a token from the bucket.
+
+        Returns 0 if the request is allowed, else the number of seconds to
+        wait before a token is available.
+        """
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * refill_rate)
+            wait = 0.0 if tokens >= 1 else (1 - tokens) / refill_rate
+            self._buckets[key] = (tokens - 1 if not wait else tokens, now)
+            if len(self._buckets) > self.max_entries:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class CacheBucketStore:
+    """
+    Token buckets kept in a Django cache shared by every worker.
+
+    Each update holds a short lock taken with `cache.add()`, which is atomic on
+    the shared backends (memcached, redis, database). A busy lock is retried
+    `lock_attempts` times, waiting twice as long each time from
+    `lock_backoff` seconds. If it is still busy the request is allowed
+    without taking a token: concurrent requests of one caller, within its
+    budget, must not be refused for waiting on each other, and a lock left
+    by a dead worker must not refuse every request until it expires.
+    """
+
+    lock_attempts = 6
+    lock_backoff = 0.001
+
+    def __init__(self, alias: str = "default"):
+        self.cache = caches[alias]
+
+    def consume(self, key: str, capacity: int, refill_rate: float, now: float):
+        lock_key = f"{key}:lock"
+        delay = self.lock_backoff
+        for _ in range(self.lock_attempts):
+            if self.cache.add(lock_key, 1, timeout=1):
+                break
+            time.sleep(delay)
+            delay *= 2
+        else:
+            return 0.0
+        try:
+            tokens, updated = self.cache.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * refill_rate)
+            wait = 0.0 if tokens >= 1 else (1 - tokens) / refill_rate
+            self.cache.set(
+                key,
+                (tokens - 1 if not wait else tokens, now),
+                timeout=int(capacity / refill_rate) + 1,
+            )
+        finally:
+            self.cache.delete(lock_key)
+        return wait
+
+
+@lru_cache(maxsize=None)
+def get_bucket_store():
+    """
+    Return the store configured by the `THROTTLE_BUCKET_STORE` setting.
+    """
+    store = getattr(settings, "THROTTLE_BUCKET_STORE", {})
+    return import_string(store.get("BACKEND", "softdesk.throttling.LocalBucketStore"))(
+        **store.get("OPTIONS", {})
+    )
+
+
+def reset_bucket_store(*, setting, **kwargs):
+    if setting == "THROTTLE_BUCKET_STORE":
+        get_bucket_store.cache_clear()
+
+
+setting_changed.connect(reset_bucket_store)
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Token bucket throttle configured per view and per action.
+
+    The rate is looked up in `DEFAULT_THROTTLE_RATES` under the most specific
+    of "<scope>.<action>.<audience>", "<scope>.<action>", "<scope>.<audience>"
+    and "<scope>", where the scope is the view's `throttle_scope` and the
+    audience is "user" or "anon". Views without a matching rate are not
+    throttled. Buckets are per user, or per client IP for anonymous callers.
+    """
+
+    def __init__(self):
+        self.wait_time = 0.0
+
+    def get_rate(self, request, view) -> tuple[str | None, str | None]:
+        """
+        Return the settings key and the rate applying to the request.
+        """
+        scope = getattr(view, "throttle_scope", None)
+        if not scope:
+            return None, None
+        audience = "user" if request.user and request.user.is_authenticated else "anon"
+        action = getattr(view, "action", None)
+        keys = [f"{scope}.{audience}", scope]
+        if action:
+            keys[:0] = [f"{scope}.{action}.{audience}", f"{scope}.{action}"]
+        rates = api_settings.DEFAULT_THROTTLE_RATES
+        for key in keys:
+            if rates.get(key):
+                return key, rates[key]
+        return None, None
+
+    def allow_request(self, request, view) -> bool:
+        key, rate = self.get_rate(request, view)
+        if rate is None:
+            return True
+        if request.user and request.user.is_authenticated:
+            ident = f"user:{request.user.pk}"
+        else:
+            ident = f"anon:{self.get_ident(request)}"
+        capacity, period = parse_rate(rate)
+        self.wait_time = get_bucket_store().consume(
+            f"throttle:{key}:{ident}", capacity, capacity / period, time.time()
+        )
+        return not self.wait_time
+
+    def wait(self) -> float:
+        return self.wait_time
@@ -18,9 +18,22 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from rest_framework import routers
-from softdesk.accounts.views import SoftUserViewSet, ContributorViewSet
-from softdesk.projects.views import ProjectViewSet, IssueViewSet, CommentViewSet
-from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from softdesk.accounts.views import (
+    SoftUserViewSet,
+    ContributorViewSet,
+    ThrottledTokenObtainPairView,
+)
+from softdesk.projects.views import (
+    BulkImportView,
+    CommentViewSet,
+    IssueCommentViewSet,
+    IssueViewSet,
+    ProjectIssueViewSet,
+    ProjectViewSet,
+)
+from rest_framework_simplejwt.views import TokenRefreshView
+from softdesk.batch import BatchView
+from softdesk.notifications.views import InboxView
 
 router = routers.DefaultRouter()
 router.register(r"users", SoftUserViewSet)
@@ -29,11 +42,53 @@ router.register(r"projects", ProjectViewSet)
 router.register(r"issues", IssueViewSet)
 router.register(r"comments", CommentViewSet)
 
+
+def nested_routes(prefix: str, viewset, name: str, basename: str) -> list:
+    """
+    List and detail routes of `viewset` under the parent URL `prefix`.
+
+    Views keep the `basename` of their flat routes, which the links they
+    build point to.
+    """
+    list_view = viewset.as_view(
+        {"get": "list", "post": "create"}, basename=basename, detail=False
+    )
+    detail_view = viewset.as_view(
+        {
+            "get": "retrieve",
+            "put": "update",
+            "patch": "partial_update",
+            "delete": "destroy",
+        },
+        basename=basename,
+        detail=True,
+    )
+    return [
+        path(f"{prefix}/", list_view, name=f"{name}-list"),
+        path(f"{prefix}/<int:pk>/", detail_view, name=f"{name}-detail"),
+    ]
+
+
 urlpatterns = [
+    *nested_routes(
+        "projects/<int:project_pk>/issues",
+        ProjectIssueViewSet,
+        "project-issue",
+        "issue",
+    ),
+    *nested_routes(
+        "issues/<int:issue_pk>/comments",
+        IssueCommentViewSet,
+        "issue-comment",
+        "comment",
+    ),
     path("", include(router.urls)),
     path("admin/", admin.site.urls),
-    path("token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
+    path("token/", ThrottledTokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
+    path("import/", BulkImportView.as_view(), name="bulk_import"),
+    path("batch/", BatchView.as_view(), name="batch"),
+    path("inbox/", InboxView.as_view(), name="inbox"),
 ]
 
 urlpatterns += router.urls